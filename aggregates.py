@@ -0,0 +1,166 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, insert, delete, func, tuple_, inspect
+from extensions import db, listen_once
+from models import Student, Grade, StudentGradeSummary, ClassGradeSummary, live
+
+# The unit of maintenance is the class term (class_id, academic_year, semester):
+# ranks compare students of one class term, so a grade change re-aggregates the
+# grades of that class term only (a few hundred rows), never the whole table.
+
+
+def class_term_of(columns):
+    return tuple_(*columns)
+
+
+def student_summary_query(class_terms=None):
+    average = func.avg(Grade.score)
+    query = select(
+        Grade.student_id,
+        Student.class_id,
+        Grade.academic_year,
+        Grade.semester,
+        average,
+        func.min(Grade.score),
+        func.max(Grade.score),
+        func.count(Grade.id),
+        func.rank().over(
+            partition_by=(Student.class_id, Grade.academic_year, Grade.semester),
+            order_by=average.desc()
+        )
+    ).join(Student, Grade.student_id == Student.id).where(live(Grade))
+    if class_terms is not None:
+        query = query.where(class_term_of([Student.class_id, Grade.academic_year, Grade.semester]).in_(class_terms))
+    return query.group_by(Grade.student_id, Student.class_id, Grade.academic_year, Grade.semester)
+
+
+def class_summary_query(class_terms=None):
+    query = select(
+        Student.class_id,
+        Grade.academic_year,
+        Grade.semester,
+        func.avg(Grade.score),
+        func.min(Grade.score),
+        func.max(Grade.score),
+        func.count(Grade.id),
+        func.count(Grade.student_id.distinct())
+    ).join(Student, Grade.student_id == Student.id).where(live(Grade))
+    if class_terms is not None:
+        query = query.where(class_term_of([Student.class_id, Grade.academic_year, Grade.semester]).in_(class_terms))
+    return query.group_by(Student.class_id, Grade.academic_year, Grade.semester)
+
+
+STUDENT_SUMMARY_COLUMNS = ['student_id', 'class_id', 'academic_year', 'semester', 'average',
+                           'min_score', 'max_score', 'grade_count', 'class_rank']
+CLASS_SUMMARY_COLUMNS = ['class_id', 'academic_year', 'semester', 'average',
+                         'min_score', 'max_score', 'grade_count', 'student_count']
+
+
+# Rebuild the summaries of the given class terms.
+# moved_students are students whose rows may still sit under their previous class.
+def refresh_class_terms(connection, class_terms, moved_students=()):
+    class_terms = list(class_terms)
+    if not class_terms:
+        return
+
+    student_table = StudentGradeSummary.__table__
+    class_table = ClassGradeSummary.__table__
+    term = class_term_of([student_table.c.class_id, student_table.c.academic_year, student_table.c.semester])
+
+    stale = term.in_(class_terms)
+    if moved_students:
+        stale = stale | student_table.c.student_id.in_(list(moved_students))
+    connection.execute(delete(student_table).where(stale))
+    connection.execute(insert(student_table).from_select(STUDENT_SUMMARY_COLUMNS, student_summary_query(class_terms)))
+
+    connection.execute(delete(class_table).where(
+        class_term_of([class_table.c.class_id, class_table.c.academic_year, class_table.c.semester]).in_(class_terms)
+    ))
+    connection.execute(insert(class_table).from_select(CLASS_SUMMARY_COLUMNS, class_summary_query(class_terms)))
+
+
+# Rebuild the class terms touched by (student_id, academic_year, semester) keys
+def refresh_student_terms(connection, student_terms, moved_students=(), previous_classes=()):
+    student_terms = set(student_terms)
+    if not student_terms:
+        return
+
+    student_ids = {student_id for student_id, _, _ in student_terms}
+    classes = dict(connection.execute(select(Student.id, Student.class_id).where(Student.id.in_(student_ids))).all())
+
+    class_terms = {
+        (classes[student_id], academic_year, semester)
+        for student_id, academic_year, semester in student_terms
+        if student_id in classes
+    }
+    # Students who changed class leave their old class terms stale as well
+    class_terms |= {
+        (class_id, academic_year, semester)
+        for student_id, class_id in previous_classes
+        for other_id, academic_year, semester in student_terms
+        if other_id == student_id
+    }
+    refresh_class_terms(connection, class_terms, moved_students)
+
+
+# Full recompute: two set-based INSERT ... SELECT statements over the whole Grade table
+def recompute_all(connection):
+    connection.execute(delete(StudentGradeSummary.__table__))
+    connection.execute(delete(ClassGradeSummary.__table__))
+    connection.execute(insert(StudentGradeSummary.__table__).from_select(STUDENT_SUMMARY_COLUMNS, student_summary_query()))
+    connection.execute(insert(ClassGradeSummary.__table__).from_select(CLASS_SUMMARY_COLUMNS, class_summary_query()))
+
+
+def grade_keys(grade):
+    # Current key plus the pre-edit key when an edit moved the grade to another student or term
+    state = inspect(grade)
+    current = (grade.student_id, grade.academic_year, grade.semester)
+    previous = tuple(
+        (state.attrs[name].history.deleted or [value])[0]
+        for name, value in zip(('student_id', 'academic_year', 'semester'), current)
+    )
+    return {current, previous}
+
+
+# Maintain the summaries incrementally, inside the flushing transaction
+def refresh_grade_summaries(session, flush_context):
+    student_terms = set()
+    moved_students = set()
+    previous_classes = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Grade):
+            student_terms |= grade_keys(obj)
+        elif isinstance(obj, Student) and obj in session.dirty:
+            history = inspect(obj).attrs.class_id.history
+            if history.deleted:
+                moved_students.add(obj.id)
+                previous_classes |= {(obj.id, class_id) for class_id in history.deleted}
+
+    if not (student_terms or moved_students):
+        return
+
+    connection = session.connection()
+    if moved_students:
+        # Every term the moved students have grades in
+        student_terms |= set(connection.execute(
+            select(Grade.student_id, Grade.academic_year, Grade.semester)
+            .where(Grade.student_id.in_(moved_students))
+            .distinct()
+        ).all())
+    refresh_student_terms(connection, student_terms, moved_students, previous_classes)
+
+
+def init_app(app):
+    listen_once(db.session, 'after_flush', refresh_grade_summaries)
+
+
+@click.command('grades-recompute')
+@with_appcontext
+def grades_recompute_command():
+    """Recompute all grade summaries and class ranks."""
+    with db.engine.begin() as connection:
+        recompute_all(connection)
+        students = connection.execute(select(func.count()).select_from(StudentGradeSummary.__table__)).scalar()
+        classes = connection.execute(select(func.count()).select_from(ClassGradeSummary.__table__)).scalar()
+    click.echo(f'Recomputed {students} student and {classes} class term summaries')
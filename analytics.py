@@ -0,0 +1,220 @@
+import click
+from datetime import date
+from flask.cli import with_appcontext
+from sqlalchemy import select, insert, delete, func, case, cast, tuple_, inspect, Integer
+from extensions import db, listen_once
+from models import Class, Student, Attendance, AttendanceArchive, AttendanceDailySummary, live
+
+STATUSES = ('present', 'absent', 'late', 'excused')
+REPORT_GROUPS = ('day', 'week', 'month', 'class', 'student')
+
+
+# Academic years run from August 1st to July 31st ('2025-2026')
+def academic_year_range(academic_year):
+    first, second = (int(year) for year in academic_year.split('-'))
+    return date(first, 8, 1), date(second, 7, 31)
+
+
+def academic_year_of(day):
+    first = day.year if day.month >= 8 else day.year - 1
+    return f'{first}-{first + 1}'
+
+
+# Last day of the newest archived academic year (None before the first archive run)
+def archived_until(connection=None):
+    query = select(func.max(AttendanceArchive.academic_year))
+    latest = (connection or db.session).execute(query).scalar()
+    return academic_year_range(latest)[1] if latest else None
+
+
+# Daily summary maintenance.
+# A (class_id, date) pair is the unit: any write to one attendance record
+# re-counts that class's records for that day (one class-sized GROUP BY).
+def daily_summary_query(class_days=None):
+    query = select(
+        Student.class_id,
+        Attendance.date,
+        *[func.sum(case((Attendance.status == status, 1), else_=0)) for status in STATUSES],
+        func.count(Attendance.id)
+    ).join(Student, Attendance.student_id == Student.id).where(live(Attendance))
+    if class_days is not None:
+        query = query.where(tuple_(Student.class_id, Attendance.date).in_(class_days))
+    return query.group_by(Student.class_id, Attendance.date)
+
+
+SUMMARY_COLUMNS = ['class_id', 'date', *STATUSES, 'total']
+
+
+def refresh_class_days(connection, class_days):
+    class_days = list(class_days)
+    if not class_days:
+        return
+    table = AttendanceDailySummary.__table__
+    connection.execute(delete(table).where(tuple_(table.c.class_id, table.c.date).in_(class_days)))
+    connection.execute(insert(table).from_select(SUMMARY_COLUMNS, daily_summary_query(class_days)))
+
+
+# Refresh the class days touched by (student_id, date) keys
+def refresh_student_days(connection, student_days, previous_classes=()):
+    student_days = set(student_days)
+    if not student_days:
+        return
+    student_ids = {student_id for student_id, _ in student_days}
+    classes = dict(connection.execute(select(Student.id, Student.class_id).where(Student.id.in_(student_ids))).all())
+
+    class_days = {(classes[student_id], day) for student_id, day in student_days if student_id in classes}
+    class_days |= {
+        (class_id, day)
+        for student_id, class_id in previous_classes
+        for other_id, day in student_days
+        if other_id == student_id
+    }
+    refresh_class_days(connection, class_days)
+
+
+# Summaries of archived years were counted before their records left the attendance
+# table, so only the days after the archive cutoff are rebuilt
+def recompute_all(connection):
+    table = AttendanceDailySummary.__table__
+    query = daily_summary_query()
+    cleared = delete(table)
+    cutoff = archived_until(connection)
+    if cutoff is not None:
+        query = query.where(Attendance.date > cutoff)
+        cleared = cleared.where(table.c.date > cutoff)
+    connection.execute(cleared)
+    connection.execute(insert(table).from_select(SUMMARY_COLUMNS, query))
+
+
+def attendance_keys(attendance):
+    # Current key plus the pre-edit key when an edit moved the record
+    state = inspect(attendance)
+    current = (attendance.student_id, attendance.date)
+    previous = tuple(
+        (state.attrs[name].history.deleted or [value])[0]
+        for name, value in zip(('student_id', 'date'), current)
+    )
+    return {current, previous}
+
+
+def refresh_daily_summaries(session, flush_context):
+    student_days = set()
+    moved_students = set()
+    previous_classes = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Attendance):
+            student_days |= attendance_keys(obj)
+        elif isinstance(obj, Student) and obj in session.dirty:
+            history = inspect(obj).attrs.class_id.history
+            if history.deleted:
+                moved_students.add(obj.id)
+                previous_classes |= {(obj.id, class_id) for class_id in history.deleted}
+
+    if not (student_days or moved_students):
+        return
+
+    connection = session.connection()
+    if moved_students:
+        student_days |= set(connection.execute(
+            select(Attendance.student_id, Attendance.date).where(Attendance.student_id.in_(moved_students))
+        ).all())
+    refresh_student_days(connection, student_days, previous_classes)
+
+
+def init_app(app):
+    listen_once(db.session, 'after_flush', refresh_daily_summaries)
+
+
+# Rollups
+def period_expression(column, period):
+    dialect = db.engine.dialect.name
+    if period == 'day':
+        return column
+    if dialect == 'postgresql':
+        return func.to_char(column, 'IYYY-"W"IW' if period == 'week' else 'YYYY-MM')
+    if period == 'week':
+        # ISO week like PostgreSQL (strftime %G/%V needs SQLite 3.46): the Thursday of
+        # a Monday-Sunday week gives its ISO year, and its day of year the week number
+        thursday = func.date(column, '-3 days', 'weekday 4')
+        week = (cast(func.strftime('%j', thursday), Integer) - 1) // 7 + 1
+        return func.printf('%s-W%02d', func.strftime('%Y', thursday), week)
+    return func.strftime('%Y-%m', column)
+
+
+def rollup_row(key, counts):
+    counts = dict(zip(STATUSES + ('total',), (int(value or 0) for value in counts)))
+    attended = counts['present'] + counts['late']
+    counts['rate'] = attended / counts['total'] if counts['total'] else None
+    counts['key'] = key
+    return counts
+
+
+def summary_filters(query, class_id, start, end):
+    if class_id is not None:
+        query = query.where(AttendanceDailySummary.class_id == class_id)
+    if start is not None:
+        query = query.where(AttendanceDailySummary.date >= start)
+    if end is not None:
+        query = query.where(AttendanceDailySummary.date <= end)
+    return query
+
+
+# Attendance per day/week/month, read from the daily summaries
+def period_rollup(period='week', class_id=None, start=None, end=None):
+    key = period_expression(AttendanceDailySummary.date, period).label('period')
+    query = select(key, *[func.sum(getattr(AttendanceDailySummary, name)) for name in STATUSES + ('total',)])
+    query = summary_filters(query, class_id, start, end).group_by(key).order_by(key)
+    return [rollup_row(row[0], row[1:]) for row in db.session.execute(query)]
+
+
+# Attendance per class for a date range, read from the daily summaries
+def class_rollup(start=None, end=None):
+    query = select(
+        AttendanceDailySummary.class_id,
+        Class.name,
+        *[func.sum(getattr(AttendanceDailySummary, name)) for name in STATUSES + ('total',)]
+    ).join(Class, AttendanceDailySummary.class_id == Class.id)
+    query = summary_filters(query, None, start, end) \
+        .group_by(AttendanceDailySummary.class_id, Class.name).order_by(Class.name)
+    return [rollup_row({'id': row[0], 'name': row[1]}, row[2:]) for row in db.session.execute(query)]
+
+
+# Attendance per student of one class: one grouped query over the attendance rows
+def student_rollup(class_id, start=None, end=None):
+    query = select(
+        Student.id,
+        Student.student_id,
+        Student.first_name,
+        Student.last_name,
+        *[func.sum(case((Attendance.status == status, 1), else_=0)) for status in STATUSES],
+        func.count(Attendance.id)
+    ).join(Attendance, Attendance.student_id == Student.id).where(Student.class_id == class_id)
+    if start is not None:
+        query = query.where(Attendance.date >= start)
+    if end is not None:
+        query = query.where(Attendance.date <= end)
+    query = query.group_by(Student.id, Student.student_id, Student.first_name, Student.last_name) \
+        .order_by(Student.last_name, Student.first_name)
+    return [
+        rollup_row({'id': row[0], 'student_id': row[1], 'name': f'{row[2]} {row[3]}'}, row[4:])
+        for row in db.session.execute(query)
+    ]
+
+
+def attendance_report(group, class_id=None, start=None, end=None):
+    if group == 'class':
+        return class_rollup(start, end)
+    if group == 'student':
+        return student_rollup(class_id, start, end)
+    return period_rollup(group, class_id, start, end)
+
+
+@click.command('attendance-summaries-rebuild')
+@with_appcontext
+def attendance_summaries_rebuild_command():
+    """Recompute the daily attendance summaries from the attendance table."""
+    with db.engine.begin() as connection:
+        recompute_all(connection)
+        total = connection.execute(select(func.count()).select_from(AttendanceDailySummary.__table__)).scalar()
+    click.echo(f'Rebuilt {total} daily attendance summaries')
@@ -0,0 +1,281 @@
+import hashlib
+import json
+from datetime import date, datetime
+from flask import Response, abort, current_app, request
+from sqlalchemy import select
+from werkzeug.http import is_resource_modified
+from extensions import db
+from models import Class, Student, Grade, Attendance, ModelVersion, live
+from changelog import TRACKED, change_row
+from analytics import archived_until
+from forms import BatchStudentForm, ClassForm, BatchGradeForm, BatchAttendanceForm
+from pagination import keyset_query, keyset_page
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# JSON API for integrations (/api/v1).
+# Reads select only the columns named in ?fields=, page with ?after= cursors or
+# fetch a list of ?ids=, and answer 304 from the model versions alone when the
+# client's ETag (or Last-Modified date) is still current. Batch writes go through
+# the ORM in one transaction, so summaries, caches and the search index follow
+# them like edits made through the pages. Responses are JSON (encoded with orjson
+# when installed) or MessagePack for clients that accept application/msgpack.
+# The views are in views/api.py; this module holds what they share with asgi.py.
+
+
+def check_attendance(rows):
+    cutoff = None
+    for position, row in rows:
+        if 'date' in row:
+            cutoff = cutoff or archived_until() or date.min
+            if row['date'] <= cutoff:
+                raise ValueError(f'{position}: attendance up to {cutoff.isoformat()} is archived')
+
+
+# resource -> model, equality filters for list reads, version key of one record,
+# whether batch writes may delete, the form whose field rules written rows follow,
+# extra checks on written values
+RESOURCES = {
+    'students': {'model': Student, 'filters': ('class_id', 'student_id'), 'key': 'student', 'delete': False,
+                 'form': BatchStudentForm},
+    'classes': {'model': Class, 'filters': ('name',), 'key': 'class', 'delete': False, 'form': ClassForm},
+    'grades': {'model': Grade, 'filters': ('student_id', 'academic_year', 'semester', 'subject'), 'delete': True,
+               'form': BatchGradeForm},
+    'attendance': {'model': Attendance, 'filters': ('student_id', 'date', 'status'), 'delete': True,
+                   'form': BatchAttendanceForm, 'check': check_attendance},
+}
+
+READ_ONLY = ('id', 'created_at')
+# Deleted rows are never served, so their marker is not either
+HIDDEN = ('deleted_at',)
+
+
+def api_columns(model):
+    return [column for column in model.__table__.columns if column.key not in HIDDEN]
+
+
+def get_resource(name):
+    resource = RESOURCES.get(name)
+    if resource is None:
+        abort(404, f'Unknown resource: {name}')
+    return resource
+
+
+# Serialization
+def plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def response_mimetype():
+    offered = ['application/json'] + (['application/msgpack'] if msgpack is not None else [])
+    return request.accept_mimetypes.best_match(offered) or 'application/json'
+
+
+def encode(payload, status=200, mimetype=None):
+    mimetype = mimetype or response_mimetype()
+    if mimetype == 'application/msgpack':
+        body = msgpack.packb(payload, default=plain)
+    elif orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, default=plain, separators=(',', ':'))
+    response = Response(body, status=status, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
+
+def read_body():
+    if request.mimetype == 'application/msgpack' and msgpack is not None:
+        try:
+            return msgpack.unpackb(request.get_data())
+        except ValueError:
+            abort(400, 'Malformed MessagePack body')
+    # Only JSON bodies are accepted, so browsers can't post here from other sites
+    if not request.is_json:
+        abort(415, 'Send the batch as application/json')
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        abort(400, 'Malformed JSON body')
+    return body
+
+
+# Values from query strings and request bodies, checked against the column type
+def coerce(column, value):
+    if value is None or value == '':
+        if not column.nullable:
+            raise ValueError(f'{column.key} is required')
+        return None
+    python_type = column.type.python_type
+    if isinstance(value, bool) and python_type is not bool:
+        raise ValueError(f'{column.key} must be a {python_type.__name__}')
+    try:
+        if python_type in (date, datetime):
+            return value if isinstance(value, python_type) else python_type.fromisoformat(value)
+        value = python_type(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{column.key} must be a {python_type.__name__}')
+    length = getattr(column.type, 'length', None)
+    if length and isinstance(value, str) and len(value) > length:
+        raise ValueError(f'{column.key} is longer than {length} characters')
+    return value
+
+
+def coerce_row(model, row, position, partial):
+    if not isinstance(row, dict):
+        raise ValueError(f'{position}: expected an object')
+    columns = api_columns(model)
+    unknown = set(row) - {column.key for column in columns} - {'id'}
+    if unknown:
+        raise ValueError(f'{position}: unknown fields: {", ".join(sorted(unknown))}')
+
+    values = {}
+    try:
+        for column in columns:
+            if column.key in READ_ONLY:
+                continue
+            if column.key in row:
+                values[column.key] = coerce(column, row[column.key])
+            elif not partial and not column.nullable and column.default is None:
+                raise ValueError(f'{column.key} is required')
+    except ValueError as e:
+        raise ValueError(f'{position}: {e}')
+    return values
+
+
+# The field rules of the page forms (choices, required fields, formats). Creates are
+# checked whole; updates only on the fields they change.
+def check_form(validate_row, position, row, partial):
+    _, error = validate_row({name: str(plain(value)) for name, value in row.items() if value is not None},
+                            only=set(row) if partial else None)
+    if error:
+        raise ValueError(f'{position}: {error}')
+
+
+# One query per foreign key for the whole batch
+def check_references(model, rows):
+    for column in model.__table__.columns:
+        for foreign_key in column.foreign_keys:
+            wanted = {row[column.key] for _, row in rows if row.get(column.key) is not None}
+            if not wanted:
+                continue
+            target = foreign_key.column
+            found = set(db.session.scalars(select(target).where(target.in_(wanted))))
+            if wanted - found:
+                missing = ', '.join(str(value) for value in sorted(wanted - found))
+                raise ValueError(f'{column.key} does not exist: {missing}')
+
+
+# Reads
+def selected_columns(model):
+    names = [column.key for column in api_columns(model)]
+    requested = [name.strip() for name in request.args.get('fields', '').split(',') if name.strip()]
+    unknown = [name for name in requested if name not in names]
+    if unknown:
+        abort(400, f'Unknown fields: {", ".join(unknown)}')
+    # id is always returned; paging and batch writes need it
+    return [getattr(model, name) for name in ['id'] + [name for name in requested or names if name != 'id']]
+
+
+def parse_ids(raw):
+    try:
+        ids = sorted({int(value) for value in raw.split(',') if value.strip()})
+    except ValueError:
+        abort(400, 'ids must be a comma separated list of integers')
+    if len(ids) > current_app.config.get('API_BATCH_MAX', 500):
+        abort(413, f'At most {current_app.config.get("API_BATCH_MAX", 500)} ids per request')
+    return ids
+
+
+# ETag and Last-Modified come from the model versions; an unchanged resource
+# costs this one query
+def versions_statement(version_keys):
+    return select(ModelVersion.key, ModelVersion.version, ModelVersion.updated_at) \
+        .where(ModelVersion.key.in_(version_keys))
+
+
+def conditional(version_rows):
+    versions = sorted((key, version) for key, version, _ in version_rows)
+    etag = hashlib.sha1(repr([request.full_path, response_mimetype(), versions]).encode('utf-8')).hexdigest()
+    last_modified = max((updated_at for _, _, updated_at in version_rows if updated_at), default=None)
+
+    def finish(response):
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return finish(Response(status=304)), finish
+    return None, finish
+
+
+def not_modified(version_keys):
+    return conditional(db.session.execute(versions_statement(version_keys)).all())
+
+
+# The statement for one page (or one ?ids= batch) of a list read, and the page
+# built from its rows; shared with the async handlers in asgi.py
+def list_statement(config):
+    model = config['model']
+    statement = select(*selected_columns(model)).where(live(model))
+    if 'ids' in request.args:
+        return statement.where(model.id.in_(parse_ids(request.args['ids']))).order_by(model.id), None
+
+    for name in config['filters']:
+        if name in request.args:
+            try:
+                statement = statement.where(getattr(model, name) == coerce(model.__table__.c[name], request.args[name]))
+            except ValueError as e:
+                abort(400, str(e))
+
+    limit = request.args.get('limit', current_app.config.get('API_PAGE_SIZE', 100), type=int)
+    limit = max(1, min(limit, current_app.config.get('API_MAX_PAGE_SIZE', 1000)))
+    return keyset_query(statement, [model.id], per_page=limit,
+                        after=request.args.get('after'), before=request.args.get('before'))
+
+
+def list_payload(config, rows, seek):
+    if seek is None:
+        return {'data': [{key: plain(value) for key, value in row._asdict().items()} for row in rows]}
+    page = keyset_page(rows, [config['model'].id], seek)
+    return {
+        'data': [{key: plain(value) for key, value in row._asdict().items()} for row in page.items],
+        'next': page.next_cursor,
+        'prev': page.prev_cursor,
+    }
+
+
+# Change feed: the changes after seq `since`, oldest first. `next` is the since of
+# the following call. With ?wait=N the request waits up to N seconds for a change.
+# 410 means the changes were pruned: resync the tables, then continue from `latest`.
+def changes_args():
+    since = request.args.get('since', 0, type=int)
+    tables = [name for name in request.args.get('tables', '').split(',') if name]
+    unknown = set(tables) - set(TRACKED.values())
+    if unknown:
+        abort(400, f'Unknown tables: {", ".join(sorted(unknown))}')
+    limit = request.args.get('limit', current_app.config.get('CHANGES_PAGE_SIZE', 1000), type=int)
+    limit = max(1, min(limit, current_app.config.get('CHANGES_PAGE_SIZE', 1000)))
+    wait = max(0, min(request.args.get('wait', 0, type=float), current_app.config.get('CHANGES_MAX_WAIT', 30)))
+    return since, tables, limit, wait
+
+
+def pruned_response(latest):
+    return encode({'error': 'Changes after this seq were pruned; resync', 'latest': latest}, 410)
+
+
+def changes_payload(found, since):
+    return {
+        'changes': [change_row(change) for change in found],
+        'next': found[-1].seq if found else since,
+    }
@@ -1,26 +1,81 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from datetime import datetime
+from flask import Flask
+from sqlalchemy import event
+from werkzeug.utils import import_string
 import os
 
-app = Flask(__name__)
-app.config.from_object('config')
+from config import config
+from extensions import db, login_manager
+from lazy import LazyGroup
+from views import register_blueprints
 
-# Initialize extensions
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
-login_manager = LoginManager(app)
-login_manager.login_view = 'login'
+# Modules that hook into the app, session or engine, in registration order; each
+# has an init_app(app). The views behind the blueprints are imported on first request.
+SUBSYSTEMS = (
+    'models',
+    'aggregates',
+    'analytics',
+    'search_index',
+    'stats',
+    'changelog',
+    'user_cache',
+    'loading',
+    'instrumentation',
+)
 
-# Import models and routes
-from models import User, Class, Student, Grade, Attendance
-from routes import *
+# CLI commands, imported only when the command runs
+LAZY_COMMANDS = {
+    'db': 'db_migrate:db_command',
+    'replica-sync': 'db_routing:replica_sync_command',
+    'grades-recompute': 'aggregates:grades_recompute_command',
+    'attendance-summaries-rebuild': 'analytics:attendance_summaries_rebuild_command',
+    'search-rebuild': 'search_index:search_rebuild_command',
+    'changes-prune': 'changelog:changes_prune_command',
+    'import-students': 'importer:import_students_command',
+    'import-grades': 'importer:import_grades_command',
+    'jobs-worker': 'jobs:jobs_worker_command',
+    'attendance-archive': 'archive:attendance_archive_command',
+    'attendance-partitions': 'archive:attendance_partitions_command',
+    'attendance-dedupe': 'dedupe:attendance_dedupe_command',
+    'deleted-purge': 'soft_delete:deleted_purge_command',
+    'passwords-hash-legacy': 'passwords:passwords_hash_legacy_command',
+}
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
+# SQLite connection tuning (applied to every new connection)
+def configure_sqlite(app, engine):
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+# Application factory (FLASK_CONFIG picks development, testing or production)
+def create_app(config_name=None):
+    config_name = config_name or os.environ.get('FLASK_CONFIG') or 'default'
+
+    app = Flask(__name__)
+    app.config.from_object(config[config_name])
+    # Job worker processes build their app from the same config
+    app.config['CONFIG_NAME'] = config_name
+
+    db.init_app(app)
+    login_manager.init_app(app)
+
+    app.cli = LazyGroup(app.cli.name, lazy_commands=LAZY_COMMANDS)
+    register_blueprints(app)
+    for name in SUBSYSTEMS:
+        import_string(name).init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_sqlite(app, engine)
+
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app = create_app()
+    app.run(debug=app.config['DEBUG'])
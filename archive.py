@@ -0,0 +1,166 @@
+import json
+import zlib
+from datetime import date, timedelta
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, insert, delete, func, text
+from extensions import db
+from models import Attendance, AttendanceArchive, bump_versions, live
+from analytics import STATUSES, academic_year_range, academic_year_of, archived_until
+from changelog import log_changes_from
+
+# Attendance storage by academic year.
+# Live records stay in the attendance table (on PostgreSQL a table partitioned by
+# academic year, see `flask attendance-partitions`). Once a year is closed,
+# `flask attendance-archive` packs each student's records for that year into one
+# compressed attendance_archive row with the status counts alongside, and deletes
+# the live rows. Archived years are read-only; student_detail unpacks them on demand.
+# The daily summaries are left in place, so the reports still cover archived years.
+# Records of deleted students (see soft_delete.py) are archived with the others.
+
+
+# Records are stored as [day offset from August 1st, status, notes] triples
+def pack_records(academic_year, records):
+    start, _ = academic_year_range(academic_year)
+    rows = [[(day - start).days, status, notes or None] for day, status, notes in sorted(records)]
+    return zlib.compress(json.dumps(rows, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def unpack_records(archive):
+    start, _ = academic_year_range(archive.academic_year)
+    rows = json.loads(zlib.decompress(archive.data).decode('utf-8'))
+    return [
+        {'date': start + timedelta(days=offset), 'status': status, 'notes': notes}
+        for offset, status, notes in rows
+    ]
+
+
+def archive_row(student_id, academic_year, records):
+    row = {status: 0 for status in STATUSES}
+    for _, status, _ in records:
+        if status in row:
+            row[status] += 1
+    row.update(student_id=student_id, academic_year=academic_year, total=len(records),
+               data=pack_records(academic_year, records))
+    return row
+
+
+# Archive one chunk of students in its own transaction, so an interrupted run can
+# simply be started again. Records already archived for a student are merged in.
+def archive_students(connection, academic_year, student_ids):
+    start, end = academic_year_range(academic_year)
+    in_year = (Attendance.student_id.in_(student_ids), Attendance.date.between(start, end))
+
+    records = {}
+    for student_id, day, status, notes in connection.execute(
+            select(Attendance.student_id, Attendance.date, Attendance.status, Attendance.notes).where(*in_year)):
+        records.setdefault(student_id, {})[day] = (day, status, notes)
+
+    table = AttendanceArchive.__table__
+    existing = connection.execute(
+        select(AttendanceArchive).where(AttendanceArchive.student_id.in_(records),
+                                        AttendanceArchive.academic_year == academic_year)
+    ).all()
+    for archive in existing:
+        for record in unpack_records(archive):
+            records[archive.student_id].setdefault(record['date'], (record['date'], record['status'], record['notes']))
+
+    if existing:
+        connection.execute(delete(table).where(table.c.id.in_([archive.id for archive in existing])))
+    connection.execute(insert(table), [
+        archive_row(student_id, academic_year, list(days.values())) for student_id, days in records.items()
+    ])
+    log_changes_from(connection, 'attendance', 'delete', select(Attendance.id).where(*in_year, live(Attendance)))
+    connection.execute(delete(Attendance.__table__).where(*in_year))
+    bump_versions(connection, ['table:attendance', *(f'student:{student_id}' for student_id in records)])
+    return sum(len(days) for days in records.values())
+
+
+# Years are archived oldest first: reads and summaries treat everything up to the
+# newest archived year as archived (see analytics.archived_until)
+def archive_year(academic_year, chunk_size=500, echo=click.echo):
+    start, end = academic_year_range(academic_year)
+    older = db.session.execute(
+        select(func.min(Attendance.date)).where(Attendance.date < start).execution_options(include_deleted=True)
+    ).scalar()
+    if older is not None:
+        raise click.ClickException(
+            f'{academic_year_of(older)} still has live attendance records; archive it before {academic_year}')
+    student_ids = db.session.scalars(
+        select(Attendance.student_id).where(Attendance.date.between(start, end))
+        .distinct().order_by(Attendance.student_id).execution_options(include_deleted=True)
+    ).all()
+    db.session.remove()
+
+    archived = 0
+    for i in range(0, len(student_ids), chunk_size):
+        with db.engine.begin() as connection:
+            archived += archive_students(connection, academic_year, student_ids[i:i + chunk_size])
+        echo(f'{academic_year}: {min(i + chunk_size, len(student_ids))}/{len(student_ids)} students')
+
+    if db.engine.dialect.name == 'postgresql':
+        # The year's partition is empty now; dropping it is cheaper than vacuuming it
+        with db.engine.begin() as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {partition_name(academic_year)}'))
+    return archived
+
+
+# PostgreSQL partitions
+def partition_name(academic_year):
+    return 'attendance_' + academic_year.replace('-', '_')
+
+
+def create_partition(connection, academic_year):
+    start, end = academic_year_range(academic_year)
+    connection.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {partition_name(academic_year)} PARTITION OF attendance '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{(end + timedelta(days=1)).isoformat()}')"
+    ))
+
+
+@click.command('attendance-archive')
+@click.option('--year', 'years', multiple=True, help="Academic year to archive, e.g. 2023-2024 (repeatable).")
+@click.option('--keep', type=int, default=1, show_default=True,
+              help='Closed years to keep live when no --year is given.')
+@click.option('--chunk-size', type=int, default=500, show_default=True, help='Students per transaction.')
+@with_appcontext
+def attendance_archive_command(years, keep, chunk_size):
+    """Move the attendance records of closed academic years into the compressed archive."""
+    current = academic_year_of(date.today())
+    if not years:
+        oldest = db.session.execute(
+            select(func.min(Attendance.date)).execution_options(include_deleted=True)).scalar()
+        if oldest is None:
+            click.echo('No attendance records to archive')
+            return
+        first, last = int(academic_year_of(oldest)[:4]), int(current[:4]) - keep
+        years = [f'{year}-{year + 1}' for year in range(first, last)]
+
+    for academic_year in sorted(years):
+        try:
+            _, end = academic_year_range(academic_year)
+        except ValueError:
+            raise click.BadParameter(f'{academic_year} is not an academic year like 2023-2024', param_hint='--year')
+        if end >= date.today():
+            raise click.ClickException(f'{academic_year} is not closed yet')
+        total = archive_year(academic_year, chunk_size)
+        click.echo(f'Archived {total} attendance records of {academic_year}')
+
+
+@click.command('attendance-partitions')
+@click.option('--ahead', type=int, default=1, show_default=True, help='Academic years to create after the current one.')
+@with_appcontext
+def attendance_partitions_command(ahead):
+    """Create the yearly attendance partitions (PostgreSQL only)."""
+    if db.engine.dialect.name != 'postgresql':
+        raise click.ClickException('Attendance is only partitioned on PostgreSQL')
+
+    first = int(academic_year_of(date.today())[:4])
+    cutoff = archived_until()
+    with db.engine.begin() as connection:
+        for year in range(first, first + ahead + 1):
+            academic_year = f'{year}-{year + 1}'
+            if cutoff is not None and academic_year_range(academic_year)[1] <= cutoff:
+                continue
+            create_partition(connection, academic_year)
+            click.echo(f'Partition {partition_name(academic_year)} ready')
@@ -0,0 +1,304 @@
+# ASGI entry point:
+#   uvicorn asgi:application --workers 4
+#   gunicorn -k uvicorn.workers.UvicornWorker -c gunicorn.conf.py asgi:application
+# Requests that mostly wait are served by coroutines on an async engine (aiosqlite
+# or asyncpg): the change feed long-poll, exports streamed to slow clients, the
+# JSON API list reads and the student autocomplete search. A waiting client then
+# holds a socket instead of a thread.
+# They are routed by the Flask app's URL map and go through the app like its own
+# views: the before/after request hooks (instrumentation, query budgets, the API
+# token check, Flask-Login), the error handlers, the session cookie and teardown
+# run as for any request, in the thread pool, while the view body is awaited on
+# the event loop. Everything else is served by the Flask app through asgiref's
+# WSGI adapter in the same thread pool, like under gunicorn.
+import os
+
+os.environ.setdefault('FLASK_CONFIG', 'production')
+
+import asyncio
+import io
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi
+from flask import Response, abort, current_app, jsonify, request, request_started, session
+from flask_login import current_user
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.exceptions import HTTPException
+
+from app import create_app, configure_sqlite
+from extensions import db
+from api import (changes_args, changes_payload, conditional, encode, get_resource, list_payload, list_statement,
+                 pruned_response, versions_statement)
+from changelog import OLDEST_SEQ, LATEST_SEQ, changes_statement, is_pruned
+from exporter import (EXPORT_FORMATS, EXPORT_QUERIES, ENCODERS, ExportFilterError, gzip_compressor,
+                      parse_export_filters)
+from db_routing import PRIMARY_UNTIL_KEY, replica_binds
+from search_index import get_backend, autocomplete_args, autocomplete_statement, autocomplete_payload
+
+app = create_app()
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+
+# One async engine per bind, on the same databases as the Flask-SQLAlchemy engines
+def create_async_engines():
+    engines = {}
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    with app.app_context():
+        for key in [None] + replica_binds(app):
+            url = db.engines[key].url
+            driver = ASYNC_DRIVERS.get(url.get_backend_name())
+            if driver is None:
+                raise RuntimeError(f'No async driver for {url.get_backend_name()} databases')
+            engine = create_async_engine(url.set(drivername=driver), **options)
+            configure_sqlite(app, engine.sync_engine)
+            engines[key] = engine
+    return engines
+
+
+engines = create_async_engines()
+
+
+# Reads follow the same rules as use_replica
+def read_engine():
+    replicas = [key for key in engines if key is not None]
+    if replicas and session.get(PRIMARY_UNTIL_KEY, 0) < time.time():
+        return engines[random.choice(replicas)]
+    return engines[None]
+
+
+# Synchronous app code (hooks, the user loader, error handlers) runs in the thread
+# pool, with the request context of the calling coroutine
+def in_thread(func):
+    return sync_to_async(func, thread_sensitive=False)
+
+
+def check_login():
+    if not current_user.is_authenticated:
+        return current_app.login_manager.unauthorized()
+
+
+# The @login_required of the Flask view
+def login_required(view):
+    @wraps(view)
+    async def wrapper(**kwargs):
+        response = await in_thread(check_login)()
+        if response is not None:
+            return response
+        return await view(**kwargs)
+    return wrapper
+
+
+# A response whose body is sent from an async iterator once the headers are out
+class StreamingResponse(Response):
+    def __init__(self, chunks, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks = chunks
+
+
+# Views, keyed by the endpoint of the Flask view they stand in for; the API views
+# are checked by the api blueprint's before_request (token or login)
+async def list_resource(resource):
+    config = get_resource(resource)
+    async with read_engine().connect() as connection:
+        versions = await connection.execute(versions_statement([f'table:{config["model"].__table__.name}']))
+        response, finish = conditional(versions.all())
+        if response is None:
+            statement, seek = list_statement(config)
+            rows = await connection.execute(statement)
+            response = finish(encode(list_payload(config, rows.all(), seek)))
+    return response
+
+
+async def changes():
+    since, tables, limit, wait = changes_args()
+    engine = engines[None]
+    async with engine.connect() as connection:
+        if is_pruned(since, await connection.scalar(OLDEST_SEQ)):
+            return pruned_response(await connection.scalar(LATEST_SEQ) or 0)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    interval = app.config.get('CHANGES_POLL_INTERVAL', 1)
+    while True:
+        async with engine.connect() as connection:
+            found = (await connection.execute(changes_statement(since, tables, limit))).all()
+        remaining = deadline - loop.time()
+        if found or remaining <= 0:
+            break
+        await asyncio.sleep(min(interval, remaining))
+    return encode(changes_payload(found, since))
+
+
+# The search backends run their statements on a sync connection (run_sync)
+@login_required
+async def autocomplete():
+    term, limit = autocomplete_args()
+    if not term or limit < 1:
+        return jsonify([])
+    async with read_engine().connect() as connection:
+        ids = await connection.run_sync(get_backend().search, term, limit, 0)
+        rows = (await connection.execute(autocomplete_statement(ids))).all() if ids else []
+    return jsonify(autocomplete_payload(ids, rows))
+
+
+@login_required
+async def export(kind):
+    if kind not in EXPORT_QUERIES:
+        abort(404)
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        abort(400, f'Unknown export format: {fmt}')
+    try:
+        filters = parse_export_filters(request.args)
+    except ExportFilterError as e:
+        abort(400, str(e))
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    filename = f'{kind}.{fmt}' + ('.gz' if compress else '')
+    chunk_size = app.config.get('EXPORT_CHUNK_SIZE', 1000)
+
+    async def chunks():
+        async with read_engine().connect() as connection:
+            result = await connection.stream(EXPORT_QUERIES[kind](filters).execution_options(yield_per=chunk_size))
+            columns = list(result.keys())
+            header, encode_rows = ENCODERS[fmt]
+            compressor = gzip_compressor() if compress else None
+
+            def encoded(text):
+                data = text.encode('utf-8')
+                return compressor.compress(data) if compressor is not None else data
+
+            if header:
+                yield encoded(header(columns))
+            async for rows in result.partitions():
+                yield encoded(encode_rows(columns, rows))
+            if compressor is not None:
+                yield compressor.flush()
+
+    return StreamingResponse(
+        chunks(),
+        mimetype='application/gzip' if compress else EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+ASYNC_VIEWS = {
+    'api.list_resource': list_resource,
+    'api.changes': changes,
+    'students.student_autocomplete': autocomplete,
+    'admin.export': export,
+}
+
+
+def build_environ(scope):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope["http_version"]}',
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def before_view():
+    request_started.send(app, _async_wrapper=app.ensure_sync)
+    return app.preprocess_request()
+
+
+async def send_response(send, response):
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()],
+    })
+    chunks = getattr(response, 'chunks', None)
+    if chunks is not None:
+        # Each chunk waits for the client to take the previous one; a slow reader holds no thread
+        async for data in chunks:
+            if data:
+                await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    else:
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+# Flask's wsgi_app and full_dispatch_request, with the view awaited
+async def dispatch(environ, view, view_args, send):
+    ctx = app.request_context(environ)
+    error = None
+    ctx.push()
+    try:
+        try:
+            try:
+                response = await in_thread(before_view)()
+                if response is None:
+                    response = await view(**view_args)
+            except Exception as e:
+                response = await in_thread(app.handle_user_exception)(e)
+            response = await in_thread(app.finalize_request)(response)
+        except Exception as e:
+            error = e
+            response = await in_thread(app.handle_exception)(e)
+        await send_response(send, response)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        ctx.pop(error)
+
+
+wsgi_application = WsgiToAsgi(app)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # The pool the Flask app runs in (one thread per in-flight WSGI request)
+            threads = int(os.environ.get('ASGI_THREADS') or 16)
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(threads))
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            for engine in engines.values():
+                await engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        environ = build_environ(scope)
+        try:
+            endpoint, view_args = app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            endpoint = None
+        view = ASYNC_VIEWS.get(endpoint)
+        if view is not None:
+            return await dispatch(environ, view, view_args, send)
+
+    await wsgi_application(scope, receive, send)
@@ -0,0 +1,170 @@
+# Concurrent connection capacity of one server process, threaded WSGI vs ASGI.
+#   python -m bench.connections --database-url sqlite:///bench.sqlite --connections 500
+# Starts each server on its own, parks --connections clients in the change feed
+# long-poll (?wait=--hold) and meanwhile times short API reads on a fresh
+# connection. Reported per server: long-polls answered, failed connections,
+# latency of the reads while the long-polls are held, peak threads and peak RSS.
+# The ASGI run needs uvicorn, asgiref and aiosqlite (or asyncpg).
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import click
+
+from bench.run import percentile
+
+TOKEN = 'bench-connections'
+
+SERVERS = {
+    # The threaded development server behind `python app.py`: one thread per connection
+    'threaded': lambda port: [
+        sys.executable, '-c',
+        'import logging\n'
+        'from werkzeug.serving import run_simple\n'
+        'from app import create_app\n'
+        'logging.getLogger("werkzeug").setLevel(logging.WARNING)\n'
+        f'run_simple("127.0.0.1", {port}, create_app(), threaded=True)',
+    ],
+    'asgi': lambda port: [
+        sys.executable, '-m', 'uvicorn', 'asgi:application',
+        '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning', '--backlog', '4096',
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_listening(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise click.ClickException('The server exited during startup')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise click.ClickException('The server did not start listening')
+
+
+# Current threads and peak RSS of the server (Linux only)
+def process_status(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+    except OSError:
+        return None, None
+    return int(fields['Threads']), int(fields['VmHWM'].split()[0]) / 1024
+
+
+async def get(port, path, timeout):
+    request = (
+        f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {TOKEN}\r\n'
+        'Connection: close\r\n\r\n'
+    ).encode('ascii')
+    reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+    try:
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def long_poll(port, since, hold, results):
+    try:
+        status = await get(port, f'/api/v1/changes?since={since}&wait={hold}', hold + 30)
+        results['answered' if status == 200 else 'failed'] += 1
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        results['failed'] += 1
+
+
+async def probe(port, pid, deadline, latencies, results):
+    while time.monotonic() < deadline:
+        threads, _ = process_status(pid)
+        if threads is not None:
+            results['threads'] = max(results['threads'] or 0, threads)
+        started = time.perf_counter()
+        try:
+            status = await get(port, '/api/v1/classes?limit=1', 30)
+        except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+            status = None
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            results['probe_errors'] += 1
+        await asyncio.sleep(0.05)
+
+
+async def load(port, pid, since, connections, hold):
+    results = {'answered': 0, 'failed': 0, 'probe_errors': 0, 'threads': None}
+    latencies = []
+    polls = [asyncio.create_task(long_poll(port, since, hold, results)) for _ in range(connections)]
+    await asyncio.sleep(min(1.0, hold / 4))  # let the long-polls connect
+    await probe(port, pid, time.monotonic() + hold / 2, latencies, results)
+    await asyncio.gather(*polls)
+    return results, sorted(latencies)
+
+
+def run_server(name, since, connections, hold):
+    port = free_port()
+    env = dict(os.environ, API_TOKEN=TOKEN, INSTRUMENTATION_ENABLED='0')
+    process = subprocess.Popen(SERVERS[name](port), env=env)
+    try:
+        wait_until_listening(port, process)
+        results, latencies = asyncio.run(load(port, process.pid, since, connections, hold))
+        _, peak_rss = process_status(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    results.update(
+        probe_p50_ms=percentile(latencies, 0.50) * 1000,
+        probe_p95_ms=percentile(latencies, 0.95) * 1000,
+        peak_rss_mb=peak_rss,
+    )
+    return results
+
+
+@click.command()
+@click.option('--database-url', help='Database to serve (defaults to DATABASE_URL).')
+@click.option('--server', 'servers', multiple=True, type=click.Choice(sorted(SERVERS)),
+              help='Servers to measure (repeatable; default all).')
+@click.option('--connections', type=int, default=500, show_default=True, help='Long-poll clients held at once.')
+@click.option('--hold', type=float, default=10.0, show_default=True, help='Seconds each long-poll waits.')
+def main(database_url, servers, connections, hold):
+    """Compare how many waiting clients one threaded WSGI and one ASGI process carry."""
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('FLASK_CONFIG', 'development')
+
+    from app import create_app
+    from changelog import latest_seq
+    app = create_app()
+    with app.app_context():
+        since = latest_seq()
+
+    click.echo(f'{connections} long-polls held {hold:.0f}s, reads probed meanwhile')
+    click.echo(f'{"server":<10}{"answered":>10}{"failed":>8}{"probe p50":>11}{"probe p95":>11}'
+               f'{"probe err":>11}{"threads":>9}{"peak RSS":>10}')
+    for name in servers or SERVERS:
+        try:
+            r = run_server(name, since, connections, hold)
+        except click.ClickException as e:
+            click.echo(f'{name:<10}  skipped: {e.message}')
+            continue
+        threads = '-' if r['threads'] is None else r['threads']
+        rss = '-' if r['peak_rss_mb'] is None else f'{r["peak_rss_mb"]:.0f} MB'
+        click.echo(f'{name:<10}{r["answered"]:>10}{r["failed"]:>8}{r["probe_p50_ms"]:>9.1f}ms'
+                   f'{r["probe_p95_ms"]:>9.1f}ms{r["probe_errors"]:>11}{threads:>9}{rss:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+# Synthetic school data for benchmarks.
+#   python -m bench.generate --scale large --database-url sqlite:///bench.sqlite
+# Rows go in through executemany batches (bypassing the ORM), then the search
+# index and the grade/attendance summaries are rebuilt in one pass each.
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import click
+
+SCALES = {
+    # classes, students, grades per student, school days of attendance
+    'small': (5, 500, 10, 20),
+    'medium': (30, 5000, 20, 100),
+    'large': (100, 50000, 40, 200),
+}
+
+FIRST_NAMES = ['Wei', 'Fang', 'Lei', 'Jing', 'Min', 'Tao', 'Yan', 'Hui', 'Anna', 'James', 'Maria',
+               'David', 'Sofia', 'Lucas', 'Emma', 'Noah', 'Olivia', 'Liam', 'Mia', 'Ethan']
+LAST_NAMES = ['Wang', 'Li', 'Zhang', 'Liu', 'Chen', 'Yang', 'Huang', 'Zhao', 'Wu', 'Zhou',
+              'Smith', 'Johnson', 'Garcia', 'Brown', 'Martin', 'Lopez', 'Wilson', 'Taylor']
+SUBJECTS = ['Math', 'Chinese', 'English', 'Physics', 'Chemistry', 'Biology', 'History', 'Geography']
+SEMESTERS = ['1st', '2nd']
+STATUS_WEIGHTS = (('present', 90), ('late', 5), ('absent', 3), ('excused', 2))
+
+BENCH_USERNAME = 'bench'
+BENCH_PASSWORD = 'bench'
+
+
+def letter(score):
+    for bound, grade in ((90, 'A'), (80, 'B'), (70, 'C'), (60, 'D')):
+        if score >= bound:
+            return grade
+    return 'F'
+
+
+def school_days(end, count):
+    days = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return sorted(days)
+
+
+def academic_terms(grades_per_student):
+    # Spread a student's grades over consecutive terms, one grade per subject each
+    terms = max(1, -(-grades_per_student // len(SUBJECTS)))
+    years = [f'{2025 - i // 2}-{2026 - i // 2}' for i in range(terms)]
+    return [(years[i], SEMESTERS[i % 2]) for i in range(terms)]
+
+
+def insert_batches(connection, table, rows, batch_size):
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            connection.execute(table.insert(), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        connection.execute(table.insert(), batch)
+        total += len(batch)
+    return total
+
+
+def generate(db, classes, students, grades_per_student, days, seed, batch_size, echo=click.echo):
+    from models import User, Class, Student, Grade, Attendance
+    from passwords import hash_password
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    statuses, weights = zip(*STATUS_WEIGHTS)
+
+    with db.engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{
+            'username': BENCH_USERNAME, 'email': 'bench@example.com', 'password': hash_password(BENCH_PASSWORD),
+            'first_name': 'Bench', 'last_name': 'User', 'is_admin': True, 'created_at': now
+        }])
+
+        connection.execute(Class.__table__.insert(), [
+            {'name': f'Class {i + 1:03d}', 'description': f'Synthetic class {i + 1}', 'created_at': now}
+            for i in range(classes)
+        ])
+        class_ids = [row[0] for row in connection.execute(Class.__table__.select().with_only_columns(Class.id))]
+
+        def student_rows():
+            for i in range(students):
+                yield {
+                    'student_id': f'S{i + 1:07d}',
+                    'first_name': rng.choice(FIRST_NAMES),
+                    'last_name': rng.choice(LAST_NAMES),
+                    'gender': rng.choice(('Male', 'Female')),
+                    'date_of_birth': date(2008, 1, 1) + timedelta(days=rng.randrange(3 * 365)),
+                    'email': f'student{i + 1}@example.com',
+                    'class_id': class_ids[i % len(class_ids)],
+                    'created_at': now
+                }
+
+        started = time.perf_counter()
+        insert_batches(connection, Student.__table__, student_rows(), batch_size)
+        student_ids = [row[0] for row in connection.execute(Student.__table__.select().with_only_columns(Student.id))]
+        echo(f'{len(student_ids)} students in {time.perf_counter() - started:.1f}s')
+
+        terms = academic_terms(grades_per_student)
+
+        def grade_rows():
+            for student_id in student_ids:
+                ability = rng.gauss(75, 10)
+                for n in range(grades_per_student):
+                    academic_year, semester = terms[n // len(SUBJECTS) % len(terms)]
+                    score = round(min(100, max(0, rng.gauss(ability, 8))), 1)
+                    yield {
+                        'student_id': student_id,
+                        'subject': SUBJECTS[n % len(SUBJECTS)],
+                        'score': score,
+                        'grade': letter(score),
+                        'semester': semester,
+                        'academic_year': academic_year,
+                        'created_at': now
+                    }
+
+        started = time.perf_counter()
+        total = insert_batches(connection, Grade.__table__, grade_rows(), batch_size)
+        echo(f'{total} grades in {time.perf_counter() - started:.1f}s')
+
+        calendar = school_days(date.today(), days)
+
+        def attendance_rows():
+            for student_id in student_ids:
+                for day, status in zip(calendar, rng.choices(statuses, weights, k=len(calendar))):
+                    yield {'student_id': student_id, 'date': day, 'status': status, 'created_at': now}
+
+        started = time.perf_counter()
+        total = insert_batches(connection, Attendance.__table__, attendance_rows(), batch_size)
+        echo(f'{total} attendance records in {time.perf_counter() - started:.1f}s')
+
+
+def rebuild_derived(db, echo=click.echo):
+    import aggregates
+    import analytics
+    from search_index import get_backend
+
+    started = time.perf_counter()
+    with db.engine.begin() as connection:
+        get_backend().rebuild(connection)
+        aggregates.recompute_all(connection)
+        analytics.recompute_all(connection)
+    echo(f'Search index and summaries rebuilt in {time.perf_counter() - started:.1f}s')
+
+
+@click.command()
+@click.option('--scale', type=click.Choice(sorted(SCALES)), default='small', show_default=True)
+@click.option('--classes', type=int, help='Override the number of classes.')
+@click.option('--students', type=int, help='Override the number of students.')
+@click.option('--grades-per-student', type=int, help='Override the grades per student.')
+@click.option('--days', type=int, help='Override the school days of attendance per student.')
+@click.option('--database-url', help='Target database (defaults to DATABASE_URL).')
+@click.option('--seed', type=int, default=1, show_default=True)
+@click.option('--batch-size', type=int, default=10000, show_default=True)
+@click.option('--drop/--no-drop', default=False, help='Drop all tables first.')
+def main(scale, classes, students, grades_per_student, days, database_url, seed, batch_size, drop):
+    """Fill the database with synthetic classes, students, grades and attendance."""
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+
+    from app import create_app
+    from extensions import db
+    from models import User
+
+    app = create_app()
+
+    default_classes, default_students, default_grades, default_days = SCALES[scale]
+    classes = classes or default_classes
+    students = students or default_students
+    grades_per_student = default_grades if grades_per_student is None else grades_per_student
+    days = default_days if days is None else days
+
+    with app.app_context():
+        if drop:
+            db.drop_all()
+        db.create_all()
+        if db.session.query(User.id).limit(1).first() is not None:
+            raise click.ClickException('Database is not empty; use --drop to start over.')
+        db.session.remove()
+
+        click.echo(f'Generating {classes} classes, {students} students, '
+                   f'{students * grades_per_student} grades, {students * days} attendance records')
+        started = time.perf_counter()
+        generate(db, classes, students, grades_per_student, days, seed, batch_size)
+        rebuild_derived(db)
+        click.echo(f'Done in {time.perf_counter() - started:.1f}s (log in as {BENCH_USERNAME}/{BENCH_PASSWORD})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# Cold start: import time of each entry point, checked against a budget.
+#   python -m bench.imports
+#   python -m bench.imports --repeat 10 --budget app=500 --budget cli=600 --top 15
+# Each target starts a fresh interpreter under `python -X importtime` (best of
+# --repeat runs); reported per target are the total import time, the wall time of
+# the process and the modules with the most import time of their own. Exits with
+# status 1 when a target goes over its time budget (milliseconds) or imports more
+# modules than allowed; the module count does not vary between machines, so it
+# catches an eager import sneaking back onto the start-up path even on a noisy CI box.
+import os
+import re
+import subprocess
+import sys
+import time
+
+import click
+
+TARGETS = {
+    # A web worker (gunicorn/waitress import wsgi:app)
+    'wsgi': ['-c', 'import wsgi'],
+    # The app factory alone, as scripts and the job worker processes build the app
+    'app': ['-c', 'from app import create_app; create_app()'],
+    # A light CLI command: loads the app, runs nothing heavy
+    'cli': ['-m', 'flask', 'routes'],
+}
+
+# Milliseconds; leaves headroom over the measured numbers for slower machines
+BUDGETS = {
+    'wsgi': 750,
+    'app': 750,
+    'cli': 800,
+}
+
+# Modules imported (about 535 with the views, Alembic and the CLI-only modules deferred)
+MODULE_BUDGETS = {
+    'wsgi': 560,
+    'app': 560,
+    'cli': 560,
+}
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+# Self and cumulative microseconds per module; the total is the sum of the top-level imports
+def parse_importtime(stderr):
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match is None:
+            continue
+        own, cumulative, indent, name = match.groups()
+        # A module can be listed twice (imported again while its package initialises)
+        modules[name] = max(modules.get(name, (0, 0)), (int(own), int(cumulative)))
+        if not indent:
+            total += int(cumulative)
+    return total, modules
+
+
+def run_target(name, env):
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', *TARGETS[name]],
+                             env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if process.returncode != 0:
+        raise click.ClickException(f'{name} failed:\n{process.stderr[-2000:]}')
+    total, modules = parse_importtime(process.stderr)
+    return total, wall, modules
+
+
+def parse_budgets(values):
+    budgets = dict(BUDGETS)
+    for value in values:
+        name, _, limit = value.partition('=')
+        if name not in TARGETS or not limit.isdigit():
+            raise click.BadParameter(f'expected TARGET=MS with TARGET one of {", ".join(TARGETS)}: {value}')
+        budgets[name] = int(limit)
+    return budgets
+
+
+@click.command()
+@click.option('--database-url', help='Database the app is configured with (defaults to DATABASE_URL).')
+@click.option('--target', 'targets', multiple=True, type=click.Choice(sorted(TARGETS)),
+              help='Entry points to measure (repeatable; default all).')
+@click.option('--repeat', type=int, default=5, show_default=True, help='Runs per target; the fastest counts.')
+@click.option('--budget', 'budget_values', multiple=True, metavar='TARGET=MS',
+              help='Override a target budget in milliseconds (repeatable).')
+@click.option('--top', type=int, default=10, show_default=True, help='Slowest modules listed per target.')
+def main(database_url, targets, repeat, budget_values, top):
+    """Measure the import time of the app entry points against their budgets."""
+    budgets = parse_budgets(budget_values)
+    env = dict(os.environ, FLASK_APP='app')
+    if database_url:
+        env['DATABASE_URL'] = database_url
+    env.setdefault('FLASK_CONFIG', 'development')
+
+    over = []
+    for name in targets or TARGETS:
+        runs = [run_target(name, env) for _ in range(max(repeat, 1))]
+        total, _, modules = min(runs, key=lambda run: run[0])
+        wall = min(run[1] for run in runs)
+        total_ms = total / 1000
+        status = 'ok' if total_ms <= budgets[name] and len(modules) <= MODULE_BUDGETS[name] else 'OVER'
+        click.echo(f'{name}: imports {total_ms:.0f}ms (budget {budgets[name]}ms), '
+                   f'{len(modules)} modules (budget {MODULE_BUDGETS[name]}), process {wall * 1000:.0f}ms: {status}')
+        for module, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][0])[:top]:
+            click.echo(f'  {own / 1000:>8.1f}ms  {cumulative / 1000:>8.1f}ms  {module}')
+        if status == 'OVER':
+            over.append(name)
+
+    if over:
+        click.echo(f'Over budget: {", ".join(over)}')
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
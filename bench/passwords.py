@@ -0,0 +1,69 @@
+# Login cost per password hashing setting.
+#   python -m bench.passwords --seconds 3
+# For each setting: verifications per second on one core, and the throughput of the
+# bounded hashing pool with all cores busy. Use it to pick the highest cost that
+# still carries the morning login spike.
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+SETTINGS = {
+    'pbkdf2-100k': {'PASSWORD_HASH_METHOD': 'pbkdf2', 'PASSWORD_PBKDF2_ITERATIONS': 100000},
+    'pbkdf2-300k': {'PASSWORD_HASH_METHOD': 'pbkdf2', 'PASSWORD_PBKDF2_ITERATIONS': 300000},
+    'pbkdf2-600k': {'PASSWORD_HASH_METHOD': 'pbkdf2', 'PASSWORD_PBKDF2_ITERATIONS': 600000},
+    'scrypt-16k': {'PASSWORD_HASH_METHOD': 'scrypt', 'PASSWORD_SCRYPT_N': 16384},
+    'scrypt-32k': {'PASSWORD_HASH_METHOD': 'scrypt', 'PASSWORD_SCRYPT_N': 32768},
+    'scrypt-64k': {'PASSWORD_HASH_METHOD': 'scrypt', 'PASSWORD_SCRYPT_N': 65536},
+    'argon2-19m': {'PASSWORD_HASH_METHOD': 'argon2', 'PASSWORD_ARGON2_TIME_COST': 2, 'PASSWORD_ARGON2_MEMORY_COST': 19456},
+    'argon2-64m': {'PASSWORD_HASH_METHOD': 'argon2', 'PASSWORD_ARGON2_TIME_COST': 3, 'PASSWORD_ARGON2_MEMORY_COST': 65536},
+}
+
+PASSWORD = 'correct horse battery staple'
+
+
+def verifications_per_second(verify, stored, seconds, workers):
+    deadline = time.perf_counter() + seconds
+
+    def loop(_):
+        count = 0
+        while time.perf_counter() < deadline:
+            verify(stored, PASSWORD)
+            count += 1
+        return count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        total = sum(executor.map(loop, range(workers)))
+    return total / (time.perf_counter() - started)
+
+
+@click.command()
+@click.option('--setting', 'settings', multiple=True, type=click.Choice(sorted(SETTINGS)),
+              help='Settings to measure (repeatable; default all).')
+@click.option('--seconds', type=float, default=3.0, show_default=True, help='Measuring time per setting and mode.')
+@click.option('--workers', type=int, default=os.cpu_count() or 1, show_default=True, help='Pool size for the parallel run.')
+def main(settings, seconds, workers):
+    """Measure logins per second per core for each password hashing setting."""
+    from passwords import create_hasher, verify_hash
+
+    click.echo(f'{"setting":<14}{"hash ms":>10}{"logins/s/core":>16}{f"logins/s ({workers} thr)":>22}')
+    for name in settings or SETTINGS:
+        try:
+            hasher = create_hasher(SETTINGS[name])
+        except ValueError as e:
+            click.echo(f'{name:<14}  skipped: {e}')
+            continue
+
+        started = time.perf_counter()
+        stored = hasher.hash(PASSWORD)
+        hash_ms = (time.perf_counter() - started) * 1000
+
+        single = verifications_per_second(verify_hash, stored, seconds, 1)
+        parallel = verifications_per_second(verify_hash, stored, seconds, workers)
+        click.echo(f'{name:<14}{hash_ms:>10.1f}{single:>16.1f}{parallel:>22.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+# Route benchmarks through the Flask test client.
+#   python -m bench.run --database-url sqlite:///bench.sqlite
+#   python -m bench.run --concurrency 8 --duration 30 --baseline bench/baseline.json
+# Each scenario reports latency percentiles, throughput and queries per request;
+# the run reports peak RSS. --save-baseline stores the results for later comparison.
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from bench.generate import BENCH_USERNAME, BENCH_PASSWORD, LAST_NAMES
+
+
+class Context:
+    def __init__(self, student_ids, class_ids, seed):
+        self.student_ids = student_ids
+        self.class_ids = class_ids
+        self.rng = random.Random(seed)
+
+    def student(self):
+        return self.rng.choice(self.student_ids)
+
+    def class_(self):
+        return self.rng.choice(self.class_ids)
+
+
+# Scenario name -> URL builder
+SCENARIOS = {
+    'index': lambda ctx: '/index',
+    'students': lambda ctx: '/students',
+    'student_detail': lambda ctx: f'/student/{ctx.student()}',
+    'classes': lambda ctx: '/classes',
+    'class_detail': lambda ctx: f'/class/{ctx.class_()}',
+    'class_leaderboard': lambda ctx: f'/class/{ctx.class_()}/leaderboard',
+    'grades': lambda ctx: '/grades',
+    'attendance': lambda ctx: '/attendance',
+    'search': lambda ctx: f'/search?q={ctx.rng.choice(LAST_NAMES)}',
+    'autocomplete': lambda ctx: f'/api/students/autocomplete?q={ctx.rng.choice(LAST_NAMES)[:2]}',
+    'attendance_report': lambda ctx: f'/reports/attendance?group=week&class_id={ctx.class_()}&format=json',
+    'export_grades': lambda ctx: f'/export/grades?class_id={ctx.class_()}',
+}
+
+
+# Statements per request: the test client runs the view in the calling thread
+query_counter = threading.local()
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    query_counter.value = getattr(query_counter, 'value', 0) + 1
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, queries, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p90_ms': percentile(latencies, 0.90) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        'queries': statistics.fmean(queries) if queries else 0.0,
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def logged_in_client(app):
+    client = app.test_client()
+    response = client.post('/login', data={'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+    if response.status_code != 302:
+        raise click.ClickException(f'Login as {BENCH_USERNAME} failed; run python -m bench.generate first')
+    return client
+
+
+def timed_get(client, url):
+    query_counter.value = 0
+    started = time.perf_counter()
+    response = client.get(url)
+    response.get_data()  # drain streamed responses
+    elapsed = time.perf_counter() - started
+    return elapsed, query_counter.value, response.status_code < 400
+
+
+def run_sequential(app, ctx, name, requests, warmup):
+    client = logged_in_client(app)
+    build = SCENARIOS[name]
+    for _ in range(warmup):
+        timed_get(client, build(ctx))
+
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        elapsed, count, ok = timed_get(client, build(ctx))
+        latencies.append(elapsed)
+        queries.append(count)
+        errors += not ok
+    return summarize(latencies, queries, errors, time.perf_counter() - started)
+
+
+# Load mode: every worker thread loops over the scenarios until the deadline
+def run_concurrent(app, ctx, names, concurrency, duration, seed):
+    results = {name: ([], [], [0]) for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        client = logged_in_client(app)
+        worker_ctx = Context(ctx.student_ids, ctx.class_ids, seed + index)
+        rng = random.Random(seed + index)
+        while time.perf_counter() < deadline:
+            name = rng.choice(names)
+            elapsed, count, ok = timed_get(client, SCENARIOS[name](worker_ctx))
+            with lock:
+                latencies, queries, errors = results[name]
+                latencies.append(elapsed)
+                queries.append(count)
+                errors[0] += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        name: summarize(latencies, queries, errors[0], elapsed)
+        for name, (latencies, queries, errors) in results.items()
+    }
+
+
+def print_results(results):
+    header = f'{"scenario":<20}{"reqs":>7}{"err":>5}{"req/s":>9}{"p50":>9}{"p90":>9}{"p99":>9}{"max":>9}{"queries":>9}'
+    click.echo(header)
+    click.echo('-' * len(header))
+    for name, row in results['scenarios'].items():
+        click.echo(
+            f'{name:<20}{row["requests"]:>7}{row["errors"]:>5}{row["throughput"]:>9.1f}'
+            f'{row["p50_ms"]:>9.2f}{row["p90_ms"]:>9.2f}{row["p99_ms"]:>9.2f}{row["max_ms"]:>9.2f}{row["queries"]:>9.1f}'
+        )
+    if results['peak_rss_mb'] is not None:
+        click.echo(f'peak RSS: {results["peak_rss_mb"]:.1f} MB')
+
+
+# A scenario regresses when its p90 grows by more than threshold or it runs more queries
+def compare(results, baseline, threshold):
+    regressions = []
+    if baseline.get('concurrency') != results['concurrency']:
+        click.echo(f'warning: baseline ran with concurrency {baseline.get("concurrency")}, '
+                   f'this run with {results["concurrency"]}')
+    click.echo(f'\n{"scenario":<20}{"p50":>16}{"p90":>16}{"queries":>14}')
+    for name, row in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            click.echo(f'{name:<20}{"(no baseline)":>16}')
+            continue
+
+        def change(key):
+            return (row[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+
+        slower = change('p90_ms') > threshold
+        more_queries = row['queries'] > before['queries'] + 0.01
+        flag = '  REGRESSION' if slower or more_queries else ''
+        click.echo(
+            f'{name:<20}{change("p50_ms"):>+15.1f}%{change("p90_ms"):>+15.1f}%'
+            f'{before["queries"]:>7.1f}->{row["queries"]:<5.1f}{flag}'
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+@click.command()
+@click.option('--database-url', help='Database to benchmark (defaults to DATABASE_URL).')
+@click.option('--scenario', 'scenarios', multiple=True, type=click.Choice(sorted(SCENARIOS)),
+              help='Scenarios to run (repeatable; default all).')
+@click.option('--requests', type=int, default=50, show_default=True, help='Requests per scenario (sequential mode).')
+@click.option('--warmup', type=int, default=5, show_default=True)
+@click.option('--concurrency', type=int, default=1, show_default=True, help='Worker threads; above 1 runs the load mode.')
+@click.option('--duration', type=float, default=20.0, show_default=True, help='Seconds of load (load mode).')
+@click.option('--seed', type=int, default=1, show_default=True)
+@click.option('--stub-templates', is_flag=True, help='Render empty templates, to time views and queries only.')
+@click.option('--baseline', type=click.Path(dir_okay=False), help='Compare with a saved baseline.')
+@click.option('--save-baseline', type=click.Path(dir_okay=False), help='Save these results as a baseline.')
+@click.option('--threshold', type=float, default=20.0, show_default=True, help='Allowed p90 growth in percent.')
+@click.option('--fail-on-regression', is_flag=True, help='Exit with status 1 when a scenario regresses.')
+def main(database_url, scenarios, requests, warmup, concurrency, duration, seed, stub_templates,
+         baseline, save_baseline, threshold, fail_on_regression):
+    """Benchmark the main routes against a generated database."""
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+
+    from jinja2 import FunctionLoader
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine, make_url
+    from app import create_app
+    from extensions import db
+    from models import Student, Class
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    if stub_templates:
+        app.jinja_env.loader = FunctionLoader(lambda name: '')
+    event.listen(Engine, 'before_cursor_execute', count_statement)
+
+    with app.app_context():
+        student_ids = [row[0] for row in db.session.query(Student.id)]
+        class_ids = [row[0] for row in db.session.query(Class.id)]
+        db.session.remove()
+    if not student_ids or not class_ids:
+        raise click.ClickException('No data; run python -m bench.generate first')
+
+    ctx = Context(student_ids, class_ids, seed)
+    names = list(scenarios or SCENARIOS)
+
+    if concurrency > 1:
+        click.echo(f'Load mode: {concurrency} threads for {duration:.0f}s over {len(names)} scenarios')
+        scenario_results = run_concurrent(app, ctx, names, concurrency, duration, seed)
+    else:
+        scenario_results = {name: run_sequential(app, ctx, name, requests, warmup) for name in names}
+
+    results = {
+        'database': make_url(app.config['SQLALCHEMY_DATABASE_URI']).render_as_string(hide_password=True),
+        'students': len(student_ids),
+        'concurrency': concurrency,
+        'scenarios': scenario_results,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    print_results(results)
+
+    regressions = []
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), threshold)
+
+    if save_baseline:
+        with open(save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        click.echo(f'Baseline saved to {save_baseline}')
+
+    if regressions and fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
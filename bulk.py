@@ -0,0 +1,31 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+
+
+# INSERT construct for the current dialect.
+# SQLite and Postgres constructs support ON CONFLICT, other dialects get a plain INSERT.
+def dialect_insert(model):
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        return sqlite.insert(model)
+    if dialect == 'postgresql':
+        return postgresql.insert(model)
+    return insert(model)
+
+
+# Insert many rows with one executemany.
+# With conflict_columns, rows clashing with that unique index are skipped where the
+# dialect supports it; elsewhere the IntegrityError reaches the caller.
+# With returning, the primary keys of the rows actually inserted are returned.
+def bulk_insert(model, rows, conflict_columns=None, returning=False):
+    if not rows:
+        return []
+
+    stmt = dialect_insert(model)
+    if conflict_columns and hasattr(stmt, 'on_conflict_do_nothing'):
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+
+    if returning:
+        return db.session.scalars(stmt.returning(model.id), rows).all()
+    db.session.execute(stmt, rows)
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+
+# In-process cache with per-key expiry (one copy per worker)
+class SimpleCache:
+    def __init__(self, default_ttl=300):
+        self.default_ttl = default_ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Bounded in-process cache: least recently used keys are evicted past maxsize
+class LRUCache(SimpleCache):
+    def __init__(self, maxsize=1024, default_ttl=300):
+        super().__init__(default_ttl)
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        super().set(key, value, ttl)
+        with self._lock:
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# Redis cache shared by all workers (needs the redis package)
+class RedisCache:
+    def __init__(self, url, default_ttl=300, prefix='sms:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+# File-per-key cache shared by the workers of one host
+class FileSystemCache:
+    def __init__(self, directory, default_ttl=300):
+        self.directory = directory
+        self.default_ttl = default_ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires and expires < time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        # Write to a temporary file and rename, so readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((time.time() + ttl if ttl else None, value), f)
+        os.replace(tmp, self._path(key))
+
+    def delete(self, *keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+def create_cache(config):
+    backend = config.get('CACHE_BACKEND', 'simple')
+    ttl = config.get('CACHE_DEFAULT_TTL', 300)
+    if backend == 'simple':
+        return SimpleCache(ttl)
+    if backend == 'redis':
+        return RedisCache(config['CACHE_REDIS_URL'], ttl)
+    if backend == 'filesystem':
+        return FileSystemCache(config['CACHE_DIR'], ttl)
+    raise ValueError(f'Unknown cache backend: {backend}')
+
+
+# Cache configured by CACHE_BACKEND (simple, redis or filesystem)
+def get_cache():
+    cache = current_app.extensions.get('cache')
+    if cache is None:
+        cache = current_app.extensions['cache'] = create_cache(current_app.config)
+    return cache
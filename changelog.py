@@ -0,0 +1,151 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select, insert, delete, func, literal, text
+from extensions import db, listen_once
+from models import Class, Student, Grade, Attendance, ChangeLog
+
+# Change feed for incremental sync.
+# Every insert, update and delete of a student, class, grade or attendance record
+# appends (seq, table, id, op) to change_log in the writing transaction: ORM writes
+# through the after_flush hook below, the bulk paths (imports, roll call, archiving)
+# through log_changes / log_changes_from. Consumers remember the last seq they
+# processed and ask for the changes after it (/api/v1/changes).
+#
+# A consumer must never see seq N+1 before N has committed. SQLite has a single
+# writer, so commit order is seq order; on PostgreSQL writers take a transaction
+# level advisory lock before writing change_log rows for the same guarantee.
+
+TRACKED = {Student: 'student', Class: 'class', Grade: 'grade', Attendance: 'attendance'}
+CHANGE_LOG_LOCK = 0x6368616e
+
+# Wakes up the long-polls of this process when a write commits; changes made by
+# other processes are picked up by polling
+changes_committed = threading.Condition()
+
+
+def lock_change_log(connection):
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': CHANGE_LOG_LOCK})
+
+
+def log_changes(connection, table_name, op, record_ids):
+    record_ids = list(record_ids)
+    if not record_ids:
+        return
+    lock_change_log(connection)
+    now = datetime.utcnow()
+    connection.execute(insert(ChangeLog.__table__), [
+        {'table_name': table_name, 'record_id': record_id, 'op': op, 'changed_at': now}
+        for record_id in record_ids
+    ])
+
+
+# Set-based variant for bulk statements: one change per id selected by id_query
+def log_changes_from(connection, table_name, op, id_query):
+    lock_change_log(connection)
+    rows = id_query.with_only_columns(
+        literal(table_name), *id_query.selected_columns, literal(op), literal(datetime.utcnow())
+    )
+    connection.execute(
+        insert(ChangeLog.__table__).from_select(['table_name', 'record_id', 'op', 'changed_at'], rows)
+    )
+
+
+def log_flushed_changes(session, flush_context):
+    changes = {}
+    for op, objects in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            table_name = TRACKED.get(type(obj))
+            if table_name is None or (op == 'update' and not session.is_modified(obj, include_collections=False)):
+                continue
+            changes.setdefault((table_name, op), []).append(obj.id)
+    if not changes:
+        return
+
+    connection = session.connection()
+    for (table_name, op), record_ids in sorted(changes.items()):
+        log_changes(connection, table_name, op, sorted(record_ids))
+
+
+def notify_change_waiters(session):
+    if session.info.get('wrote'):
+        with changes_committed:
+            changes_committed.notify_all()
+
+
+def init_app(app):
+    listen_once(db.session, 'after_flush', log_flushed_changes)
+    listen_once(db.session, 'after_commit', notify_change_waiters)
+
+
+def change_row(change):
+    return {
+        'seq': change.seq,
+        'table': change.table_name,
+        'id': change.record_id,
+        'op': change.op,
+        'at': change.changed_at.isoformat(),
+    }
+
+
+def changes_statement(since, tables=None, limit=1000):
+    query = select(ChangeLog).where(ChangeLog.seq > since).order_by(ChangeLog.seq).limit(limit)
+    if tables:
+        query = query.where(ChangeLog.table_name.in_(tables))
+    return query
+
+
+def changes_since(since, tables=None, limit=1000):
+    return db.session.scalars(changes_statement(since, tables, limit)).all()
+
+
+# Changes after `since`, waiting up to `wait` seconds for the first one to arrive
+def wait_for_changes(since, tables=None, limit=1000, wait=0):
+    deadline = time.monotonic() + wait
+    interval = current_app.config.get('CHANGES_POLL_INTERVAL', 1)
+    while True:
+        changes = changes_since(since, tables, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return changes
+        # End the read transaction so the next poll sees new commits, and give
+        # the connection back to the pool while waiting
+        db.session.rollback()
+        with changes_committed:
+            changes_committed.wait(min(interval, remaining))
+
+
+OLDEST_SEQ = select(func.min(ChangeLog.seq))
+LATEST_SEQ = select(func.max(ChangeLog.seq))
+
+
+# True when changes after `since` were already pruned and the consumer has to resync
+def is_pruned(since, oldest):
+    return oldest is not None and since < oldest - 1
+
+
+def pruned_past(since):
+    return is_pruned(since, db.session.scalar(OLDEST_SEQ))
+
+
+def latest_seq():
+    return db.session.scalar(LATEST_SEQ) or 0
+
+
+@click.command('changes-prune')
+@click.option('--keep-days', type=int, default=30, show_default=True, help='Days of changes to keep.')
+@with_appcontext
+def changes_prune_command(keep_days):
+    """Delete change log entries older than the retention period."""
+    cutoff = datetime.utcnow() - timedelta(days=keep_days)
+    with db.engine.begin() as connection:
+        # Always keep the newest entry, so the sequence position stays visible
+        newest = connection.scalar(LATEST_SEQ)
+        deleted = connection.execute(
+            delete(ChangeLog.__table__).where(ChangeLog.changed_at < cutoff, ChangeLog.seq != newest)
+        ).rowcount
+    click.echo(f'Deleted {deleted} change log entries older than {keep_days} days')
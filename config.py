@@ -7,23 +7,138 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     DEBUG = True
     
+    # Read replicas (comma separated URLs), bound as replica_0, replica_1, ...;
+    # a user's requests read from the primary for this many seconds after they write
+    SQLALCHEMY_BINDS = {
+        f'replica_{i}': url
+        for i, url in enumerate(url for url in (os.environ.get('DATABASE_REPLICA_URLS') or '').split(',') if url)
+    }
+    REPLICA_READ_YOUR_WRITES = 5
+    
     # Login settings
     LOGIN_DISABLED = False
     
     # Pagination
     POSTS_PER_PAGE = 20
+    
+    # Rows per INSERT batch for bulk imports
+    IMPORT_BATCH_SIZE = 1000
+    
+    # Rows fetched per server-side cursor batch for exports
+    EXPORT_CHUNK_SIZE = 1000
+    
+    # Student search backend: auto, sqlite-fts5, pg-trgm or like
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'auto'
+    
+    # Upper bound for ?limit= on the student autocomplete endpoint
+    AUTOCOMPLETE_MAX_RESULTS = 50
+    
+    # Cache backend: simple (per process), redis or filesystem
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'simple'
+    CACHE_DEFAULT_TTL = 300
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_DIR = os.environ.get('CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+    
+    # Rendered pages cached by model version (the TTL only bounds storage)
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_TTL = 3600
+    
+    # Background jobs: output directory, worker processes (defaults to the CPU
+    # count), students per chunk and seconds between queue polls. A running job
+    # without a heartbeat for JOB_TIMEOUT seconds (its worker crashed) is claimed
+    # again; keep it well above the time one chunk takes.
+    REPORTS_DIR = os.environ.get('REPORTS_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 0) or None
+    JOB_CHUNK_SIZE = 200
+    JOB_POLL_INTERVAL = 2
+    JOB_TIMEOUT = 600
+    
+    # Dashboard statistics are also refreshed at least this often (seconds)
+    STATS_CACHE_TTL = 300
+    
+    # Password hashing: pbkdf2, scrypt or argon2 (needs argon2-cffi), with its cost
+    # parameters; hashes made with other settings are replaced after the next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
+    PASSWORD_PBKDF2_ITERATIONS = 600000
+    PASSWORD_SCRYPT_N = 32768
+    PASSWORD_SCRYPT_R = 8
+    PASSWORD_SCRYPT_P = 1
+    PASSWORD_ARGON2_TIME_COST = 2
+    PASSWORD_ARGON2_MEMORY_COST = 19456
+    PASSWORD_ARGON2_PARALLELISM = 1
+    # Threads hashing at once per worker (defaults to the CPU count)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 0) or None
+    PASSWORD_REHASH_IN_BACKGROUND = True
+    
+    # Logged in users cached per worker for Flask-Login (0 disables the cache);
+    # the TTL bounds how long other workers may still see an edited or deleted user
+    USER_CACHE_SIZE = 1024
+    USER_CACHE_TTL = 30
+    
+    # Fail requests that exceed their query budget instead of only logging them
+    QUERY_BUDGET_STRICT = False
+    
+    # Request profiling: fraction of requests sampled, slow request log threshold (ms),
+    # statements kept per request for the slow log, and optional bearer token for /metrics
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', '').lower() in ('1', 'true', 'yes')
+    INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('INSTRUMENTATION_SAMPLE_RATE') or 1.0)
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS') or 500)
+    SLOW_REQUEST_MAX_STATEMENTS = 20
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # JSON API (/api/v1): bearer token for integrations (logged in users need none),
+    # page size for list endpoints and the most ids/operations one batch call may carry
+    API_TOKEN = os.environ.get('API_TOKEN')
+    API_PAGE_SIZE = 100
+    API_MAX_PAGE_SIZE = 1000
+    API_BATCH_MAX = 500
+    
+    # Change feed (/api/v1/changes): entries per response, longest ?wait= and how
+    # often a waiting request looks for changes made by other processes (seconds)
+    CHANGES_PAGE_SIZE = 1000
+    CHANGES_MAX_WAIT = 30
+    CHANGES_POLL_INTERVAL = 1
+    
+    # PRAGMAs run on every new SQLite connection: WAL lets readers proceed while
+    # a writer commits, busy_timeout makes writers wait for the lock instead of failing
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT') or 5000),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE') or 268435456)
+    }
 
 # Development configuration
 class DevelopmentConfig(Config):
     DEBUG = True
 
+# Testing configuration
+class TestingConfig(Config):
+    TESTING = True
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+    QUERY_BUDGET_STRICT = True
+    PASSWORD_HASH_METHOD = 'pbkdf2'
+    PASSWORD_PBKDF2_ITERATIONS = 1000
+    PASSWORD_REHASH_IN_BACKGROUND = False
+
 # Production configuration
 class ProductionConfig(Config):
     DEBUG = False
+    
+    # Connection pool per worker process
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 10),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 20),
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE') or 1800)
+    }
 
 # Choose configuration based on environment
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
     'production': ProductionConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
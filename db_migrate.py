@@ -0,0 +1,22 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_migrate import Migrate
+from flask_migrate.cli import db as migrate_group
+from extensions import db
+
+# Flask-Migrate, and Alembic with it, is loaded by `flask db ...` only:
+# importing it costs web workers and the other commands a fifth of their start-up
+migrate = Migrate(db=db)
+
+
+# Flask-Migrate's `db` group, set up on the app it runs against first
+@with_appcontext
+def init_migrate(**options):
+    if 'migrate' not in current_app.extensions:
+        migrate.init_app(current_app, db)
+    migrate_group.callback(**options)
+
+
+db_command = click.Group('db', commands=migrate_group.commands, params=migrate_group.params,
+                         callback=init_migrate, help=migrate_group.help)
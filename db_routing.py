@@ -0,0 +1,84 @@
+import random
+import sqlite3
+import time
+from functools import wraps
+import click
+from flask import current_app, has_request_context, session as cookie_session
+from flask.cli import with_appcontext
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, SelectBase
+
+# Read replica routing.
+# Replicas are extra binds named replica_0, replica_1, ... (DATABASE_REPLICA_URLS).
+# Views marked with use_replica read from one replica chosen per request. Everything
+# else goes to the primary, and so does the rest of a request once it has written.
+# After a user's write commits, their requests stay on the primary for
+# REPLICA_READ_YOUR_WRITES seconds so they see the write before replication catches up.
+
+PRIMARY_UNTIL_KEY = '_primary_until'
+
+
+def replica_binds(app):
+    return sorted(key for key in app.config.get('SQLALCHEMY_BINDS') or {} if key.startswith('replica_'))
+
+
+# Anything but a plain SELECT, including text() statements, may write
+def is_write(clause):
+    return clause is not None and (
+        not isinstance(clause, SelectBase) or getattr(clause, '_for_update_arg', None) is not None
+    )
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if is_write(clause):
+            self.info['wrote'] = True
+        replica = self.info.get('replica')
+        if bind is None and replica and not self._flushing and not self.info.get('wrote'):
+            return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def pin_to_primary(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def start_read_your_writes(session):
+    if session.info.get('wrote') and has_request_context() and replica_binds(current_app):
+        window = current_app.config.get('REPLICA_READ_YOUR_WRITES', 5)
+        cookie_session[PRIMARY_UNTIL_KEY] = time.time() + window
+
+
+def use_replica(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        binds = replica_binds(current_app)
+        if binds and cookie_session.get(PRIMARY_UNTIL_KEY, 0) < time.time():
+            current_app.extensions['sqlalchemy'].session().info['replica'] = random.choice(binds)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# Copy the primary into each SQLite replica (for trying replicas out locally)
+@click.command('replica-sync')
+@with_appcontext
+def replica_sync_command():
+    """Copy the SQLite primary database into the SQLite replicas."""
+    db = current_app.extensions['sqlalchemy']
+    primary = db.engines[None]
+    if primary.dialect.name != 'sqlite':
+        raise click.ClickException('replica-sync only copies SQLite databases; use database replication otherwise')
+
+    for key in replica_binds(current_app):
+        replica = db.engines[key]
+        replica.dispose()
+        source = primary.raw_connection()
+        try:
+            target = sqlite3.connect(replica.url.database)
+            source.driver_connection.backup(target)
+            target.close()
+        finally:
+            source.close()
+        click.echo(f'Copied primary into {key} ({replica.url.database})')
@@ -0,0 +1,39 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from extensions import db
+
+# Duplicate roll entries (one student, one date, several records) left from before
+# the unique index on attendance (student_id, date). Migration 8d3e5b7c1a20 stops
+# while any exist; this command is the deliberate cleanup step: it lists them and,
+# with --yes, deletes all but the first record of each pair.
+# Plain SQL, so it runs against a database that has not been upgraded yet. Once the
+# unique index exists there is nothing left for it to find.
+
+DUPLICATE_ROWS = text(
+    'SELECT id, student_id, date, status FROM attendance '
+    'WHERE id NOT IN (SELECT MIN(id) FROM attendance GROUP BY student_id, date) '
+    'ORDER BY student_id, date, id'
+)
+DELETE_DUPLICATES = text(
+    'DELETE FROM attendance WHERE id NOT IN (SELECT MIN(id) FROM attendance GROUP BY student_id, date)'
+)
+
+
+@click.command('attendance-dedupe')
+@click.option('--yes', is_flag=True, help='Delete the duplicates instead of only listing them.')
+@with_appcontext
+def attendance_dedupe_command(yes):
+    """List duplicate attendance records; with --yes keep only the first of each."""
+    with db.engine.begin() as connection:
+        rows = connection.execute(DUPLICATE_ROWS).all()
+        if not rows:
+            click.echo('No duplicate attendance records')
+            return
+        for row in rows:
+            click.echo(f'  id={row.id} student_id={row.student_id} date={row.date} status={row.status}')
+        if not yes:
+            click.echo(f'{len(rows)} duplicate records would be deleted; rerun with --yes to delete them')
+            return
+        connection.execute(DELETE_DUPLICATES)
+    click.echo(f'Deleted {len(rows)} duplicate attendance records')
@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from extensions import db
+from models import Class, Student, Grade, Attendance, live
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportFilterError(ValueError):
+    pass
+
+
+# Filters shared by the export endpoints (class_id, academic_year, semester, date_from, date_to)
+def parse_export_filters(args):
+    filters = {}
+    try:
+        if args.get('class_id'):
+            filters['class_id'] = int(args['class_id'])
+        for name in ('date_from', 'date_to'):
+            if args.get(name):
+                filters[name] = date.fromisoformat(args[name])
+    except ValueError:
+        raise ExportFilterError('class_id must be a number and dates must look like YYYY-MM-DD')
+    for name in ('academic_year', 'semester'):
+        if args.get(name):
+            filters[name] = args[name]
+    return filters
+
+
+# Column projections (plain rows, no ORM objects)
+def grade_export_query(filters):
+    query = select(
+        Grade.id,
+        Student.student_id,
+        Student.first_name,
+        Student.last_name,
+        Class.name.label('class'),
+        Grade.subject,
+        Grade.score,
+        Grade.grade,
+        Grade.semester,
+        Grade.academic_year,
+        Grade.created_at
+    ).join(Student, Grade.student_id == Student.id).join(Class, Student.class_id == Class.id).where(live(Grade))
+
+    if 'class_id' in filters:
+        query = query.where(Student.class_id == filters['class_id'])
+    if 'academic_year' in filters:
+        query = query.where(Grade.academic_year == filters['academic_year'])
+    if 'semester' in filters:
+        query = query.where(Grade.semester == filters['semester'])
+    if 'date_from' in filters:
+        query = query.where(Grade.created_at >= filters['date_from'])
+    if 'date_to' in filters:
+        query = query.where(Grade.created_at < datetime.combine(filters['date_to'] + timedelta(days=1), datetime.min.time()))
+
+    return query.order_by(Grade.id)
+
+
+def attendance_export_query(filters):
+    query = select(
+        Attendance.id,
+        Student.student_id,
+        Student.first_name,
+        Student.last_name,
+        Class.name.label('class'),
+        Attendance.date,
+        Attendance.status,
+        Attendance.notes
+    ).join(Student, Attendance.student_id == Student.id).join(Class, Student.class_id == Class.id) \
+        .where(live(Attendance))
+
+    if 'class_id' in filters:
+        query = query.where(Student.class_id == filters['class_id'])
+    if 'date_from' in filters:
+        query = query.where(Attendance.date >= filters['date_from'])
+    if 'date_to' in filters:
+        query = query.where(Attendance.date <= filters['date_to'])
+
+    return query.order_by(Attendance.date, Attendance.id)
+
+
+EXPORT_QUERIES = {
+    'grades': grade_export_query,
+    'attendance': attendance_export_query,
+}
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+# Encoders: the header written once, then one text chunk per batch of rows
+def csv_header(columns):
+    return csv_rows(None, [columns])
+
+
+def csv_rows(columns, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([[_plain(value) for value in row] for row in rows])
+    return buffer.getvalue()
+
+
+def ndjson_rows(columns, rows):
+    return ''.join(
+        json.dumps({column: _plain(value) for column, value in zip(columns, row)}, separators=(',', ':')) + '\n'
+        for row in rows
+    )
+
+
+# format -> (header, batch encoder)
+ENCODERS = {
+    'csv': (csv_header, csv_rows),
+    'ndjson': (None, ndjson_rows),
+}
+
+
+def encode_batches(fmt, columns, batches):
+    header, encode_rows = ENCODERS[fmt]
+    if header:
+        yield header(columns)
+    for rows in batches:
+        yield encode_rows(columns, rows)
+
+
+def gzip_compressor(level=6):
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def gzip_chunks(chunks, level=6):
+    compressor = gzip_compressor(level)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Stream an export from a server-side cursor, one yield_per batch at a time
+def generate_export(kind, filters, fmt='csv', compress=False, chunk_size=None):
+    chunk_size = chunk_size or current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+    query = EXPORT_QUERIES[kind](filters).execution_options(yield_per=chunk_size)
+
+    result = db.session.execute(query)
+    chunks = encode_batches(fmt, list(result.keys()), result.partitions())
+    if compress:
+        return gzip_chunks(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
@@ -0,0 +1,17 @@
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import LoginManager
+from sqlalchemy import event
+
+from db_routing import RoutingSession
+
+# Extensions shared by every app create_app builds
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
+
+
+# Session, mapper and engine events are process-wide (all apps share db), so each
+# subsystem's init_app registers its listeners once, whichever app comes first
+def listen_once(target, identifier, fn, **kw):
+    if not event.contains(target, identifier, fn):
+        event.listen(target, identifier, fn, **kw)
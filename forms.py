@@ -1,7 +1,12 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, BooleanField, IntegerField, FloatField, TextAreaField, DateField, SelectField
-from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
-from models import User, Class, Student
+from werkzeug.datastructures import MultiDict
+from flask_wtf.file import FileField, FileRequired, FileAllowed
+from wtforms import Form, StringField, PasswordField, SubmitField, BooleanField, IntegerField, FloatField, TextAreaField, DateField, SelectField, FieldList, FormField
+from wtforms.widgets import HiddenInput
+from wtforms.validators import DataRequired, Length, Email, EqualTo, Regexp, ValidationError
+from extensions import db
+from models import User, Student
+from analytics import archived_until
 
 # Login form
 class LoginForm(FlaskForm):
@@ -49,9 +54,20 @@ class ClassForm(FlaskForm):
     description = TextAreaField('Description')
     submit = SubmitField('Save')
 
+# Student picker (filled by the autocomplete endpoint, checked with one primary-key lookup)
+def validate_student_exists(form, field):
+    if field.data is not None and db.session.get(Student, field.data) is None:
+        raise ValidationError('That student does not exist.')
+
+# Attendance of archived academic years is read-only
+def validate_not_archived(form, field):
+    cutoff = archived_until() if field.data is not None else None
+    if cutoff is not None and field.data <= cutoff:
+        raise ValidationError(f'Attendance up to {cutoff.isoformat()} is archived and can no longer be changed.')
+
 # Grade form
 class GradeForm(FlaskForm):
-    student_id = SelectField('Student', coerce=int, validators=[DataRequired()])
+    student_id = IntegerField('Student', widget=HiddenInput(), validators=[DataRequired(), validate_student_exists])
     subject = StringField('Subject', validators=[DataRequired()])
     score = FloatField('Score', validators=[DataRequired()])
     grade = StringField('Grade')
@@ -59,15 +75,79 @@ class GradeForm(FlaskForm):
     academic_year = StringField('Academic Year', validators=[DataRequired()])
     submit = SubmitField('Save')
 
+# Attendance statuses
+ATTENDANCE_STATUSES = [('present', 'Present'), ('absent', 'Absent'), ('late', 'Late'), ('excused', 'Excused')]
+
 # Attendance form
 class AttendanceForm(FlaskForm):
-    student_id = SelectField('Student', coerce=int, validators=[DataRequired()])
-    date = DateField('Date', validators=[DataRequired()])
-    status = SelectField('Status', choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late'), ('excused', 'Excused')], validators=[DataRequired()])
+    student_id = IntegerField('Student', widget=HiddenInput(), validators=[DataRequired(), validate_student_exists])
+    date = DateField('Date', validators=[DataRequired(), validate_not_archived])
+    status = SelectField('Status', choices=ATTENDANCE_STATUSES, validators=[DataRequired()])
     notes = TextAreaField('Notes')
     submit = SubmitField('Save')
 
+# Roll call entry (one row per student, no CSRF token of its own)
+class RollCallEntryForm(Form):
+    student_id = IntegerField('Student', widget=HiddenInput(), validators=[DataRequired()])
+    status = SelectField('Status', choices=ATTENDANCE_STATUSES, validators=[DataRequired()])
+    notes = StringField('Notes')
+
+# Roll call form (a whole class for one date)
+class RollCallForm(FlaskForm):
+    date = DateField('Date', validators=[DataRequired(), validate_not_archived])
+    entries = FieldList(FormField(RollCallEntryForm))
+    overwrite = BooleanField('Overwrite existing records')
+    submit = SubmitField('Save')
+
+# Import form
+class ImportForm(FlaskForm):
+    kind = SelectField('Import', choices=[('students', 'Students'), ('grades', 'Grades')], validators=[DataRequired()])
+    file = FileField('File', validators=[FileRequired(), FileAllowed(['csv', 'xlsx'], 'CSV or Excel files only')])
+    submit = SubmitField('Import')
+
 # Search form
 class SearchForm(FlaskForm):
     search = StringField('Search', validators=[DataRequired()])
-    submit = SubmitField('Search')
\ No newline at end of file
+    submit = SubmitField('Search')
+
+# Report card job form (class 0 means the whole school)
+class ReportCardJobForm(FlaskForm):
+    class_id = SelectField('Class', coerce=int)
+    academic_year = StringField('Academic Year', validators=[DataRequired(), Regexp(r'^\d{4}-\d{4}$', message='Use the form 2025-2026')])
+    semester = SelectField('Semester', choices=[('', 'Both'), ('1st', '1st'), ('2nd', '2nd')])
+    submit = SubmitField('Generate')
+
+# Batch variants for imports and API batch writes: students, classes and archived
+# days are checked once for the whole batch instead of once per row
+class BatchStudentForm(StudentForm):
+    class_id = IntegerField('Class', validators=[DataRequired()])
+
+class BatchGradeForm(GradeForm):
+    student_id = IntegerField('Student', validators=[DataRequired()])
+
+class BatchAttendanceForm(AttendanceForm):
+    student_id = IntegerField('Student', validators=[DataRequired()])
+    date = DateField('Date', validators=[DataRequired()])
+
+# Validate rows with the same form the web UI uses.
+# One form instance is re-processed per row, which is far cheaper than building a new one.
+# With only, errors of the other fields are ignored (partial updates).
+class RowValidator:
+    def __init__(self, form_class, prepare=None):
+        self.form = form_class(formdata=None, meta={'csrf': False})
+        if prepare:
+            prepare(self.form)
+
+    def __call__(self, row, only=None):
+        form = self.form
+        form.process(MultiDict(row))
+        if form.validate():
+            return form, None
+
+        messages = []
+        for name, errors in form.errors.items():
+            if only is None or name in only:
+                messages.append(f"{name}: {'; '.join(errors)}")
+        if not messages:
+            return form, None
+        return None, ', '.join(messages)
@@ -0,0 +1,65 @@
+import hashlib
+from functools import wraps
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import String, cast, literal, or_, select
+from extensions import db
+from models import ModelVersion, Student
+from cache import get_cache
+
+# Rendered page cache keyed on model versions.
+# A cached view names the version keys its page reads. A repeat request costs one
+# SELECT on model_version: an unchanged page is answered with 304 when the browser
+# sends the ETag back, otherwise with the stored HTML, without running the view.
+# Pages are cached per user (the layout shows who is logged in) and never while
+# flashed messages are waiting to be shown.
+
+
+# Version key of the class a student belongs to, resolved inside the version lookup
+def student_class_key(student_id):
+    class_id = select(Student.class_id).where(Student.id == student_id).scalar_subquery()
+    return literal('class:') + cast(class_id, String)
+
+
+def current_versions(keys):
+    plain = [key for key in keys if isinstance(key, str)]
+    resolved = [key for key in keys if not isinstance(key, str)]
+    condition = or_(ModelVersion.key.in_(plain), *[ModelVersion.key == key for key in resolved])
+    versions = dict(db.session.execute(select(ModelVersion.key, ModelVersion.version).where(condition)).all())
+    return sorted(versions.items()) + [(key, 0) for key in plain if key not in versions]
+
+
+def page_etag(versions):
+    user_id = current_user.get_id() if current_user.is_authenticated else None
+    parts = [request.endpoint, request.full_path, user_id, versions]
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def cached_page(version_keys):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            if (request.method != 'GET' or not current_app.config.get('FRAGMENT_CACHE_ENABLED', True)
+                    or session.get('_flashes')):
+                return view(**view_args)
+
+            etag = page_etag(current_versions(version_keys(**view_args)))
+            if etag in request.if_none_match:
+                response = make_response('', 304)
+            else:
+                cache = get_cache()
+                html = cache.get(f'page:{etag}')
+                if html is None:
+                    response = make_response(view(**view_args))
+                    if response.status_code != 200 or session.get('_flashes'):
+                        return response
+                    cache.set(f'page:{etag}', response.get_data(as_text=True),
+                              current_app.config.get('FRAGMENT_CACHE_TTL'))
+                else:
+                    response = make_response(html)
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,20 @@
+# Gunicorn settings (gunicorn -c gunicorn.conf.py wsgi:app)
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 60)
+keepalive = 5
+
+# Restart workers periodically to bound memory growth
+max_requests = 1000
+max_requests_jitter = 100
+
+# Each worker imports the app itself, so no pooled connection crosses a fork
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,237 @@
+import csv
+import io
+import os
+from datetime import date, datetime
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db
+from models import Class, Student, Grade, bump_versions, student_version_keys
+from forms import RowValidator, StudentForm, BatchGradeForm
+from bulk import bulk_insert
+from search_index import get_backend
+from aggregates import refresh_student_terms
+from stats import mark_stale, COUNTS_KEY, STUDENTS_PER_CLASS_KEY
+from changelog import log_changes
+
+
+# Outcome of one import run
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+
+# Row readers (stream the file, yield (line number, row dict))
+def read_csv(stream):
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+
+def read_xlsx(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('Excel import needs the openpyxl package; upload a CSV file instead')
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        for line, values in enumerate(rows, start=2):
+            row = {}
+            for key, value in zip(header, values):
+                if not key:
+                    continue
+                if isinstance(value, datetime):
+                    value = value.date()
+                if isinstance(value, date):
+                    value = value.isoformat()
+                row[key] = '' if value is None else str(value).strip()
+            if any(row.values()):
+                yield line, row
+    finally:
+        workbook.close()
+
+
+def read_rows(stream, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        return read_xlsx(stream)
+    if extension == '.csv':
+        return read_csv(stream)
+    raise ValueError(f'Unsupported file type: {extension or filename}')
+
+
+# Write one batch; a rejected batch is reported against each of its lines.
+# after_insert runs in the same transaction for work the ORM events would have done;
+# the change log entries are written here for every model.
+def flush_batch(model, batch, result, after_insert=None):
+    if not batch:
+        return
+    lines, rows = zip(*batch)
+    try:
+        ids = bulk_insert(model, list(rows), returning=True)
+        log_changes(db.session.connection(), model.__table__.name, 'insert', ids)
+        if after_insert:
+            after_insert(rows)
+        db.session.commit()
+        result.inserted += len(rows)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        message = str(getattr(e, 'orig', e))
+        for line in lines:
+            result.add_error(line, f'Database rejected batch: {message}')
+    batch.clear()
+
+
+# Import students (class given by name in the "class" column)
+def import_students(rows, batch_size=None):
+    batch_size = batch_size or current_app.config.get('IMPORT_BATCH_SIZE', 1000)
+    result = ImportResult()
+
+    # One lookup each for classes and existing student numbers (deleted students keep theirs)
+    class_ids = {name: class_id for class_id, name in db.session.query(Class.id, Class.name)}
+    class_choices = [(class_id, name) for name, class_id in class_ids.items()]
+    seen = set(student_id for (student_id,) in db.session.query(Student.student_id).execution_options(include_deleted=True))
+
+    validate_row = RowValidator(StudentForm, lambda form: setattr(form.class_id, 'choices', class_choices))
+
+    # Bulk inserts bypass the session and mapper events, so index the new students
+    # and invalidate the dashboard counts and cached pages explicitly
+    def index_batch(rows):
+        numbers = [row['student_id'] for row in rows]
+        get_backend().index_students(db.session.connection(), Student.student_id.in_(numbers))
+        bump_versions(db.session.connection(), {'table:student'} | {f'class:{row["class_id"]}' for row in rows})
+        mark_stale(db.session, COUNTS_KEY, STUDENTS_PER_CLASS_KEY)
+
+    batch = []
+    for line, row in rows:
+        row = dict(row)
+        class_name = row.pop('class', '')
+        if class_name not in class_ids:
+            result.add_error(line, f'class: Unknown class {class_name!r}')
+            continue
+        row['class_id'] = str(class_ids[class_name])
+
+        form, error = validate_row(row)
+        if error:
+            result.add_error(line, error)
+            continue
+        if form.student_id.data in seen:
+            result.add_error(line, f'student_id: Student ID {form.student_id.data} already exists')
+            continue
+        seen.add(form.student_id.data)
+
+        batch.append((line, {
+            'student_id': form.student_id.data,
+            'first_name': form.first_name.data,
+            'last_name': form.last_name.data,
+            'gender': form.gender.data,
+            'date_of_birth': form.date_of_birth.data,
+            'address': form.address.data or None,
+            'phone': form.phone.data or None,
+            'email': form.email.data or None,
+            'class_id': form.class_id.data
+        }))
+        if len(batch) >= batch_size:
+            flush_batch(Student, batch, result, index_batch)
+
+    flush_batch(Student, batch, result, index_batch)
+    return result
+
+
+# Import grades (student given by student number in the "student_id" column)
+def import_grades(rows, batch_size=None):
+    batch_size = batch_size or current_app.config.get('IMPORT_BATCH_SIZE', 1000)
+    result = ImportResult()
+
+    # Resolve student numbers to primary keys through one cached lookup
+    student_pks = dict(db.session.query(Student.student_id, Student.id))
+    validate_row = RowValidator(BatchGradeForm)
+
+    # Bulk inserts bypass the session events, so refresh the grade summaries and
+    # page versions explicitly
+    def summarize_batch(rows):
+        terms = {(row['student_id'], row['academic_year'], row['semester']) for row in rows}
+        connection = db.session.connection()
+        refresh_student_terms(connection, terms)
+        bump_versions(connection, {'table:grade'} | student_version_keys(connection, {row['student_id'] for row in rows}))
+
+    batch = []
+    for line, row in rows:
+        row = dict(row)
+        pk = student_pks.get(row.get('student_id', ''))
+        if pk is None:
+            result.add_error(line, f"student_id: Unknown student {row.get('student_id', '')!r}")
+            continue
+        row['student_id'] = str(pk)
+
+        form, error = validate_row(row)
+        if error:
+            result.add_error(line, error)
+            continue
+
+        batch.append((line, {
+            'student_id': pk,
+            'subject': form.subject.data,
+            'score': form.score.data,
+            'grade': form.grade.data or None,
+            'semester': form.semester.data,
+            'academic_year': form.academic_year.data
+        }))
+        if len(batch) >= batch_size:
+            flush_batch(Grade, batch, result, summarize_batch)
+
+    flush_batch(Grade, batch, result, summarize_batch)
+    return result
+
+
+IMPORTERS = {
+    'students': import_students,
+    'grades': import_grades,
+}
+
+
+def run_import(kind, stream, filename, batch_size=None):
+    return IMPORTERS[kind](read_rows(stream, filename), batch_size=batch_size)
+
+
+# CLI commands
+def report(result):
+    click.echo(f'{result.inserted} rows imported, {result.failed} rows rejected')
+    for line, message in result.errors:
+        click.echo(f'  line {line}: {message}', err=True)
+
+
+@click.command('import-students')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', type=int, help='Rows per INSERT batch.')
+@with_appcontext
+def import_students_command(path, batch_size):
+    """Import students from a CSV or Excel file."""
+    with open(path, 'rb') as stream:
+        report(run_import('students', stream, path, batch_size))
+
+
+@click.command('import-grades')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', type=int, help='Rows per INSERT batch.')
+@with_appcontext
+def import_grades_command(path, batch_size):
+    """Import grades from a CSV or Excel file."""
+    with open(path, 'rb') as stream:
+        report(run_import('grades', stream, path, batch_size))
@@ -0,0 +1,228 @@
+import bisect
+import heapq
+import hmac
+import random
+import threading
+import time
+from flask import Response, abort, current_app, g, has_request_context, request, before_render_template, template_rendered
+from flask_login import current_user
+from sqlalchemy.engine import Engine
+from extensions import db, listen_once
+
+# Opt-in request profiling (INSTRUMENTATION_ENABLED).
+# A sampled request records wall time, SQL count and time, template render time
+# and ORM rows loaded; totals per endpoint are served at /metrics in the
+# Prometheus text format. Totals are per worker process, and only sampled requests count.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestProfile:
+    def __init__(self, max_statements):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.rows = 0
+        self.status = None
+        self.statements = []
+        self.max_statements = max_statements
+        self._template_starts = []
+
+    def record_statement(self, statement, elapsed):
+        self.queries += 1
+        self.sql_time += elapsed
+        # Keep only the slowest statements, for the slow request log
+        entry = (elapsed, self.queries, statement)
+        if len(self.statements) < self.max_statements:
+            heapq.heappush(self.statements, entry)
+        else:
+            heapq.heappushpop(self.statements, entry)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.wall_time = 0.0
+        self.sql_time = 0.0
+        self.queries = 0
+        self.template_time = 0.0
+        self.rows = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def observe(self, endpoint, profile, wall_time):
+        index = bisect.bisect_left(DURATION_BUCKETS, wall_time)
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.wall_time += wall_time
+            stats.sql_time += profile.sql_time
+            stats.queries += profile.queries
+            stats.template_time += profile.template_time
+            stats.rows += profile.rows
+            if index < len(stats.buckets):
+                stats.buckets[index] += 1
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render(self, sample_rate):
+        lines = [
+            '# HELP app_instrumentation_sample_rate Fraction of requests that are profiled.',
+            '# TYPE app_instrumentation_sample_rate gauge',
+            f'app_instrumentation_sample_rate {sample_rate}',
+        ]
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            lines += [
+                '# HELP app_request_duration_seconds Wall time of sampled requests.',
+                '# TYPE app_request_duration_seconds histogram',
+            ]
+            for endpoint, stats in endpoints:
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'app_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                lines.append(f'app_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats.requests}')
+                lines.append(f'app_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats.wall_time:.6f}')
+                lines.append(f'app_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats.requests}')
+
+            counters = (
+                ('app_request_sql_queries_total', 'SQL statements executed by sampled requests.', 'queries', '{}'),
+                ('app_request_sql_seconds_total', 'Time spent in SQL by sampled requests.', 'sql_time', '{:.6f}'),
+                ('app_request_template_seconds_total', 'Time spent rendering templates in sampled requests.', 'template_time', '{:.6f}'),
+                ('app_request_rows_total', 'ORM rows loaded by sampled requests.', 'rows', '{}'),
+            )
+            for name, help_text, attribute, number in counters:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for endpoint, stats in endpoints:
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} ' + number.format(getattr(stats, attribute)))
+        return '\n'.join(lines) + '\n'
+
+
+# Totals of the app handling the request
+def get_registry():
+    registry = current_app.extensions.get('metrics')
+    if registry is None:
+        registry = current_app.extensions['metrics'] = MetricsRegistry()
+    return registry
+
+
+def current_profile():
+    if has_request_context():
+        return g.get('profile')
+    return None
+
+
+# SQL timing
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_profile() is not None and context is not None:
+        context._instrumentation_start = time.perf_counter()
+
+
+def stop_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile()
+    start = getattr(context, '_instrumentation_start', None)
+    if profile is not None and start is not None:
+        profile.record_statement(statement, time.perf_counter() - start)
+
+
+# Rows fetched: every ORM instance loaded from a result row
+def count_loaded_row(target, context):
+    profile = current_profile()
+    if profile is not None:
+        profile.rows += 1
+
+
+# Template render time
+def start_template_timer(sender, template, context, **extra):
+    profile = current_profile()
+    if profile is not None:
+        profile._template_starts.append(time.perf_counter())
+
+
+def stop_template_timer(sender, template, context, **extra):
+    profile = current_profile()
+    if profile is not None and profile._template_starts:
+        profile.template_time += time.perf_counter() - profile._template_starts.pop()
+
+
+def start_profile():
+    if not current_app.config.get('INSTRUMENTATION_ENABLED'):
+        return
+    if random.random() < current_app.config.get('INSTRUMENTATION_SAMPLE_RATE', 1.0):
+        g.profile = RequestProfile(current_app.config.get('SLOW_REQUEST_MAX_STATEMENTS', 20))
+
+
+def record_status(response):
+    profile = current_profile()
+    if profile is not None:
+        profile.status = response.status_code
+    return response
+
+
+# Teardown runs after streamed responses have finished, so exports are timed in full
+def finish_profile(exc):
+    profile = g.pop('profile', None)
+    if profile is None or request.endpoint == 'metrics':
+        return
+
+    endpoint = request.endpoint or 'unmatched'
+    wall_time = time.perf_counter() - profile.start
+    get_registry().observe(endpoint, profile, wall_time)
+
+    threshold = current_app.config.get('SLOW_REQUEST_MS', 500)
+    if threshold is not None and wall_time * 1000 >= threshold:
+        log_slow_request(endpoint, profile, wall_time)
+
+
+def log_slow_request(endpoint, profile, wall_time):
+    slowest = sorted(profile.statements, key=lambda item: item[0], reverse=True)
+    statements = '\n'.join(
+        f'  {elapsed * 1000:8.2f} ms  {" ".join(statement.split())[:500]}'
+        for elapsed, _, statement in slowest
+    )
+    current_app.logger.warning(
+        'Slow request %s %s (%s): %.1f ms total, %d queries in %.1f ms, templates %.1f ms, %d rows\n%s',
+        request.method, request.full_path.rstrip('?'), endpoint,
+        wall_time * 1000, profile.queries, profile.sql_time * 1000,
+        profile.template_time * 1000, profile.rows, statements
+    )
+
+
+# Prometheus scrape endpoint: bearer METRICS_TOKEN, or a logged in admin
+def metrics():
+    if not current_app.config.get('INSTRUMENTATION_ENABLED'):
+        abort(404)
+
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+            abort(403)
+    elif not (current_user.is_authenticated and current_user.is_admin):
+        abort(403)
+
+    return Response(
+        get_registry().render(current_app.config.get('INSTRUMENTATION_SAMPLE_RATE', 1.0)),
+        mimetype='text/plain; version=0.0.4'
+    )
+
+
+def init_app(app):
+    listen_once(Engine, 'before_cursor_execute', start_statement_timer)
+    listen_once(Engine, 'after_cursor_execute', stop_statement_timer)
+    listen_once(db.Model, 'load', count_loaded_row, propagate=True)
+    before_render_template.connect(start_template_timer, app)
+    template_rendered.connect(stop_template_timer, app)
+    app.before_request(start_profile)
+    app.after_request(record_status)
+    app.teardown_request(finish_profile)
+    app.add_url_rule('/metrics', 'metrics', metrics)
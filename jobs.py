@@ -0,0 +1,235 @@
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.orm import joinedload
+from app import create_app
+from extensions import db
+from models import Job, Student, Grade, Attendance, AttendanceArchive, StudentGradeSummary, ClassGradeSummary
+from analytics import STATUSES, academic_year_range
+
+# Background jobs without a broker.
+# The web app inserts a Job row; `flask jobs-worker` claims queued rows, splits each
+# job into chunks of students and runs the chunks in a local process pool. Results
+# are collected into one zip under REPORTS_DIR while the job row tracks progress.
+
+
+def create_job(kind, params, user_id=None):
+    job = Job(kind=kind, params=json.dumps(params), created_by=user_id)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def job_progress(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'percent': round(job.progress * 100 / job.total, 1) if job.total else (100.0 if job.status == 'done' else 0.0),
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'heartbeat_at': job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# Report cards
+def plan_report_cards(params, chunk_size):
+    query = select(Student.id).order_by(Student.class_id, Student.last_name, Student.first_name, Student.id)
+    if params.get('class_id'):
+        query = query.where(Student.class_id == params['class_id'])
+    student_ids = db.session.scalars(query).all()
+    return [student_ids[i:i + chunk_size] for i in range(0, len(student_ids), chunk_size)]
+
+
+def render_report_card(student, academic_year, terms, attendance):
+    lines = [
+        f'Report Card {academic_year}',
+        f'Student: {student.first_name} {student.last_name} ({student.student_id})',
+        f'Class: {getattr(student, "class").name}',
+        '',
+    ]
+    for semester, (summary, class_size, grades) in sorted(terms.items()):
+        if summary is not None:
+            lines.append(f'Semester {semester}: average {summary.average:.1f}, rank {summary.class_rank} of {class_size}')
+        else:
+            lines.append(f'Semester {semester}')
+        for grade in grades:
+            lines.append(f'  {grade.subject:<20}{grade.score:>6.1f}  {grade.grade or ""}')
+        lines.append('')
+    if not terms:
+        lines += ['No grades recorded.', '']
+
+    total = sum(attendance.values())
+    attended = attendance.get('present', 0) + attendance.get('late', 0)
+    counts = ', '.join(f'{status} {attendance.get(status, 0)}' for status in ('present', 'absent', 'late', 'excused'))
+    rate = f' (rate {attended * 100 / total:.1f}%)' if total else ''
+    lines.append(f'Attendance: {counts}{rate}')
+    return '\n'.join(lines) + '\n'
+
+
+# Worker processes are spawned, so each builds its own app with the worker's config
+worker_app = None
+
+
+def init_worker(config_name):
+    global worker_app
+    worker_app = create_app(config_name)
+
+
+# Runs in a worker process: a fixed number of queries for the whole chunk
+def report_cards_chunk(params, student_ids):
+    academic_year = params['academic_year']
+    semester = params.get('semester')
+    start, end = academic_year_range(academic_year)
+
+    with worker_app.app_context():
+        students = Student.query.options(joinedload(getattr(Student, 'class'))) \
+            .filter(Student.id.in_(student_ids)).all()
+
+        grades_query = Grade.query.filter(Grade.student_id.in_(student_ids), Grade.academic_year == academic_year)
+        summaries_query = StudentGradeSummary.query.filter(
+            StudentGradeSummary.student_id.in_(student_ids), StudentGradeSummary.academic_year == academic_year)
+        class_sizes_query = db.session.query(ClassGradeSummary.class_id, ClassGradeSummary.semester,
+                                             ClassGradeSummary.student_count) \
+            .filter(ClassGradeSummary.class_id.in_({student.class_id for student in students}),
+                    ClassGradeSummary.academic_year == academic_year)
+        if semester:
+            grades_query = grades_query.filter(Grade.semester == semester)
+            summaries_query = summaries_query.filter(StudentGradeSummary.semester == semester)
+            class_sizes_query = class_sizes_query.filter(ClassGradeSummary.semester == semester)
+
+        class_sizes = {(class_id, term): count for class_id, term, count in class_sizes_query}
+        summaries = {(summary.student_id, summary.semester): summary for summary in summaries_query}
+        terms = {}
+        for grade in grades_query.order_by(Grade.semester, Grade.subject):
+            student_terms = terms.setdefault(grade.student_id, {})
+            student_terms.setdefault(grade.semester, []).append(grade)
+
+        attendance = {}
+        for student_id, status, count in db.session.query(Attendance.student_id, Attendance.status, func.count()) \
+                .filter(Attendance.student_id.in_(student_ids), Attendance.date.between(start, end)) \
+                .group_by(Attendance.student_id, Attendance.status):
+            attendance.setdefault(student_id, {})[status] = count
+        # Closed years live in the archive instead
+        for archive in AttendanceArchive.query.filter(AttendanceArchive.student_id.in_(student_ids),
+                                                      AttendanceArchive.academic_year == academic_year):
+            counts = attendance.setdefault(archive.student_id, {})
+            for status in STATUSES:
+                counts[status] = counts.get(status, 0) + getattr(archive, status)
+
+        cards = []
+        for student in students:
+            student_terms = {
+                term: (summaries.get((student.id, term)), class_sizes.get((student.class_id, term)), grades)
+                for term, grades in terms.get(student.id, {}).items()
+            }
+            name = f'{getattr(student, "class").name}/{student.student_id}_{student.last_name}_{student.first_name}.txt'
+            cards.append((name, render_report_card(student, academic_year, student_terms, attendance.get(student.id, {}))))
+
+        db.session.remove()
+    return cards
+
+
+# kind -> (planner run in the worker command, chunk function run in the pool)
+JOB_KINDS = {
+    'report_cards': (plan_report_cards, report_cards_chunk),
+}
+
+
+# Claim the oldest queued job, or a running one whose worker stopped sending heartbeats;
+# the conditional UPDATE lets several workers share the table
+def claim_next_job():
+    while True:
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=current_app.config.get('JOB_TIMEOUT', 600))
+        claimable = or_(Job.status == 'queued', and_(
+            Job.status == 'running', func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff))
+        job_id = db.session.scalar(
+            select(Job.id).where(claimable).order_by(Job.created_at, Job.id).limit(1)
+        )
+        if job_id is None:
+            return None
+        # A reclaimed job starts over
+        claimed = db.session.execute(
+            update(Job).where(Job.id == job_id, claimable)
+            .values(status='running', started_at=now, heartbeat_at=now, progress=0, total=0)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+
+
+def run_job(job_id, pool):
+    job = db.session.get(Job, job_id)
+    params = json.loads(job.params)
+    plan, run_chunk = JOB_KINDS[job.kind]
+    os.makedirs(current_app.config['REPORTS_DIR'], exist_ok=True)
+    path = os.path.join(current_app.config['REPORTS_DIR'], f'job-{job.id}-{job.kind}.zip')
+
+    futures = []
+    try:
+        chunks = plan(params, current_app.config.get('JOB_CHUNK_SIZE', 200))
+        job.total = sum(len(chunk) for chunk in chunks)
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+        futures = {pool.submit(run_chunk, params, chunk): len(chunk) for chunk in chunks}
+        with zipfile.ZipFile(path + '.part', 'w', zipfile.ZIP_DEFLATED) as archive:
+            for future in as_completed(futures):
+                for name, content in future.result():
+                    archive.writestr(name, content)
+                job.progress += futures[future]
+                job.heartbeat_at = datetime.utcnow()
+                db.session.commit()
+        os.replace(path + '.part', path)
+
+        job.status = 'done'
+        job.result_path = path
+    except Exception as e:
+        db.session.rollback()
+        for future in futures:
+            future.cancel()
+        current_app.logger.exception('Job %s failed', job_id)
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+@click.command('jobs-worker')
+@click.option('--processes', type=int, help='Worker processes (defaults to JOB_WORKERS or the CPU count).')
+@click.option('--once', is_flag=True, help='Exit once the queue is empty.')
+@with_appcontext
+def jobs_worker_command(processes, once):
+    """Run queued background jobs in a local process pool."""
+    processes = processes or current_app.config.get('JOB_WORKERS') or os.cpu_count() or 1
+    # spawn: children start clean instead of inheriting this process's connections
+    pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_worker, initargs=(current_app.config['CONFIG_NAME'],))
+    with pool:
+        click.echo(f'Job worker started with {processes} processes')
+        while True:
+            job_id = claim_next_job()
+            if job_id is None:
+                if once:
+                    break
+                db.session.remove()
+                time.sleep(current_app.config.get('JOB_POLL_INTERVAL', 2))
+                continue
+            click.echo(f'Running job {job_id}')
+            run_job(job_id, pool)
+            click.echo(f'Job {job_id} {db.session.get(Job, job_id).status}')
@@ -0,0 +1,37 @@
+from functools import cached_property
+from flask.cli import AppGroup
+from werkzeug.utils import import_string
+
+# Deferred imports for cold start.
+# URL rules and CLI command names are known up front; the modules behind them
+# (and their forms, parsers and job machinery) are imported on first use, so a
+# worker or a `flask` invocation only pays for what it actually runs.
+
+
+# View function imported by the first request that reaches it
+class LazyView:
+    def __init__(self, import_name):
+        self.import_name = import_name
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+# CLI group whose commands (import strings, 'module:command') are imported when run
+class LazyGroup(AppGroup):
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, name):
+        if name not in self.commands and name in self.lazy_commands:
+            self.add_command(import_string(self.lazy_commands[name]), name)
+        return super().get_command(ctx, name)
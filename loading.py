@@ -0,0 +1,67 @@
+from flask import current_app, g, has_request_context, request
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload, selectinload
+from extensions import listen_once
+from models import Class, Student, Grade, Attendance, StudentGradeSummary
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# Per-view loading profiles.
+# Each endpoint maps to the relationships its template walks and the number
+# of SELECTs the whole request may issue (including the Flask-Login user load and,
+# for pages behind cached_page, the model version lookup).
+# Options are built lazily because backrefs only exist once the mappers are configured.
+LOADING_PROFILES = {
+    'students.students': (lambda: [joinedload(getattr(Student, 'class'))], 3),
+    'students.student_detail': (lambda: [joinedload(getattr(Student, 'class'))], 7),
+    'classes.classes': (lambda: [selectinload(Class.students)], 4),
+    'classes.class_detail': (lambda: [], 4),
+    'classes.class_leaderboard': (lambda: [joinedload(StudentGradeSummary.student)], 4),
+    'grades.grades': (lambda: [joinedload(Grade.student).joinedload(getattr(Student, 'class'))], 2),
+    'attendance.attendance': (lambda: [joinedload(Attendance.student).joinedload(getattr(Student, 'class'))], 2),
+    'students.search': (lambda: [joinedload(getattr(Student, 'class'))], 3),
+}
+
+
+# Apply the loading profile of the current (or given) endpoint to a query
+def apply_profile(query, endpoint=None):
+    endpoint = endpoint or request.endpoint
+    profile = LOADING_PROFILES.get(endpoint)
+    if profile is None:
+        return query
+    options, _ = profile
+    return query.options(*options())
+
+
+# Count every statement sent to the database while a request is active
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_count' in g:
+        g.query_count += 1
+
+
+def start_query_count():
+    g.query_count = 0
+
+
+def check_query_budget(response):
+    profile = LOADING_PROFILES.get(request.endpoint)
+    if profile is None or 'query_count' not in g:
+        return response
+
+    _, budget = profile
+    if g.query_count > budget:
+        message = f'{request.endpoint} ran {g.query_count} queries (budget {budget})'
+        if current_app.config.get('QUERY_BUDGET_STRICT'):
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+
+    return response
+
+
+def init_app(app):
+    listen_once(Engine, 'before_cursor_execute', count_query)
+    app.before_request(start_query_count)
+    app.after_request(check_query_budget)
@@ -0,0 +1,45 @@
+"""student search index
+
+Revision ID: 2a6f9d4e8b13
+Revises: 8d3e5b7c1a20
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2a6f9d4e8b13'
+down_revision = '8d3e5b7c1a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS student_search '
+            "USING fts5(student_id, first_name, last_name, class_name, prefix='2 3')"
+        )
+        op.execute(
+            'INSERT INTO student_search (rowid, student_id, first_name, last_name, class_name) '
+            'SELECT student.id, student.student_id, student.first_name, student.last_name, class.name '
+            'FROM student JOIN class ON class.id = student.class_id'
+        )
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute(
+            'CREATE INDEX IF NOT EXISTS ix_student_search_trgm ON student '
+            "USING gin ((student_id || ' ' || first_name || ' ' || last_name) gin_trgm_ops)"
+        )
+        op.execute('CREATE INDEX IF NOT EXISTS ix_class_name_trgm ON class USING gin (name gin_trgm_ops)')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS student_search')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_student_search_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_class_name_trgm')
@@ -0,0 +1,35 @@
+"""widen user password for hashes
+
+Revision ID: 9c4e7a2d5f16
+Revises: 7e1a4c9b3d52
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e7a2d5f16'
+down_revision = '7e1a4c9b3d52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Hashes (scrypt ~160 characters) do not fit the old 100 character column.
+    # Existing plaintext passwords are hashed by `flask passwords-hash-legacy`
+    # or on each user's next login.
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=100),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=100),
+               existing_nullable=False)
@@ -0,0 +1,28 @@
+"""job heartbeat
+
+Revision ID: a3e8f1c5d290
+Revises: f2c7d9a4b816
+Create Date: 2026-10-18 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e8f1c5d290'
+down_revision = 'f2c7d9a4b816'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Running jobs without a heartbeat fall back to started_at when a worker
+    # looks for jobs left behind by a crashed worker.
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
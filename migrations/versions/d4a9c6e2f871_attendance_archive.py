@@ -0,0 +1,136 @@
+"""attendance archive and yearly partitions
+
+Revision ID: d4a9c6e2f871
+Revises: b7d2e5f8c3a1
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+import json
+import zlib
+from datetime import date, timedelta
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9c6e2f871'
+down_revision = 'b7d2e5f8c3a1'
+branch_labels = None
+depends_on = None
+
+
+ATTENDANCE_COLUMNS = 'id, student_id, date, status, notes, created_at'
+
+UNPACKED_INSERT = sa.text(
+    'INSERT INTO attendance (student_id, date, status, notes, created_at) '
+    'SELECT :student_id, :date, :status, :notes, :created_at '
+    'WHERE NOT EXISTS (SELECT 1 FROM attendance WHERE student_id = :student_id AND date = :date)'
+)
+
+
+def academic_year_start(day):
+    return day.year if day.month >= 8 else day.year - 1
+
+
+def upgrade():
+    op.create_table('attendance_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('academic_year', sa.String(length=20), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('absent', sa.Integer(), nullable=False),
+    sa.Column('late', sa.Integer(), nullable=False),
+    sa.Column('excused', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('student_id', 'academic_year')
+    )
+    with op.batch_alter_table('attendance_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_archive_academic_year', ['academic_year'], unique=False)
+
+    # On PostgreSQL attendance becomes a table partitioned by academic year. The
+    # partition key has to be part of every unique index, so the primary key
+    # becomes (id, date); ids keep coming from the same sequence.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    oldest, newest = bind.execute(sa.text('SELECT min(date), max(date) FROM attendance')).one()
+    today = date.today()
+    first = academic_year_start(oldest or today)
+    last = max(academic_year_start(newest or today), academic_year_start(today)) + 1
+
+    op.execute('DROP INDEX ix_attendance_student_id_date')
+    op.execute('DROP INDEX ix_attendance_date_id')
+    op.execute('ALTER TABLE attendance RENAME TO attendance_unpartitioned')
+    op.execute('ALTER TABLE attendance_unpartitioned RENAME CONSTRAINT attendance_pkey TO attendance_unpartitioned_pkey')
+    op.execute('ALTER SEQUENCE attendance_id_seq OWNED BY NONE')
+    op.execute(
+        'CREATE TABLE attendance ('
+        "id INTEGER NOT NULL DEFAULT nextval('attendance_id_seq'), "
+        'student_id INTEGER NOT NULL REFERENCES student (id), '
+        'date DATE NOT NULL, '
+        'status VARCHAR(10) NOT NULL, '
+        'notes TEXT, '
+        'created_at TIMESTAMP WITHOUT TIME ZONE, '
+        'PRIMARY KEY (id, date)'
+        ') PARTITION BY RANGE (date)'
+    )
+    for year in range(first, last + 1):
+        op.execute(
+            f'CREATE TABLE attendance_{year}_{year + 1} PARTITION OF attendance '
+            f"FOR VALUES FROM ('{year}-08-01') TO ('{year + 1}-08-01')"
+        )
+    op.execute('CREATE TABLE attendance_default PARTITION OF attendance DEFAULT')
+    op.execute('CREATE UNIQUE INDEX ix_attendance_student_id_date ON attendance (student_id, date)')
+    op.execute('CREATE INDEX ix_attendance_date_id ON attendance (date, id)')
+    op.execute(f'INSERT INTO attendance ({ATTENDANCE_COLUMNS}) SELECT {ATTENDANCE_COLUMNS} FROM attendance_unpartitioned')
+    op.execute('DROP TABLE attendance_unpartitioned')
+    op.execute('ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE attendance RENAME TO attendance_partitioned')
+        op.execute('ALTER INDEX ix_attendance_student_id_date RENAME TO ix_attendance_partitioned_student_id_date')
+        op.execute('ALTER INDEX ix_attendance_date_id RENAME TO ix_attendance_partitioned_date_id')
+        op.execute('ALTER TABLE attendance_partitioned RENAME CONSTRAINT attendance_pkey TO attendance_partitioned_pkey')
+        op.execute('ALTER SEQUENCE attendance_id_seq OWNED BY NONE')
+        op.execute(
+            'CREATE TABLE attendance ('
+            "id INTEGER NOT NULL DEFAULT nextval('attendance_id_seq') PRIMARY KEY, "
+            'student_id INTEGER NOT NULL REFERENCES student (id), '
+            'date DATE NOT NULL, '
+            'status VARCHAR(10) NOT NULL, '
+            'notes TEXT, '
+            'created_at TIMESTAMP WITHOUT TIME ZONE'
+            ')'
+        )
+        op.execute(f'INSERT INTO attendance ({ATTENDANCE_COLUMNS}) SELECT {ATTENDANCE_COLUMNS} FROM attendance_partitioned')
+        op.execute('DROP TABLE attendance_partitioned')
+        op.execute('ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id')
+        op.execute('CREATE UNIQUE INDEX ix_attendance_student_id_date ON attendance (student_id, date)')
+        op.execute('CREATE INDEX ix_attendance_date_id ON attendance (date, id)')
+
+    # Archived records go back into attendance before the archive is dropped
+    # (the same [day offset from August 1st, status, notes] format as archive.py)
+    if context.is_offline_mode():
+        raise RuntimeError('Downgrading the attendance archive needs a database connection to restore the records')
+    archives = bind.execute(sa.text('SELECT student_id, academic_year, data, created_at FROM attendance_archive'))
+    for student_id, academic_year, data, created_at in archives.all():
+        start = date(int(academic_year[:4]), 8, 1)
+        records = json.loads(zlib.decompress(data).decode('utf-8'))
+        bind.execute(UNPACKED_INSERT, [
+            {'student_id': student_id, 'date': start + timedelta(days=offset), 'status': status,
+             'notes': notes, 'created_at': created_at}
+            for offset, status, notes in records
+        ])
+
+    with op.batch_alter_table('attendance_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_archive_academic_year')
+
+    op.drop_table('attendance_archive')
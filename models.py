@@ -1,13 +1,21 @@
-from app import db
+from extensions import db, listen_once
 from datetime import datetime
 from flask_login import UserMixin
+from sqlalchemy import inspect, select, update, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import with_loader_criteria
+
+# Index over the rows that are not soft-deleted (see skip_deleted_rows below)
+def live_index(name, *columns):
+    return db.Index(name, *columns, sqlite_where=text('deleted_at IS NULL'),
+                    postgresql_where=text('deleted_at IS NULL'))
 
 # User model
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(255), nullable=False)  # hash, see passwords.py
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
     is_admin = db.Column(db.Boolean, default=False)
@@ -19,9 +27,14 @@ class Class(db.Model):
     name = db.Column(db.String(50), unique=True, nullable=False)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime)
     
     # Relationships
     students = db.relationship('Student', backref=db.backref('class', lazy=True))
+    
+    __table_args__ = (
+        live_index('ix_class_live_name', 'name'),
+    )
 
 # Student model
 class Student(db.Model):
@@ -36,10 +49,18 @@ class Student(db.Model):
     email = db.Column(db.String(100))
     class_id = db.Column(db.Integer, db.ForeignKey('class.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime)
     
     # Relationships
     grades = db.relationship('Grade', backref=db.backref('student', lazy=True))
     attendances = db.relationship('Attendance', backref=db.backref('student', lazy=True))
+    attendance_archives = db.relationship('AttendanceArchive', backref=db.backref('student', lazy=True))
+    
+    # Student list pages and class rosters
+    __table_args__ = (
+        live_index('ix_student_live_id', 'id'),
+        live_index('ix_student_live_class_id', 'class_id', 'id'),
+    )
 
 # Grade model
 class Grade(db.Model):
@@ -51,6 +72,12 @@ class Grade(db.Model):
     semester = db.Column(db.String(20), nullable=False)
     academic_year = db.Column(db.String(20), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_grade_student_term_subject', 'student_id', 'academic_year', 'semester', 'subject'),
+        live_index('ix_grade_live_id', 'id'),
+    )
 
 # Attendance model
 class Attendance(db.Model):
@@ -59,4 +86,206 @@ class Attendance(db.Model):
     date = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(10), nullable=False)  # present, absent, late, excused
     notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime)
+    
+    # One record per student per day; also serves the per-student history ordered by date
+    __table_args__ = (
+        db.Index('ix_attendance_student_id_date', 'student_id', 'date', unique=True),
+        live_index('ix_attendance_date_id', 'date', 'id'),
+    )
+
+# Grade summary per student per term (maintained by aggregates.py)
+class StudentGradeSummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    class_id = db.Column(db.Integer, db.ForeignKey('class.id'), nullable=False)
+    academic_year = db.Column(db.String(20), nullable=False)
+    semester = db.Column(db.String(20), nullable=False)
+    average = db.Column(db.Float, nullable=False)
+    min_score = db.Column(db.Float, nullable=False)
+    max_score = db.Column(db.Float, nullable=False)
+    grade_count = db.Column(db.Integer, nullable=False)
+    class_rank = db.Column(db.Integer, nullable=False)
+    
+    # Relationships
+    student = db.relationship('Student')
+    
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'academic_year', 'semester'),
+        db.Index('ix_student_grade_summary_class_term_rank', 'class_id', 'academic_year', 'semester', 'class_rank'),
+    )
+
+# Grade summary per class per term (maintained by aggregates.py)
+class ClassGradeSummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    class_id = db.Column(db.Integer, db.ForeignKey('class.id'), nullable=False)
+    academic_year = db.Column(db.String(20), nullable=False)
+    semester = db.Column(db.String(20), nullable=False)
+    average = db.Column(db.Float, nullable=False)
+    min_score = db.Column(db.Float, nullable=False)
+    max_score = db.Column(db.Float, nullable=False)
+    grade_count = db.Column(db.Integer, nullable=False)
+    student_count = db.Column(db.Integer, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('class_id', 'academic_year', 'semester'),
+    )
+
+# Attendance counts per class per day (maintained by analytics.py)
+class AttendanceDailySummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    class_id = db.Column(db.Integer, db.ForeignKey('class.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('class_id', 'date'),
+        db.Index('ix_attendance_daily_summary_date', 'date'),
+    )
+
+# Attendance of closed academic years, one compressed row per student per year
+# (written by `flask attendance-archive`, read-only afterwards; see archive.py)
+class AttendanceArchive(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    academic_year = db.Column(db.String(20), nullable=False)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    data = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON records
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'academic_year'),
+        db.Index('ix_attendance_archive_academic_year', 'academic_year'),
+    )
+
+# Background job (queued by the web app, run by `flask jobs-worker`, see jobs.py)
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    result_path = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # refreshed by the worker while it runs the job
+    finished_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_job_status_created_at', 'status', 'created_at'),
+    )
+
+# Append-only feed of row changes for incremental sync (see changelog.py).
+# seq only grows, also across deletes of old entries (AUTOINCREMENT on SQLite).
+class ChangeLog(db.Model):
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    table_name = db.Column(db.String(30), nullable=False)
+    record_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert, update, delete
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_change_log_table_name_seq', 'table_name', 'seq'),
+        db.Index('ix_change_log_changed_at', 'changed_at'),
+        {'sqlite_autoincrement': True},
+    )
+
+# Version counters for cached pages (see fragment_cache.py).
+# Keys are per table ('table:student') or per entity ('student:12', 'class:3');
+# every flush that writes a row bumps the keys of the pages showing it.
+class ModelVersion(db.Model):
+    key = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def bump_versions(connection, keys):
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    table = ModelVersion.__table__
+    now = datetime.utcnow()
+    dialect = {'sqlite': sqlite, 'postgresql': postgresql}.get(connection.dialect.name)
+    
+    if dialect is not None:
+        stmt = dialect.insert(table).on_conflict_do_update(
+            index_elements=['key'],
+            set_={'version': table.c.version + 1, 'updated_at': now}
+        )
+        connection.execute(stmt, [{'key': key, 'version': 1, 'updated_at': now} for key in keys])
+        return
+    
+    connection.execute(update(table).where(table.c.key.in_(keys)).values(version=table.c.version + 1, updated_at=now))
+    existing = set(connection.scalars(select(table.c.key).where(table.c.key.in_(keys))))
+    missing = [{'key': key, 'version': 1, 'updated_at': now} for key in keys if key not in existing]
+    if missing:
+        connection.execute(table.insert(), missing)
+
+# Keys of the pages showing these students: their own and their classes' (ranks, rosters)
+def student_version_keys(connection, student_ids):
+    student_ids = set(student_ids)
+    if not student_ids:
+        return set()
+    class_ids = connection.scalars(select(Student.class_id).where(Student.id.in_(student_ids)).distinct())
+    return {f'student:{student_id}' for student_id in student_ids} | {f'class:{class_id}' for class_id in class_ids}
+
+def current_and_previous(obj, name):
+    # The attribute's value plus its pre-flush value when the flush changed it
+    history = inspect(obj).attrs[name].history
+    return {value for value in [getattr(obj, name), *(history.deleted or ())] if value is not None}
+
+def bump_model_versions(session, flush_context):
+    keys = set()
+    student_ids = set()
+    
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Student):
+            keys |= {'table:student', f'student:{obj.id}'}
+            keys |= {f'class:{class_id}' for class_id in current_and_previous(obj, 'class_id')}
+        elif isinstance(obj, Class):
+            keys |= {'table:class', f'class:{obj.id}'}
+        elif isinstance(obj, Grade):
+            keys.add('table:grade')
+            student_ids |= current_and_previous(obj, 'student_id')
+        elif isinstance(obj, Attendance):
+            keys.add('table:attendance')
+            keys |= {f'student:{student_id}' for student_id in current_and_previous(obj, 'student_id')}
+        elif isinstance(obj, User):
+            keys.add(f'user:{obj.id}')
+    
+    if keys or student_ids:
+        connection = session.connection()
+        bump_versions(connection, keys | student_version_keys(connection, student_ids))
+
+# Soft deletes.
+# A student or class with history is not deleted but gets deleted_at set, and so do
+# the records under it, with the same timestamp (see soft_delete.py). ORM reads skip
+# those rows unless run with execution_options(include_deleted=True); statements run
+# on a connection filter them with live().
+SOFT_DELETE_MODELS = (Class, Student, Grade, Attendance)
+
+def live(model):
+    return model.deleted_at.is_(None)
+
+def skip_deleted_rows(execute_state):
+    if (execute_state.is_select and not execute_state.is_column_load
+            and not execute_state.execution_options.get('include_deleted')):
+        execute_state.statement = execute_state.statement.options(*[
+            with_loader_criteria(model, live, include_aliases=True) for model in SOFT_DELETE_MODELS
+        ])
+
+# Session hooks, registered by create_app
+def init_app(app):
+    listen_once(db.session, 'after_flush', bump_model_versions)
+    listen_once(db.session, 'do_orm_execute', skip_deleted_rows)
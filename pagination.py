@@ -0,0 +1,112 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import current_app, request
+from extensions import db
+
+
+# Cursor helpers
+def encode_cursor(values):
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(payload, list) or len(payload) != len(columns):
+        return None
+
+    values = []
+    for column, value in zip(columns, payload):
+        # Dates travel as ISO strings and have to be turned back into dates before binding
+        try:
+            if isinstance(column.type, db.DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, db.Date):
+                value = date.fromisoformat(value)
+        except (ValueError, TypeError):
+            return None
+        values.append(value)
+    return values
+
+
+# One page of a keyset-paginated query
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+# Seek through a query on the given key columns instead of using OFFSET.
+# The key columns must be unique together (end them with the primary key),
+# so every page costs one index range scan no matter how deep it is.
+def paginate_keyset(query, columns, descending=False, per_page=None, after=None, before=None):
+    if after is None and before is None:
+        after = request.args.get('after')
+        before = request.args.get('before')
+
+    query, seek = keyset_query(query, columns, descending, per_page, after, before)
+    return keyset_page(query.all(), columns, seek)
+
+
+# The two halves of paginate_keyset, for callers that execute the statement
+# themselves (Core selects, the async handlers in asgi.py)
+def keyset_query(query, columns, descending=False, per_page=None, after=None, before=None):
+    per_page = per_page or current_app.config.get('POSTS_PER_PAGE', 20)
+    key = db.tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    def bind(values):
+        return db.tuple_(*values) if len(values) > 1 else values[0]
+
+    # Walking backwards flips both the seek predicate and the sort order.
+    # An unreadable cursor simply falls back to the first page.
+    backwards = bool(before) and not after
+    raw_cursor = before if backwards else after
+    cursor = decode_cursor(raw_cursor, columns) if raw_cursor else None
+    if cursor is None:
+        backwards = False
+    reverse = descending != backwards
+
+    if cursor is not None:
+        query = query.filter(key < bind(cursor) if reverse else key > bind(cursor))
+    query = query.order_by(*[column.desc() if reverse else column.asc() for column in columns])
+    return query.limit(per_page + 1), (cursor, backwards, per_page)
+
+
+def keyset_page(rows, columns, seek):
+    cursor, backwards, per_page = seek
+
+    def cursor_for(item):
+        return encode_cursor([getattr(item, column.key) for column in columns])
+
+    has_more = len(rows) > per_page
+    items = list(rows[:per_page])
+
+    if backwards:
+        items.reverse()
+        prev_cursor = cursor_for(items[0]) if has_more else None
+        next_cursor = cursor_for(items[-1]) if items else None
+    else:
+        next_cursor = cursor_for(items[-1]) if has_more else None
+        prev_cursor = cursor_for(items[0]) if cursor is not None and items else None
+
+    return KeysetPage(items, next_cursor=next_cursor, prev_cursor=prev_cursor)
@@ -0,0 +1,177 @@
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select, update
+from werkzeug.security import generate_password_hash, check_password_hash
+from extensions import db
+from models import User
+from user_cache import evict_user
+
+# Password hashing.
+# PASSWORD_HASH_METHOD selects pbkdf2, scrypt or argon2 (needs argon2-cffi) and the
+# PASSWORD_* settings set its cost. Stored hashes carry their own parameters, so a
+# hash made with older settings still verifies and is replaced after the next login.
+# Hashing runs in a bounded thread pool (hashlib and argon2 release the GIL), which
+# caps how many CPU-heavy hashes a worker runs at once during a login spike.
+
+WERKZEUG_PREFIXES = ('pbkdf2:', 'scrypt:')
+ARGON2_PREFIX = '$argon2'
+
+
+class WerkzeugHasher:
+    def __init__(self, method):
+        self.method = method
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def needs_rehash(self, stored):
+        return not stored.startswith(self.method + '$')
+
+
+class Argon2Hasher:
+    def __init__(self, time_cost, memory_cost, parallelism):
+        from argon2 import PasswordHasher
+        self.hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+    def hash(self, password):
+        return self.hasher.hash(password)
+
+    def needs_rehash(self, stored):
+        return not stored.startswith(ARGON2_PREFIX) or self.hasher.check_needs_rehash(stored)
+
+
+def create_hasher(config):
+    method = config.get('PASSWORD_HASH_METHOD', 'scrypt')
+    if method == 'pbkdf2':
+        return WerkzeugHasher(f'pbkdf2:sha256:{config.get("PASSWORD_PBKDF2_ITERATIONS", 600000)}')
+    if method == 'scrypt':
+        return WerkzeugHasher('scrypt:{}:{}:{}'.format(
+            config.get('PASSWORD_SCRYPT_N', 32768),
+            config.get('PASSWORD_SCRYPT_R', 8),
+            config.get('PASSWORD_SCRYPT_P', 1)
+        ))
+    if method == 'argon2':
+        try:
+            return Argon2Hasher(
+                config.get('PASSWORD_ARGON2_TIME_COST', 2),
+                config.get('PASSWORD_ARGON2_MEMORY_COST', 19456),
+                config.get('PASSWORD_ARGON2_PARALLELISM', 1)
+            )
+        except ImportError:
+            raise ValueError('argon2 password hashing needs the argon2-cffi package')
+    raise ValueError(f'Unknown password hash method: {method}')
+
+
+def get_hasher():
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        hasher = current_app.extensions['password_hasher'] = create_hasher(current_app.config)
+    return hasher
+
+
+def get_pool():
+    pool = current_app.extensions.get('password_pool')
+    if pool is None:
+        workers = current_app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        pool = current_app.extensions['password_pool'] = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='password-hash'
+        )
+    return pool
+
+
+# Verification, by the scheme of the stored value
+def verify_hash(stored, password):
+    if stored.startswith(WERKZEUG_PREFIXES):
+        return check_password_hash(stored, password)
+    if stored.startswith(ARGON2_PREFIX):
+        from argon2 import PasswordHasher
+        from argon2.exceptions import VerificationError, InvalidHashError
+        try:
+            return PasswordHasher().verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    # Plaintext left from before hashing; replaced after the next successful login
+    return hmac.compare_digest(stored.encode('utf-8'), password.encode('utf-8'))
+
+
+def is_hashed(stored):
+    return stored.startswith(WERKZEUG_PREFIXES + (ARGON2_PREFIX,))
+
+
+def hash_password(password):
+    hasher = get_hasher()
+    return get_pool().submit(hasher.hash, password).result()
+
+
+def verify_password(stored, password):
+    return get_pool().submit(verify_hash, stored, password).result()
+
+
+def rehash_statement(user_id, stored, new_hash):
+    table = User.__table__
+    return update(table).where(table.c.id == user_id, table.c.password == stored).values(password=new_hash)
+
+
+# Swap in a hash with the current settings, by default without holding up the login
+# response. The UPDATE only applies while the stored value is still the one verified.
+def schedule_rehash(user_id, stored, password):
+    hasher = get_hasher()
+    if not current_app.config.get('PASSWORD_REHASH_IN_BACKGROUND', True):
+        result = db.session.execute(rehash_statement(user_id, stored, hash_password(password)))
+        db.session.commit()
+        if result.rowcount:
+            evict_user(user_id)
+        return
+
+    flask_app = current_app._get_current_object()
+
+    def rehash():
+        try:
+            new_hash = hasher.hash(password)
+            with flask_app.app_context():
+                with db.engine.begin() as connection:
+                    result = connection.execute(rehash_statement(user_id, stored, new_hash))
+                # The cached columns still hold the old hash
+                if result.rowcount:
+                    evict_user(user_id)
+        except Exception:
+            flask_app.logger.exception('Password rehash failed for user %s', user_id)
+
+    get_pool().submit(rehash)
+
+
+# Login check. Unknown users still pay for one hash, so response times do not
+# reveal which usernames exist.
+def check_user_password(user, password):
+    if user is None:
+        dummy = current_app.extensions.get('password_dummy_hash')
+        if dummy is None:
+            dummy = current_app.extensions['password_dummy_hash'] = hash_password('')
+        verify_password(dummy, password)
+        return False
+
+    stored = user.password
+    if not verify_password(stored, password):
+        return False
+    if not is_hashed(stored) or get_hasher().needs_rehash(stored):
+        schedule_rehash(user.id, stored, password)
+    return True
+
+
+@click.command('passwords-hash-legacy')
+@with_appcontext
+def passwords_hash_legacy_command():
+    """Hash every password still stored in plaintext."""
+    hasher = get_hasher()
+    rows = db.session.execute(select(User.id, User.password)).all()
+    legacy = [(user_id, stored) for user_id, stored in rows if not is_hashed(stored)]
+    hashes = get_pool().map(lambda row: hasher.hash(row[1]), legacy)
+
+    for (user_id, stored), new_hash in zip(legacy, hashes):
+        db.session.execute(rehash_statement(user_id, stored, new_hash))
+    db.session.commit()
+    click.echo(f'Hashed {len(legacy)} plaintext passwords')
@@ -0,0 +1,263 @@
+import re
+import click
+from flask import current_app, request
+from flask.cli import with_appcontext
+from sqlalchemy import text, select, insert, delete, func, literal_column
+from sqlalchemy.sql import table, column
+from extensions import db, listen_once
+from models import Class, Student, live
+
+SEARCH_TABLE = 'student_search'
+
+# FTS5 index keyed by student.id (the rowid); never read directly by the ORM
+student_search = table(
+    SEARCH_TABLE,
+    column('rowid'),
+    column('student_id'),
+    column('first_name'),
+    column('last_name'),
+    column('class_name'),
+)
+
+
+# One page of search results (student primary keys, best match first)
+class SearchResults:
+    def __init__(self, ids, page, per_page, has_next):
+        self.ids = ids
+        self.page = page
+        self.per_page = per_page
+        self.has_next = has_next
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+
+# Base backend: ILIKE scan, used where no index is available
+class LikeBackend:
+    name = 'like'
+
+    def create(self, connection):
+        pass
+
+    def drop(self, connection):
+        pass
+
+    def rebuild(self, connection):
+        pass
+
+    def index_students(self, connection, condition):
+        pass
+
+    def remove_students(self, connection, student_ids):
+        pass
+
+    def search(self, connection, term, limit, offset):
+        pattern = f'%{term}%'
+        query = select(Student.id).join(Class, Student.class_id == Class.id).where(
+            live(Student),
+            db.or_(
+                Student.first_name.ilike(pattern),
+                Student.last_name.ilike(pattern),
+                Student.student_id.ilike(pattern),
+                Class.name.ilike(pattern)
+            )
+        ).order_by(Student.last_name, Student.first_name, Student.id).limit(limit).offset(offset)
+        return [student_id for (student_id,) in connection.execute(query)]
+
+
+# SQLite FTS5 backend: prefix matching ranked with bm25, kept in sync by session events
+class SqliteFtsBackend(LikeBackend):
+    name = 'sqlite-fts5'
+
+    # bm25 column weights: student_id, first_name, last_name, class_name
+    weights = (10.0, 5.0, 5.0, 1.0)
+
+    def create(self, connection):
+        connection.execute(text(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            "USING fts5(student_id, first_name, last_name, class_name, prefix='2 3')"
+        ))
+
+    def drop(self, connection):
+        connection.execute(text(f'DROP TABLE IF EXISTS {SEARCH_TABLE}'))
+
+    def rebuild(self, connection):
+        self.drop(connection)
+        self.create(connection)
+        self.index_students(connection, None)
+
+    def index_students(self, connection, condition):
+        source = select(Student.id, Student.student_id, Student.first_name, Student.last_name, Class.name) \
+            .join(Class, Student.class_id == Class.id).where(live(Student))
+        if condition is not None:
+            ids = select(Student.id).where(condition)
+            connection.execute(delete(student_search).where(student_search.c.rowid.in_(ids)))
+            source = source.where(condition)
+        connection.execute(insert(student_search).from_select(
+            ['rowid', 'student_id', 'first_name', 'last_name', 'class_name'], source
+        ))
+
+    def remove_students(self, connection, student_ids):
+        connection.execute(delete(student_search).where(student_search.c.rowid.in_(list(student_ids))))
+
+    @staticmethod
+    def match_expression(term):
+        # Every word must match as a prefix; quoting keeps FTS syntax out of user input
+        words = re.findall(r'\w+', term)
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def search(self, connection, term, limit, offset):
+        expression = self.match_expression(term)
+        if not expression:
+            return []
+        rank = func.bm25(literal_column(SEARCH_TABLE), *self.weights)
+        query = select(student_search.c.rowid).where(
+            literal_column(SEARCH_TABLE).op('MATCH')(expression)
+        ).order_by(rank, student_search.c.rowid).limit(limit).offset(offset)
+        return [student_id for (student_id,) in connection.execute(query)]
+
+
+# Postgres pg_trgm backend: trigram GIN indexes on the base tables, maintained by Postgres itself
+class PgTrgmBackend(LikeBackend):
+    name = 'pg-trgm'
+
+    def create(self, connection):
+        connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_student_search_trgm ON student '
+            "USING gin ((student_id || ' ' || first_name || ' ' || last_name) gin_trgm_ops)"
+        ))
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_class_name_trgm ON class USING gin (name gin_trgm_ops)'
+        ))
+
+    def drop(self, connection):
+        connection.execute(text('DROP INDEX IF EXISTS ix_student_search_trgm'))
+        connection.execute(text('DROP INDEX IF EXISTS ix_class_name_trgm'))
+
+    def rebuild(self, connection):
+        self.drop(connection)
+        self.create(connection)
+
+    def search(self, connection, term, limit, offset):
+        # Must match the indexed expression exactly for the planner to use the GIN index
+        document = literal_column("(student.student_id || ' ' || student.first_name || ' ' || student.last_name)")
+        pattern = f'%{term}%'
+        query = select(Student.id).join(Class, Student.class_id == Class.id).where(
+            live(Student),
+            db.or_(document.ilike(pattern), Class.name.ilike(pattern))
+        ).order_by(
+            func.greatest(func.word_similarity(term, document), func.similarity(Class.name, term)).desc(),
+            Student.id
+        ).limit(limit).offset(offset)
+        return [student_id for (student_id,) in connection.execute(query)]
+
+
+SEARCH_BACKENDS = {
+    LikeBackend.name: LikeBackend,
+    SqliteFtsBackend.name: SqliteFtsBackend,
+    PgTrgmBackend.name: PgTrgmBackend,
+}
+
+DIALECT_BACKENDS = {
+    'sqlite': SqliteFtsBackend.name,
+    'postgresql': PgTrgmBackend.name,
+}
+
+
+# Backend configured by SEARCH_BACKEND ('auto' picks one from the database dialect)
+def get_backend():
+    backend = current_app.extensions.get('search_backend')
+    if backend is None:
+        name = current_app.config.get('SEARCH_BACKEND', 'auto')
+        if name == 'auto':
+            name = DIALECT_BACKENDS.get(db.engine.dialect.name, LikeBackend.name)
+        backend = SEARCH_BACKENDS[name]()
+        current_app.extensions['search_backend'] = backend
+    return backend
+
+
+def search_students(term, page=1, per_page=None):
+    per_page = per_page or current_app.config.get('POSTS_PER_PAGE', 20)
+    page = max(page, 1)
+    ids = get_backend().search(db.session.connection(), term.strip(), per_page + 1, (page - 1) * per_page)
+    return SearchResults(ids[:per_page], page, per_page, len(ids) > per_page)
+
+
+# Student pickers: the term and number of matches asked for
+def autocomplete_args():
+    term = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 10, type=int), current_app.config.get('AUTOCOMPLETE_MAX_RESULTS', 50))
+    return term, limit
+
+
+# One query for the labels of the matched students
+def autocomplete_statement(ids):
+    return select(Student.id, Student.student_id, Student.first_name, Student.last_name) \
+        .where(Student.id.in_(ids), live(Student))
+
+
+# Labels in match order (best first)
+def autocomplete_payload(ids, rows):
+    found = {row.id: row for row in rows}
+    return [
+        {
+            'id': row.id,
+            'student_id': row.student_id,
+            'label': f'{row.first_name} {row.last_name} ({row.student_id})'
+        }
+        for row in (found[student_id] for student_id in ids if student_id in found)
+    ]
+
+
+# Create the FTS table alongside the student table (db.create_all and fresh databases)
+def create_search_index(target, connection, **kw):
+    if connection.dialect.name in DIALECT_BACKENDS:
+        SEARCH_BACKENDS[DIALECT_BACKENDS[connection.dialect.name]]().create(connection)
+
+
+# Keep the index in sync with student and class writes, inside the same transaction
+def sync_search_index(session, flush_context):
+    changed = set()
+    removed = set()
+    renamed_classes = set()
+
+    for obj in session.new:
+        if isinstance(obj, Student):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Student) and session.is_modified(obj, include_collections=False):
+            changed.add(obj.id)
+        elif isinstance(obj, Class) and db.inspect(obj).attrs.name.history.has_changes():
+            renamed_classes.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Student):
+            removed.add(obj.id)
+
+    if not (changed or removed or renamed_classes):
+        return
+
+    backend = get_backend()
+    connection = session.connection()
+    if removed:
+        backend.remove_students(connection, removed)
+    if changed:
+        backend.index_students(connection, Student.id.in_(changed))
+    if renamed_classes:
+        backend.index_students(connection, Student.class_id.in_(renamed_classes))
+
+
+def init_app(app):
+    listen_once(Student.__table__, 'after_create', create_search_index)
+    listen_once(db.session, 'after_flush', sync_search_index)
+
+
+@click.command('search-rebuild')
+@with_appcontext
+def search_rebuild_command():
+    """Drop and rebuild the student search index."""
+    backend = get_backend()
+    with db.engine.begin() as connection:
+        backend.rebuild(connection)
+    click.echo(f'Search index rebuilt ({backend.name})')
@@ -0,0 +1,155 @@
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, update, exists, text
+from extensions import db
+from models import Class, Student, Grade, Attendance, AttendanceArchive, bump_versions, live
+from aggregates import refresh_class_terms
+from analytics import refresh_class_days
+from changelog import log_changes, log_changes_from
+from search_index import get_backend
+from stats import mark_stale, attendance_key, COUNTS_KEY, STUDENTS_PER_CLASS_KEY
+
+# Soft deletes of students and classes.
+# A student with grades or attendance (or a class with students) is archived rather
+# than deleted: deleted_at is set on it and, with the same timestamp, on everything
+# under it, one UPDATE per table whatever the size of the history. Restoring clears
+# the rows carrying that timestamp, so records deleted on their own stay deleted.
+# The statements bypass the session events, so the summaries, search index, change
+# log, page versions and dashboard stats are maintained here for the whole set.
+# Students and classes without history are still deleted outright.
+
+
+def student_has_history(student_id):
+    return db.session.scalar(select(
+        exists().where(Grade.student_id == student_id)
+        | exists().where(Attendance.student_id == student_id)
+        | exists().where(AttendanceArchive.student_id == student_id)
+    ).execution_options(include_deleted=True))
+
+
+def class_has_students(class_id):
+    return db.session.scalar(
+        select(exists().where(Student.class_id == class_id)).execution_options(include_deleted=True)
+    )
+
+
+def deleted_at_is(model, deleted_at):
+    return live(model) if deleted_at is None else model.deleted_at == deleted_at
+
+
+def set_deleted_at(model, condition, deleted_at):
+    db.session.execute(
+        update(model).where(condition).values(deleted_at=deleted_at).execution_options(synchronize_session=False)
+    )
+
+
+# Move students and their grades and attendance from deleted_at `old` to `new`
+# (None is live): archive with old=None, restore with new=None
+def move_students(student_ids, old, new):
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    grades = (Grade.student_id.in_(student_ids), deleted_at_is(Grade, old))
+    attendance = (Attendance.student_id.in_(student_ids), deleted_at_is(Attendance, old))
+    op = 'delete' if new is not None else 'insert'
+
+    connection = db.session.connection()
+    class_terms = connection.execute(
+        select(Student.class_id, Grade.academic_year, Grade.semester)
+        .join(Student, Grade.student_id == Student.id).where(*grades).distinct()
+    ).all()
+    class_days = connection.execute(
+        select(Student.class_id, Attendance.date)
+        .join(Student, Attendance.student_id == Student.id).where(*attendance).distinct()
+    ).all()
+    class_ids = connection.scalars(select(Student.class_id).where(Student.id.in_(student_ids)).distinct()).all()
+
+    log_changes_from(connection, 'grade', op, select(Grade.id).where(*grades))
+    log_changes_from(connection, 'attendance', op, select(Attendance.id).where(*attendance))
+    log_changes(connection, 'student', op, sorted(student_ids))
+    set_deleted_at(Grade, grades[0] & grades[1], new)
+    set_deleted_at(Attendance, attendance[0] & attendance[1], new)
+    set_deleted_at(Student, Student.id.in_(student_ids) & deleted_at_is(Student, old), new)
+
+    refresh_class_terms(connection, class_terms)
+    refresh_class_days(connection, class_days)
+    if new is None:
+        get_backend().index_students(connection, Student.id.in_(student_ids))
+    else:
+        get_backend().remove_students(connection, student_ids)
+    bump_versions(connection, {'table:student', 'table:grade', 'table:attendance'}
+                  | {f'student:{student_id}' for student_id in student_ids}
+                  | {f'class:{class_id}' for class_id in class_ids})
+    mark_stale(db.session, COUNTS_KEY, STUDENTS_PER_CLASS_KEY, *{attendance_key(day) for _, day in class_days})
+
+
+def archive_student(student):
+    move_students([student.id], None, datetime.utcnow())
+
+
+def restore_student(student):
+    move_students([student.id], student.deleted_at, None)
+
+
+def move_class(class_, old, new):
+    connection = db.session.connection()
+    student_ids = connection.scalars(
+        select(Student.id).where(Student.class_id == class_.id, deleted_at_is(Student, old))
+    ).all()
+    log_changes(connection, 'class', 'delete' if new is not None else 'insert', [class_.id])
+    set_deleted_at(Class, Class.id == class_.id, new)
+    move_students(student_ids, old, new)
+    bump_versions(connection, ['table:class', f'class:{class_.id}'])
+    mark_stale(db.session, COUNTS_KEY, STUDENTS_PER_CLASS_KEY)
+
+
+# The class and the students deleted with it; students deleted before stay deleted
+def archive_class(class_):
+    move_class(class_, None, datetime.utcnow())
+
+
+def restore_class(class_):
+    move_class(class_, class_.deleted_at, None)
+
+
+# Deleted students, classes and records for good, with what was kept for them.
+# Plain SQL in foreign key order; the soft-delete migration only downgrades once
+# nothing is left for this to find.
+SOFT_DELETED_TABLES = ('student', 'class', 'grade', 'attendance')
+DELETED_STUDENTS = 'SELECT id FROM student WHERE deleted_at IS NOT NULL'
+DELETED_CLASSES = 'SELECT id FROM class WHERE deleted_at IS NOT NULL'
+PURGE_STATEMENTS = (
+    'DELETE FROM attendance WHERE deleted_at IS NOT NULL',
+    'DELETE FROM grade WHERE deleted_at IS NOT NULL',
+    f'DELETE FROM student_grade_summary WHERE student_id IN ({DELETED_STUDENTS})',
+    f'DELETE FROM attendance_archive WHERE student_id IN ({DELETED_STUDENTS})',
+    'DELETE FROM student WHERE deleted_at IS NOT NULL',
+    f'DELETE FROM student_grade_summary WHERE class_id IN ({DELETED_CLASSES})',
+    f'DELETE FROM class_grade_summary WHERE class_id IN ({DELETED_CLASSES})',
+    f'DELETE FROM attendance_daily_summary WHERE class_id IN ({DELETED_CLASSES})',
+    'DELETE FROM class WHERE deleted_at IS NOT NULL',
+)
+
+
+@click.command('deleted-purge')
+@click.option('--yes', is_flag=True, help='Delete the records instead of only counting them.')
+@with_appcontext
+def deleted_purge_command(yes):
+    """Count soft-deleted students, classes, grades and attendance; with --yes delete them for good."""
+    with db.engine.begin() as connection:
+        counts = {
+            table: connection.scalar(text(f'SELECT COUNT(*) FROM {table} WHERE deleted_at IS NOT NULL'))
+            for table in SOFT_DELETED_TABLES
+        }
+        if not any(counts.values()):
+            click.echo('No deleted records')
+            return
+        for table, count in counts.items():
+            click.echo(f'  {table}: {count}')
+        if not yes:
+            click.echo(f'{sum(counts.values())} deleted records would be purged; rerun with --yes to purge them')
+            return
+        for statement in PURGE_STATEMENTS:
+            connection.execute(text(statement))
+    click.echo(f'Purged {sum(counts.values())} deleted records')
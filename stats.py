@@ -0,0 +1,115 @@
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import object_session
+from extensions import db, listen_once
+from models import User, Class, Student, Attendance
+from cache import get_cache
+
+COUNTS_KEY = 'stats:counts'
+STUDENTS_PER_CLASS_KEY = 'stats:students_per_class'
+
+
+def attendance_key(day):
+    return f'stats:attendance:{day.isoformat()}'
+
+
+# Aggregates (only run on a cache miss)
+def compute_counts():
+    return {
+        'students': Student.query.count(),
+        'classes': Class.query.count(),
+        'users': User.query.count()
+    }
+
+
+def compute_students_per_class():
+    rows = db.session.query(Class.id, Class.name, func.count(Student.id)) \
+        .outerjoin(Student, Student.class_id == Class.id) \
+        .group_by(Class.id, Class.name) \
+        .order_by(Class.name)
+    return [{'id': class_id, 'name': name, 'students': total} for class_id, name, total in rows]
+
+
+def compute_attendance(day):
+    statuses = dict(
+        db.session.query(Attendance.status, func.count(Attendance.id))
+        .filter(Attendance.date == day)
+        .group_by(Attendance.status)
+    )
+    total = sum(statuses.values())
+    attended = statuses.get('present', 0) + statuses.get('late', 0)
+    return {
+        'date': day,
+        'statuses': statuses,
+        'total': total,
+        'rate': attended / total if total else None
+    }
+
+
+def cached(key, compute):
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, current_app.config.get('STATS_CACHE_TTL'))
+    return value
+
+
+# Everything the dashboard shows; served from the cache until a write invalidates it
+def get_dashboard_stats(day=None):
+    day = day or datetime.utcnow().date()
+    counts = cached(COUNTS_KEY, compute_counts)
+    return {
+        'total_students': counts['students'],
+        'total_classes': counts['classes'],
+        'total_users': counts['users'],
+        'students_per_class': cached(STUDENTS_PER_CLASS_KEY, compute_students_per_class),
+        'attendance_today': cached(attendance_key(day), lambda: compute_attendance(day))
+    }
+
+
+# Invalidation.
+# Mapper events record which keys a flush made stale; the keys are dropped once the
+# transaction commits, so a rolled back write never evicts (or repopulates) anything.
+def mark_stale(session, *keys):
+    session.info.setdefault('stale_stats', set()).update(keys)
+
+
+def stale_keys(target):
+    if isinstance(target, (Student, Class)):
+        return {COUNTS_KEY, STUDENTS_PER_CLASS_KEY}
+    if isinstance(target, User):
+        return {COUNTS_KEY}
+    if isinstance(target, Attendance):
+        # An edit can move the record to another date, so both dates are stale
+        history = inspect(target).attrs.date.history
+        days = set(history.added or ()) | set(history.deleted or ()) | {target.date}
+        return {attendance_key(day) for day in days if day is not None}
+    return set()
+
+
+def invalidate_on_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        mark_stale(session, *stale_keys(target))
+
+
+def drop_stale_stats(session):
+    keys = session.info.pop('stale_stats', None)
+    if keys and has_app_context():
+        get_cache().delete(*keys)
+
+
+def forget_stale_stats(session):
+    session.info.pop('stale_stats', None)
+
+
+def init_app(app):
+    for model in (User, Class, Student, Attendance):
+        listen_once(model, 'after_insert', invalidate_on_write)
+        listen_once(model, 'after_delete', invalidate_on_write)
+    for model in (Class, Student, Attendance):
+        listen_once(model, 'after_update', invalidate_on_write)
+    listen_once(db.session, 'after_commit', drop_stale_stats)
+    listen_once(db.session, 'after_rollback', forget_stale_stats)
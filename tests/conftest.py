@@ -0,0 +1,77 @@
+import datetime
+
+import pytest
+from jinja2 import DictLoader
+
+from app import create_app
+from extensions import db
+from models import User, Class, Student, Grade, Attendance
+from passwords import hash_password
+
+# Stand-ins for the page templates: each walks the relationships its page
+# renders, so the lazy loads a template would trigger count against the query
+# budgets. Any other template renders its title.
+TEMPLATES = {
+    'students.html': '{% for student in students %}{{ student.class.name }}{% endfor %}',
+    'student_detail.html': '{{ student.class.name }}{% for grade in grades %}{{ grade.subject }}{% endfor %}'
+                           '{% for record in attendances %}{{ record.status }}{% endfor %}',
+    'classes.html': '{% for class_ in classes %}{{ class_.students | length }}{% endfor %}',
+    'class_detail.html': '{% for student in students %}{{ student.last_name }}{% endfor %}',
+    'class_leaderboard.html': '{% for row in rankings %}{{ row.student.last_name }}{% endfor %}',
+    'grades.html': '{% for grade in grades %}{{ grade.student.class.name }}{% endfor %}',
+    'attendance.html': '{% for record in attendances %}{{ record.student.class.name }}{% endfor %}',
+    'search.html': '{% for student in students %}{{ student.class.name }}{% endfor %}',
+}
+
+CLASSES = 3
+STUDENTS = 30
+SUBJECTS = ('Math', 'Science', 'History')
+DAYS = [datetime.date(2025, 9, 1) + datetime.timedelta(days=day) for day in range(3)]
+
+
+class TemplateLoader(DictLoader):
+    def get_source(self, environment, template):
+        if template not in self.mapping:
+            return '{{ title }}', None, lambda: True
+        return super().get_source(environment, template)
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.jinja_env.loader = TemplateLoader(TEMPLATES)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+# Classes C0-C2 with ten students each; every student has a grade per subject
+# for the first semester of 2025-2026 and three days of attendance
+@pytest.fixture
+def dataset(app):
+    db.session.add(User(username='admin', email='admin@example.com', password=hash_password('secret'), is_admin=True))
+    classes = [Class(name=f'C{i}') for i in range(CLASSES)]
+    db.session.add_all(classes)
+    db.session.flush()
+    for i in range(STUDENTS):
+        student = Student(student_id=f'S{i:04d}', first_name=f'First{i}', last_name=f'Last{i}',
+                          class_id=classes[i % CLASSES].id)
+        db.session.add(student)
+        db.session.flush()
+        for subject in SUBJECTS:
+            db.session.add(Grade(student_id=student.id, subject=subject, score=60 + i,
+                                 semester='1st', academic_year='2025-2026'))
+        for day in DAYS:
+            db.session.add(Attendance(student_id=student.id, date=day, status='present'))
+    db.session.commit()
+    db.session.remove()
+
+
+@pytest.fixture
+def client(app, dataset):
+    client = app.test_client()
+    response = client.post('/login', data={'username': 'admin', 'password': 'secret'})
+    assert response.status_code == 302
+    return client
@@ -0,0 +1,29 @@
+import datetime
+
+from sqlalchemy import select, literal
+
+from analytics import period_expression
+from extensions import db
+
+
+def week_key(day):
+    return db.session.scalar(select(period_expression(literal(day), 'week')))
+
+
+def test_iso_week_keys(app):
+    assert week_key(datetime.date(2025, 9, 1)) == '2025-W36'
+    assert week_key(datetime.date(2025, 9, 7)) == '2025-W36'
+    assert week_key(datetime.date(2025, 9, 8)) == '2025-W37'
+    # The first days of a year can still belong to the last week of the previous one
+    assert week_key(datetime.date(2021, 1, 3)) == '2020-W53'
+    assert week_key(datetime.date(2024, 12, 30)) == '2025-W01'
+    assert week_key(datetime.date(2025, 1, 6)) == '2025-W02'
+    assert week_key(datetime.date(2025, 12, 28)) == '2025-W52'
+
+
+def test_period_expression_matches_isocalendar(app):
+    day = datetime.date(2023, 12, 1)
+    for offset in range(0, 90):
+        current = day + datetime.timedelta(days=offset)
+        year, week, _ = current.isocalendar()
+        assert week_key(current) == f'{year}-W{week:02d}'
@@ -0,0 +1,91 @@
+from sqlalchemy import select
+
+from extensions import db
+from models import Grade
+
+GRADE = {'student_id': 1, 'subject': 'Art', 'score': 91, 'semester': '1st', 'academic_year': '2025-2026'}
+
+
+def test_requires_login_or_token(app, dataset):
+    anonymous = app.test_client()
+    assert anonymous.get('/api/v1/classes').status_code == 401
+    app.config['API_TOKEN'] = 'token'
+    assert anonymous.get('/api/v1/classes', headers={'Authorization': 'Bearer token'}).status_code == 200
+    assert anonymous.get('/api/v1/classes', headers={'Authorization': 'Bearer other'}).status_code == 401
+
+
+def test_fields_and_keyset_pages(client):
+    first = client.get('/api/v1/students?fields=first_name&limit=2').json
+    assert first['data'] == [{'id': 1, 'first_name': 'First0'}, {'id': 2, 'first_name': 'First1'}]
+    second = client.get(f'/api/v1/students?fields=first_name&limit=2&after={first["next"]}').json
+    assert [row['id'] for row in second['data']] == [3, 4]
+
+
+def test_ids_and_filters(client):
+    assert [row['id'] for row in client.get('/api/v1/grades?ids=1,2,999').json['data']] == [1, 2]
+    rows = client.get('/api/v1/attendance?student_id=2&fields=status').json['data']
+    assert len(rows) == 3 and all(row['status'] == 'present' for row in rows)
+
+
+def test_not_modified_until_a_write(client):
+    etag = client.get('/api/v1/students').headers['ETag']
+    assert client.get('/api/v1/students', headers={'If-None-Match': etag}).status_code == 304
+    client.post('/api/v1/students/batch', json={'update': [{'id': 1, 'first_name': 'Zed'}]})
+    assert client.get('/api/v1/students', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_batch_write(client):
+    response = client.post('/api/v1/grades/batch', json={
+        'create': [GRADE], 'update': [{'id': 1, 'score': '77.5'}], 'delete': [2],
+    })
+    assert response.status_code == 200
+    assert response.json['updated'] == [1] and response.json['deleted'] == [2]
+    assert db.session.get(Grade, 1).score == 77.5
+    assert db.session.get(Grade, 2) is None
+    assert db.session.scalar(select(Grade.score).filter_by(id=response.json['created'][0])) == 91
+
+
+def test_batch_is_all_or_nothing(client):
+    grades = client.get('/api/v1/grades?limit=1000').json['data']
+    response = client.post('/api/v1/grades/batch', json={'create': [GRADE, dict(GRADE, score='x')]})
+    assert response.status_code == 400
+    assert 'create[1]' in response.json['error']
+    assert len(client.get('/api/v1/grades?limit=1000').json['data']) == len(grades)
+
+
+def test_rejected_requests(client):
+    assert client.get('/api/v1/nope').status_code == 404
+    assert client.post('/api/v1/students/batch', json={'delete': [1]}).status_code == 400
+    assert client.post('/api/v1/students/batch', data='x').status_code == 415
+
+
+def test_non_ascii_token_is_refused(app, dataset):
+    app.config['API_TOKEN'] = 'token'
+    response = app.test_client().get('/api/v1/classes', headers={'Authorization': 'Bearer tökén'})
+    assert response.status_code == 401
+
+
+def test_batch_rows_follow_the_form_rules(client):
+    response = client.post('/api/v1/grades/batch', json={'create': [GRADE, dict(GRADE, semester='3rd')]})
+    assert response.status_code == 400
+    assert response.json['error'].startswith('create[1]: semester: Not a valid choice')
+
+    response = client.post('/api/v1/students/batch', json={'update': [{'id': 1, 'last_name': 'Ok'},
+                                                                      {'id': 2, 'gender': 'X'}]})
+    assert response.status_code == 400
+    assert response.json['error'].startswith('update[1]: gender')
+
+    response = client.post('/api/v1/attendance/batch', json={
+        'create': [{'student_id': 1, 'date': '2025-10-01', 'status': 'sick'}]})
+    assert response.status_code == 400
+    assert response.json['error'].startswith('create[0]: status')
+
+
+def test_batch_create_student(client):
+    student = {'student_id': 'N0001', 'first_name': 'New', 'last_name': 'Student', 'gender': 'Female',
+               'date_of_birth': '2010-05-04', 'email': 'new@example.com', 'class_id': 2}
+    response = client.post('/api/v1/students/batch', json={'create': [student]})
+    assert response.status_code == 200
+    response = client.post('/api/v1/students/batch', json={'create': [dict(student, student_id='N0002', email='x')]})
+    assert response.status_code == 400
+    assert response.json['error'].startswith('create[0]: email')
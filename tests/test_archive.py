@@ -0,0 +1,86 @@
+import datetime
+
+import click
+import pytest
+from sqlalchemy import select, func
+
+from analytics import archived_until
+from archive import archive_year, unpack_records
+from extensions import db
+from models import Attendance, AttendanceArchive, AttendanceDailySummary
+
+CLOSED_YEAR = [
+    (1, datetime.date(2024, 10, 2), 'late', 'bus'),
+    (1, datetime.date(2024, 10, 3), 'absent', None),
+    (2, datetime.date(2024, 10, 3), 'present', None),
+]
+
+
+@pytest.fixture
+def closed_year(dataset):
+    for student_id, day, status, notes in CLOSED_YEAR:
+        db.session.add(Attendance(student_id=student_id, date=day, status=status, notes=notes))
+    db.session.commit()
+
+
+def summary_total():
+    return db.session.scalar(select(func.sum(AttendanceDailySummary.total)))
+
+
+def test_archive_moves_the_year_out_of_attendance(closed_year):
+    live_before = db.session.scalar(select(func.count(Attendance.id)))
+    summaries_before = summary_total()
+
+    assert archive_year('2024-2025', chunk_size=1, echo=lambda message: None) == len(CLOSED_YEAR)
+
+    assert db.session.scalar(select(func.count(Attendance.id))) == live_before - len(CLOSED_YEAR)
+    assert archived_until() == datetime.date(2025, 7, 31)
+    # The reports keep counting the archived days
+    assert summary_total() == summaries_before
+
+
+def test_archive_rows_hold_counts_and_records(closed_year):
+    archive_year('2024-2025', echo=lambda message: None)
+    archive = db.session.scalar(select(AttendanceArchive).filter_by(student_id=1))
+    assert (archive.late, archive.absent, archive.present, archive.total) == (1, 1, 0, 2)
+    assert unpack_records(archive) == [
+        {'date': datetime.date(2024, 10, 2), 'status': 'late', 'notes': 'bus'},
+        {'date': datetime.date(2024, 10, 3), 'status': 'absent', 'notes': None},
+    ]
+
+
+def test_rerun_merges_into_the_archive(closed_year):
+    archive_year('2024-2025', echo=lambda message: None)
+    db.session.add(Attendance(student_id=1, date=datetime.date(2024, 11, 4), status='excused'))
+    db.session.commit()
+    archive_year('2024-2025', echo=lambda message: None)
+    archive = db.session.scalar(select(AttendanceArchive).filter_by(student_id=1))
+    assert (archive.excused, archive.total) == (1, 3)
+
+
+def test_archived_days_are_read_only(client, closed_year):
+    archive_year('2024-2025', echo=lambda message: None)
+    response = client.post('/add_attendance', data={'student_id': 1, 'date': '2024-11-05', 'status': 'present'})
+    assert response.status_code == 200
+    response = client.post('/add_attendance', data={'student_id': 1, 'date': '2025-11-05', 'status': 'present'})
+    assert response.status_code == 302
+
+
+def test_years_are_archived_oldest_first(closed_year):
+    db.session.add(Attendance(student_id=1, date=datetime.date(2023, 10, 2), status='present'))
+    db.session.commit()
+    with pytest.raises(click.ClickException, match='2023-2024 still has live attendance records'):
+        archive_year('2024-2025', echo=lambda message: None)
+    assert db.session.scalar(select(func.count(AttendanceArchive.id))) == 0
+
+    archive_year('2023-2024', echo=lambda message: None)
+    assert archive_year('2024-2025', echo=lambda message: None) == len(CLOSED_YEAR)
+    assert archived_until() == datetime.date(2025, 7, 31)
+
+
+def test_archive_command_refuses_a_gap(app, closed_year):
+    db.session.add(Attendance(student_id=1, date=datetime.date(2023, 10, 2), status='present'))
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['attendance-archive', '--year', '2024-2025'])
+    assert result.exit_code == 1
+    assert 'archive it before 2024-2025' in result.output
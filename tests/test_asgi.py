@@ -0,0 +1,115 @@
+import asyncio
+import contextvars
+import importlib
+import sys
+
+import pytest
+
+from config import DevelopmentConfig
+from extensions import db
+from instrumentation import get_registry
+from tests.conftest import TemplateLoader, TEMPLATES
+
+
+# asgi.py builds its app and async engines on import; point it at a file
+# database both the sync and the async engines can open
+@pytest.fixture(scope='module')
+def asgi(tmp_path_factory):
+    monkeypatch = pytest.MonkeyPatch()
+    path = tmp_path_factory.mktemp('asgi') / 'asgi.sqlite'
+    monkeypatch.setattr(DevelopmentConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{path}')
+    monkeypatch.setenv('FLASK_CONFIG', 'development')
+    yield importlib.import_module('asgi')
+    sys.modules.pop('asgi')
+    monkeypatch.undo()
+
+
+@pytest.fixture
+def app(asgi):
+    app = asgi.app
+    app.jinja_env.loader = TemplateLoader(TEMPLATES)
+    app.config.update(API_TOKEN='token', INSTRUMENTATION_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def get(asgi, path, query='', headers=None):
+    scope = {
+        'type': 'http', 'method': 'GET', 'http_version': '1.1', 'scheme': 'http', 'root_path': '',
+        'path': path, 'query_string': query.encode(), 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await asgi.application(scope, receive, send)
+        # Each call runs on a new event loop
+        for engine in asgi.engines.values():
+            await engine.dispose()
+
+    # Outside the test's app context, like a request reaching the server
+    contextvars.Context().run(asyncio.run, run())
+    start, body = messages[0], b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], {name.decode(): value.decode() for name, value in start['headers']}, body
+
+
+def session_cookie(app, user_id=1):
+    value = app.session_interface.get_signing_serializer(app).dumps({'_user_id': str(user_id), '_fresh': True})
+    return {'Cookie': f'{app.config["SESSION_COOKIE_NAME"]}={value}'}
+
+
+def test_api_reads_with_the_token(asgi, dataset):
+    status, headers, body = get(asgi, '/api/v1/students', 'fields=first_name&limit=2',
+                                {'Authorization': 'Bearer token'})
+    assert status == 200 and 'First0' in body.decode()
+    assert 'ETag' in headers or 'etag' in headers
+
+
+def test_api_errors_come_from_the_blueprint(asgi, dataset):
+    status, headers, body = get(asgi, '/api/v1/students')
+    assert (status, headers['content-type']) == (401, 'application/json')
+    status, _, body = get(asgi, '/api/v1/students', headers={'Authorization': 'Bearer tökén'})
+    assert status == 401
+    status, _, body = get(asgi, '/api/v1/nope', headers={'Authorization': 'Bearer token'})
+    assert status == 404 and b'Unknown resource' in body
+
+
+def test_export_takes_the_same_login_as_the_flask_view(asgi, app, dataset):
+    status, headers, _ = get(asgi, '/export/grades', headers={'Authorization': 'Bearer token'})
+    assert status == 302 and '/login' in headers['location']
+    status, headers, body = get(asgi, '/export/grades', headers=session_cookie(app))
+    assert status == 200 and headers['content-disposition'] == 'attachment; filename=grades.csv'
+    assert len(body.decode().splitlines()) == 1 + 90
+
+
+def test_bad_export_filters_are_a_400(asgi, app, dataset):
+    status, _, _ = get(asgi, '/export/grades', 'date_from=bad', session_cookie(app))
+    assert status == 400
+    status, _, _ = get(asgi, '/export/grades', 'format=xml', session_cookie(app))
+    assert status == 400
+
+
+def test_autocomplete_and_changes(asgi, app, dataset):
+    assert get(asgi, '/api/students/autocomplete', 'q=Last1')[0] == 302
+    status, _, body = get(asgi, '/api/students/autocomplete', 'q=Last1&limit=3', session_cookie(app))
+    assert status == 200 and b'S0001' in body
+    status, _, body = get(asgi, '/api/v1/changes', 'limit=5', session_cookie(app))
+    assert status == 200 and b'"next"' in body
+
+
+def test_requests_go_through_the_app_hooks(asgi, app, dataset):
+    app.config['INSTRUMENTATION_ENABLED'] = True
+    app.config['INSTRUMENTATION_SAMPLE_RATE'] = 1.0
+    get(asgi, '/api/v1/classes', headers={'Authorization': 'Bearer token'})
+    metrics = get_registry().render(1.0)
+    # The statements on the async engine are counted too: the versions and the page
+    assert 'app_request_sql_queries_total{endpoint="api.list_resource"} 2' in metrics
@@ -0,0 +1,18 @@
+def test_labels_in_match_order(client):
+    matches = client.get('/api/students/autocomplete?q=Last1&limit=3').get_json()
+    assert [match['student_id'] for match in matches] == ['S0001', 'S0010', 'S0011']
+    assert matches[0] == {'id': 2, 'student_id': 'S0001', 'label': 'First1 Last1 (S0001)'}
+
+
+def test_empty_term_or_limit(client):
+    assert client.get('/api/students/autocomplete?q=').get_json() == []
+    assert client.get('/api/students/autocomplete?q=Last1&limit=0').get_json() == []
+
+
+def test_deleted_students_are_left_out(client):
+    client.get('/delete_student/2')
+    assert 'S0001' not in [match['student_id'] for match in client.get('/api/students/autocomplete?q=Last1').get_json()]
+
+
+def test_requires_login(app, dataset):
+    assert app.test_client().get('/api/students/autocomplete?q=Last1').status_code == 302
@@ -0,0 +1,48 @@
+from extensions import db
+from models import Class, Student
+
+
+def latest(client):
+    return client.get('/api/v1/changes?since=0').json['next']
+
+
+def test_orm_writes_are_logged_in_order(client):
+    since = latest(client)
+    new_class = Class(name='New')
+    db.session.add(new_class)
+    db.session.commit()
+    db.session.get(Student, 1).first_name = 'Renamed'
+    db.session.commit()
+
+    feed = client.get(f'/api/v1/changes?since={since}').json
+    assert [(change['table'], change['id'], change['op']) for change in feed['changes']] == [
+        ('class', new_class.id, 'insert'), ('student', 1, 'update'),
+    ]
+    assert feed['next'] == feed['changes'][-1]['seq']
+    assert client.get(f'/api/v1/changes?since={feed["next"]}').json == {'changes': [], 'next': feed['next']}
+
+
+def test_tables_filter(client):
+    since = latest(client)
+    client.post('/api/v1/grades/batch', json={'update': [{'id': 1, 'score': 99}]})
+    client.post('/api/v1/students/batch', json={'update': [{'id': 1, 'first_name': 'Zed'}]})
+    changes = client.get(f'/api/v1/changes?since={since}&tables=grade').json['changes']
+    assert [(change['table'], change['id']) for change in changes] == [('grade', 1)]
+    assert client.get('/api/v1/changes?tables=nope').status_code == 400
+
+
+def test_bulk_paths_are_logged(client):
+    since = latest(client)
+    client.get('/delete_student/1')
+    ops = {(change['table'], change['op']) for change in client.get(f'/api/v1/changes?since={since}').json['changes']}
+    assert ops == {('student', 'delete'), ('grade', 'delete'), ('attendance', 'delete')}
+
+
+def test_pruned_feed_asks_for_a_resync(app, client):
+    newest = latest(client)
+    result = app.test_cli_runner().invoke(args=['changes-prune', '--keep-days', '0'])
+    assert result.exit_code == 0, result.output
+    response = client.get('/api/v1/changes?since=0')
+    assert response.status_code == 410
+    assert response.json['latest'] == newest
+    assert client.get(f'/api/v1/changes?since={newest}').status_code == 200
@@ -0,0 +1,56 @@
+import pytest
+from flask import session
+from sqlalchemy import select, text, update
+
+from app import create_app
+from config import TestingConfig
+from db_routing import PRIMARY_UNTIL_KEY, is_write
+from extensions import db
+from models import Class
+
+
+def test_is_write():
+    assert not is_write(None)
+    assert not is_write(select(Class))
+    assert not is_write(select(Class).union(select(Class)))
+    assert is_write(select(Class).with_for_update())
+    assert is_write(update(Class).values(name='X'))
+    assert is_write(text('UPDATE class SET name = :name'))
+    assert is_write(text('SELECT 1'))
+
+
+@pytest.fixture
+def replica_app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {'replica_0': 'sqlite://'})
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    # init_app registers a metadata per bind on the shared extension
+    db.metadatas.pop('replica_0', None)
+
+
+def write_in_request(app):
+    with app.test_request_context():
+        db.session.add(Class(name='C9'))
+        db.session.commit()
+        return PRIMARY_UNTIL_KEY in session
+
+
+def test_write_pins_reads_to_primary(replica_app):
+    assert write_in_request(replica_app)
+
+
+def test_no_cookie_without_replicas(app):
+    assert not write_in_request(app)
+
+
+def test_text_writes_go_to_primary(replica_app):
+    with replica_app.test_request_context():
+        db.session.info['replica'] = 'replica_0'
+        assert db.session.get_bind(clause=select(Class)) is db.engines['replica_0']
+        assert db.session.get_bind(clause=text('DELETE FROM class')) is db.engines[None]
+        # The rest of the request stays on the primary
+        assert db.session.get_bind(clause=select(Class)) is db.engines[None]
@@ -0,0 +1,56 @@
+import io
+
+from sqlalchemy import select
+
+from extensions import db
+from importer import run_import
+from models import Student, Grade, StudentGradeSummary, ChangeLog
+from search_index import search_students
+
+STUDENTS_CSV = '''student_id,first_name,last_name,gender,date_of_birth,address,phone,email,class
+N1,Ann,Lee,Female,2010-01-02,,,ann@example.com,C0
+N2,Bo,Kim,Male,2010-01-01,,,bo@example.com,Nope
+S0001,Cy,Park,Male,2010-01-01,,,cy@example.com,C1
+N3,Di,Cho,Female,bad,,,di@example.com,C2
+N4,Ed,Han,Male,2010-01-01,,,ed@example.com,C2
+'''
+
+GRADES_CSV = '''student_id,subject,score,grade,semester,academic_year
+N1,Math,90,A,1st,2025-2026
+ZZ,Math,50,,1st,2025-2026
+N1,Art,x,,1st,2025-2026
+'''
+
+
+def import_csv(kind, text, batch_size=None):
+    return run_import(kind, io.BytesIO(text.encode()), f'{kind}.csv', batch_size=batch_size)
+
+
+def test_students_import_reports_bad_lines(dataset):
+    result = import_csv('students', STUDENTS_CSV, batch_size=1)
+    assert result.inserted == 2
+    assert [line for line, _ in result.errors] == [3, 4, 5]
+    assert 'Unknown class' in result.errors[0][1]
+    assert 'already exists' in result.errors[1][1]
+    assert db.session.scalars(select(Student.student_id).where(Student.student_id.like('N%'))).all() == ['N1', 'N4']
+
+
+def test_imported_students_are_searchable_and_logged(dataset):
+    since = db.session.scalar(select(db.func.max(ChangeLog.seq)))
+    import_csv('students', STUDENTS_CSV)
+    ann = db.session.scalar(select(Student).filter_by(student_id='N1'))
+    assert ann.id in search_students('Ann').ids
+    logged = db.session.scalars(select(ChangeLog.record_id).where(ChangeLog.seq > since, ChangeLog.table_name == 'student'))
+    assert ann.id in logged.all()
+
+
+def test_grades_import_refreshes_summaries(dataset):
+    import_csv('students', STUDENTS_CSV)
+    result = import_csv('grades', GRADES_CSV)
+    assert result.inserted == 1
+    assert [line for line, _ in result.errors] == [3, 4]
+
+    ann = db.session.scalar(select(Student).filter_by(student_id='N1'))
+    assert db.session.scalar(select(Grade.score).filter_by(student_id=ann.id)) == 90
+    summary = db.session.scalar(select(StudentGradeSummary).filter_by(student_id=ann.id))
+    assert (summary.academic_year, summary.semester, summary.average) == ('2025-2026', '1st', 90)
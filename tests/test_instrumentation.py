@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.fixture
+def metrics_app(app):
+    app.config.update(INSTRUMENTATION_ENABLED=True, METRICS_TOKEN='s3cret')
+    return app
+
+
+def test_metrics_token(metrics_app, dataset):
+    client = metrics_app.test_client()
+    client.get('/')
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get('/metrics').status_code == 403
+
+
+def test_non_ascii_token_is_refused(metrics_app):
+    response = metrics_app.test_client().get('/metrics', headers={'Authorization': 'Bearer sécret'})
+    assert response.status_code == 403
+
+
+def test_metrics_disabled(app, client):
+    assert client.get('/metrics').status_code == 404
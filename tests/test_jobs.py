@@ -0,0 +1,62 @@
+import datetime
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import jobs
+from extensions import db
+from jobs import claim_next_job, create_job, run_job
+from models import Job
+
+
+@pytest.fixture
+def job(dataset, app, tmp_path):
+    app.config.update(REPORTS_DIR=str(tmp_path), JOB_CHUNK_SIZE=7)
+    return create_job('report_cards', {'academic_year': '2025-2026'})
+
+
+def test_claim_marks_the_job_running(job):
+    assert claim_next_job() == job.id
+    db.session.refresh(job)
+    assert job.status == 'running'
+    assert job.started_at is not None and job.heartbeat_at == job.started_at
+    assert claim_next_job() is None
+
+
+def test_stale_running_job_is_reclaimed(app, job):
+    claim_next_job()
+    job.progress, job.total = 14, 30
+    db.session.commit()
+
+    job.heartbeat_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=app.config['JOB_TIMEOUT'] - 60)
+    db.session.commit()
+    assert claim_next_job() is None
+
+    job.heartbeat_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=app.config['JOB_TIMEOUT'] + 60)
+    db.session.commit()
+    assert claim_next_job() == job.id
+    db.session.refresh(job)
+    assert (job.status, job.progress, job.total) == ('running', 0, 0)
+
+
+def test_running_job_without_heartbeat_falls_back_to_started_at(app, job):
+    claim_next_job()
+    job.heartbeat_at = None
+    job.started_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=app.config['JOB_TIMEOUT'] + 60)
+    db.session.commit()
+    assert claim_next_job() == job.id
+
+
+def test_run_job_writes_report_cards(app, job, monkeypatch):
+    monkeypatch.setattr(jobs, 'worker_app', app)
+    job_id = claim_next_job()
+    started = db.session.get(Job, job_id).heartbeat_at
+    with ThreadPoolExecutor(2) as pool:
+        run_job(job_id, pool)
+
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.progress, job.total) == ('done', 30, 30)
+    assert job.heartbeat_at >= started
+    with zipfile.ZipFile(job.result_path) as archive:
+        assert len(archive.namelist()) == 30
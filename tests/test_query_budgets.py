@@ -0,0 +1,38 @@
+import pytest
+from flask import g
+
+import loading
+from loading import LOADING_PROFILES, QueryBudgetExceeded
+
+# One URL per endpoint with a loading profile; the testing config makes a
+# request over its budget raise QueryBudgetExceeded
+URLS = {
+    'students.students': '/students',
+    'students.student_detail': '/student/1',
+    'classes.classes': '/classes',
+    'classes.class_detail': '/class/1',
+    'classes.class_leaderboard': '/class/1/leaderboard',
+    'grades.grades': '/grades',
+    'attendance.attendance': '/attendance',
+    'students.search': '/search?q=First1',
+}
+
+
+def test_every_profile_is_covered():
+    assert set(URLS) == set(LOADING_PROFILES)
+
+
+@pytest.mark.parametrize('endpoint', sorted(URLS))
+def test_within_budget(app, client, endpoint):
+    assert app.config['QUERY_BUDGET_STRICT']
+    with client:
+        response = client.get(URLS[endpoint])
+        assert response.status_code == 200
+        assert 0 < g.query_count <= LOADING_PROFILES[endpoint][1]
+
+
+def test_over_budget_fails(client, monkeypatch):
+    options, _ = LOADING_PROFILES['grades.grades']
+    monkeypatch.setitem(loading.LOADING_PROFILES, 'grades.grades', (options, 0))
+    with pytest.raises(QueryBudgetExceeded, match='grades.grades ran'):
+        client.get('/grades')
@@ -0,0 +1,77 @@
+import datetime
+
+from sqlalchemy import select, func
+
+from bulk import bulk_insert
+from extensions import db
+from models import Attendance, AttendanceDailySummary, ChangeLog
+from tests.conftest import DAYS
+
+NEW_DAY = datetime.date(2025, 10, 1)
+# Class C0 holds every third student
+CLASS_STUDENTS = list(range(1, 31, 3))
+
+
+def test_empty_rows(app):
+    assert bulk_insert(Attendance, []) == []
+
+
+def test_returns_inserted_ids(dataset):
+    ids = bulk_insert(Attendance, [
+        {'student_id': 1, 'date': NEW_DAY, 'status': 'late'},
+        {'student_id': 2, 'date': NEW_DAY, 'status': 'absent'},
+    ], returning=True)
+    db.session.commit()
+    assert sorted(ids) == db.session.scalars(
+        select(Attendance.id).where(Attendance.date == NEW_DAY).order_by(Attendance.id)).all()
+
+
+def test_conflicting_rows_are_skipped(dataset):
+    ids = bulk_insert(Attendance, [
+        {'student_id': 1, 'date': DAYS[0], 'status': 'absent'},
+        {'student_id': 1, 'date': NEW_DAY, 'status': 'late'},
+    ], conflict_columns=['student_id', 'date'], returning=True)
+    db.session.commit()
+    assert len(ids) == 1
+    assert db.session.get(Attendance, ids[0]).date == NEW_DAY
+    assert db.session.scalar(select(Attendance.status).filter_by(student_id=1, date=DAYS[0])) == 'present'
+
+
+def take_roll(client, day, status, overwrite=False):
+    data = {'date': day.isoformat()}
+    for i, student_id in enumerate(CLASS_STUDENTS):
+        data[f'entries-{i}-student_id'] = student_id
+        data[f'entries-{i}-status'] = status
+    if overwrite:
+        data['overwrite'] = 'y'
+    response = client.post('/class/1/roll_call', data=data)
+    assert response.status_code == 302
+    with client.session_transaction() as session:
+        return session.pop('_flashes')[-1]
+
+
+def statuses(day):
+    return set(db.session.scalars(select(Attendance.status).where(Attendance.date == day)))
+
+
+def test_roll_call_records_the_class(client):
+    since = db.session.scalar(select(func.max(ChangeLog.seq)))
+    assert take_roll(client, NEW_DAY, 'late') == ('success', 'Attendance has been recorded for 10 students')
+    assert statuses(NEW_DAY) == {'late'}
+    summary = db.session.scalar(select(AttendanceDailySummary).filter_by(class_id=1, date=NEW_DAY))
+    assert (summary.late, summary.total) == (10, 10)
+    logged = db.session.scalar(select(func.count()).where(ChangeLog.seq > since, ChangeLog.op == 'insert'))
+    assert logged == 10
+
+
+def test_existing_records_are_kept_unless_overwritten(client):
+    take_roll(client, NEW_DAY, 'present')
+    assert take_roll(client, NEW_DAY, 'absent') == (
+        'success', 'Attendance has been recorded for 0 students, 10 already had a record')
+    assert statuses(NEW_DAY) == {'present'}
+
+    assert take_roll(client, NEW_DAY, 'absent', overwrite=True) == (
+        'success', 'Attendance has been recorded for 10 students')
+    assert statuses(NEW_DAY) == {'absent'}
+    summary = db.session.scalar(select(AttendanceDailySummary).filter_by(class_id=1, date=NEW_DAY))
+    assert (summary.absent, summary.present, summary.total) == (10, 0, 10)
@@ -0,0 +1,69 @@
+from sqlalchemy import select, func
+
+from extensions import db
+from models import Class, Student, Grade, Attendance, StudentGradeSummary
+from search_index import search_students
+
+
+def count(model, include_deleted=False):
+    return db.session.scalar(select(func.count(model.id)).execution_options(include_deleted=include_deleted))
+
+
+def test_student_with_history_is_soft_deleted(client):
+    grades, attendance = count(Grade), count(Attendance)
+    assert client.get('/delete_student/1').status_code == 302
+
+    assert db.session.get(Student, 1) is None
+    assert client.get('/student/1').status_code == 404
+    assert count(Grade) == grades - 3 and count(Attendance) == attendance - 3
+    assert count(Grade, include_deleted=True) == grades
+    assert 1 not in search_students('First0').ids
+    assert db.session.scalar(select(StudentGradeSummary).filter_by(student_id=1)) is None
+
+
+def test_restore_brings_the_records_back(client):
+    grades = count(Grade)
+    client.get('/delete_student/1')
+    response = client.get('/restore_student/1')
+    assert response.headers['Location'] == '/student/1'
+    assert db.session.get(Student, 1) is not None
+    assert count(Grade) == grades
+    assert 1 in search_students('First0').ids
+    assert db.session.scalar(select(StudentGradeSummary).filter_by(student_id=1)) is not None
+
+
+def test_student_without_history_is_deleted(client):
+    student = Student(student_id='NEW', first_name='New', last_name='Student', class_id=1)
+    db.session.add(student)
+    db.session.commit()
+    client.get(f'/delete_student/{student.id}')
+    assert count(Student, include_deleted=True) == count(Student)
+
+
+def test_class_delete_takes_its_students(client):
+    students = count(Student)
+    # Deleted on its own first: stays deleted when the class is restored
+    client.get('/delete_student/1')
+    client.get('/delete_class/1')
+    assert db.session.get(Class, 1) is None
+    assert count(Student) == students - 10
+
+    client.get('/restore_class/1')
+    assert count(Student) == students - 1
+    assert db.session.get(Student, 1) is None
+
+
+def test_purge_removes_deleted_records(app, client):
+    grades, students = count(Grade, include_deleted=True), count(Student, include_deleted=True)
+    client.get('/delete_student/1')
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['deleted-purge'])
+    assert 'student: 1' in result.output and 'grade: 3' in result.output
+    assert count(Student, include_deleted=True) == students
+
+    result = runner.invoke(args=['deleted-purge', '--yes'])
+    assert result.output.endswith('Purged 7 deleted records\n')
+    assert count(Student, include_deleted=True) == students - 1
+    assert count(Grade, include_deleted=True) == grades - 3
+    assert runner.invoke(args=['deleted-purge']).output == 'No deleted records\n'
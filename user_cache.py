@@ -0,0 +1,76 @@
+from flask import current_app, has_app_context
+from sqlalchemy.orm import make_transient_to_detached, object_session
+from extensions import db, listen_once, login_manager
+from models import User
+from cache import LRUCache
+
+# Flask-Login user loading without a SELECT per request.
+# Each worker keeps the column values of recently seen users in an LRU. A hit
+# becomes a detached User merged into the session with load=False, so no SQL runs.
+# Edits and deletes evict the entry once they commit. Other workers see the change
+# when their entry expires (USER_CACHE_TTL), so keep the TTL short.
+
+
+def get_user_cache():
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        cache = current_app.extensions['user_cache'] = LRUCache(
+            current_app.config.get('USER_CACHE_SIZE', 1024),
+            current_app.config.get('USER_CACHE_TTL', 30)
+        )
+    return cache
+
+
+def user_columns(user):
+    return {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+
+
+def load_cached_user(user_id):
+    if not current_app.config.get('USER_CACHE_TTL'):
+        return db.session.get(User, user_id)
+
+    cache = get_user_cache()
+    columns = cache.get(user_id)
+    if columns is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            cache.set(user_id, user_columns(user))
+        return user
+
+    user = User(**columns)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def load_user(user_id):
+    return load_cached_user(int(user_id))
+
+
+# For writes that bypass the session (Core UPDATEs), once they have committed
+def evict_user(user_id):
+    get_user_cache().delete(user_id)
+
+
+# Invalidation, applied when the transaction commits
+def mark_user_stale(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('stale_users', set()).add(target.id)
+
+
+def drop_stale_users(session):
+    user_ids = session.info.pop('stale_users', None)
+    if user_ids and has_app_context():
+        get_user_cache().delete(*user_ids)
+
+
+def forget_stale_users(session):
+    session.info.pop('stale_users', None)
+
+
+def init_app(app):
+    listen_once(User, 'after_update', mark_user_stale)
+    listen_once(User, 'after_delete', mark_user_stale)
+    listen_once(db.session, 'after_commit', drop_stale_users)
+    listen_once(db.session, 'after_rollback', forget_stale_users)
+    login_manager.user_loader(load_user)
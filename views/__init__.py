@@ -0,0 +1,87 @@
+from flask import Blueprint
+from werkzeug.exceptions import HTTPException
+from lazy import LazyView
+
+# One blueprint per subsystem, each view living in views/<blueprint>.py.
+# The URL rules are registered with the app (Flask allows no later registration),
+# but a subsystem's module is only imported by the first request that reaches it.
+# Endpoints are '<blueprint>.<view>', e.g. url_for('students.student_detail', ...).
+BLUEPRINTS = {
+    'auth': [
+        ('/', 'home', None),
+        ('/login', 'login', ['GET', 'POST']),
+        ('/logout', 'logout', None),
+        ('/register', 'register', ['GET', 'POST']),
+        ('/index', 'index', None),
+    ],
+    'students': [
+        ('/students', 'students', None),
+        ('/student/<int:student_id>', 'student_detail', None),
+        ('/add_student', 'add_student', ['GET', 'POST']),
+        ('/edit_student/<int:student_id>', 'edit_student', ['GET', 'POST']),
+        ('/delete_student/<int:student_id>', 'delete_student', None),
+        ('/restore_student/<int:student_id>', 'restore_student', None),
+        ('/search', 'search', ['GET', 'POST']),
+        ('/api/students/autocomplete', 'student_autocomplete', None),
+    ],
+    'classes': [
+        ('/classes', 'classes', None),
+        ('/class/<int:class_id>', 'class_detail', None),
+        ('/class/<int:class_id>/leaderboard', 'class_leaderboard', None),
+        ('/add_class', 'add_class', ['GET', 'POST']),
+        ('/edit_class/<int:class_id>', 'edit_class', ['GET', 'POST']),
+        ('/delete_class/<int:class_id>', 'delete_class', None),
+        ('/restore_class/<int:class_id>', 'restore_class', None),
+    ],
+    'grades': [
+        ('/grades', 'grades', None),
+        ('/add_grade', 'add_grade', ['GET', 'POST']),
+        ('/edit_grade/<int:grade_id>', 'edit_grade', ['GET', 'POST']),
+        ('/delete_grade/<int:grade_id>', 'delete_grade', None),
+    ],
+    'attendance': [
+        ('/attendance', 'attendance', None),
+        ('/add_attendance', 'add_attendance', ['GET', 'POST']),
+        ('/edit_attendance/<int:attendance_id>', 'edit_attendance', ['GET', 'POST']),
+        ('/delete_attendance/<int:attendance_id>', 'delete_attendance', None),
+        ('/class/<int:class_id>/roll_call', 'roll_call', ['GET', 'POST']),
+        ('/reports/attendance', 'attendance_report', None),
+    ],
+    'admin': [
+        ('/import', 'import_data', ['GET', 'POST']),
+        ('/export/<kind>', 'export', None),
+        ('/jobs', 'jobs', ['GET', 'POST']),
+        ('/jobs/<int:job_id>', 'job_detail', None),
+        ('/jobs/<int:job_id>/progress', 'job_progress_status', None),
+        ('/jobs/<int:job_id>/download', 'job_download', None),
+        ('/users', 'users', None),
+        ('/add_user', 'add_user', ['GET', 'POST']),
+        ('/delete_user/<int:user_id>', 'delete_user', None),
+    ],
+    'api': [
+        ('/api/v1/changes', 'changes', None),
+        ('/api/v1/<resource>', 'list_resource', None),
+        ('/api/v1/<resource>/<int:item_id>', 'get_resource_item', None),
+        ('/api/v1/<resource>/batch', 'batch_write', ['POST']),
+    ],
+}
+
+# Blueprint-wide hooks, also imported on first use: a view-module function run
+# before each request of the blueprint, and one rendering its HTTP errors
+HOOKS = {
+    'api': {'before_request': 'authenticate', 'error_handler': 'api_error'},
+}
+
+
+def register_blueprints(app):
+    for name, rules in BLUEPRINTS.items():
+        blueprint = Blueprint(name, __name__)
+        for rule, endpoint, methods in rules:
+            blueprint.add_url_rule(rule, endpoint, LazyView(f'views.{name}.{endpoint}'), methods=methods)
+        hooks = HOOKS.get(name, {})
+        if 'before_request' in hooks:
+            blueprint.before_request(LazyView(f'views.{name}.{hooks["before_request"]}'))
+        if 'error_handler' in hooks:
+            blueprint.register_error_handler(HTTPException, LazyView(f'views.{name}.{hooks["error_handler"]}'))
+        app.register_blueprint(blueprint)
+
@@ -0,0 +1,163 @@
+from flask import render_template, request, redirect, url_for, flash, abort, jsonify, Response, stream_with_context, send_file
+from flask_login import login_required, current_user
+from extensions import db
+from models import User, Class, Job
+from forms import RegistrationForm, ImportForm, ReportCardJobForm
+from db_routing import use_replica
+from importer import run_import
+from jobs import create_job, job_progress
+from passwords import hash_password
+from exporter import EXPORT_FORMATS, EXPORT_QUERIES, ExportFilterError, parse_export_filters, generate_export
+import os
+
+# Import route (bulk students or grades from CSV/Excel)
+@login_required
+def import_data():
+    # Check if user is admin
+    if not current_user.is_admin:
+        flash('You do not have admin privileges', 'danger')
+        return redirect(url_for('auth.index'))
+    
+    form = ImportForm()
+    result = None
+    
+    if form.validate_on_submit():
+        upload = form.file.data
+        try:
+            result = run_import(form.kind.data, upload.stream, upload.filename)
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('.import_data'))
+        
+        flash(f'{result.inserted} rows imported, {result.failed} rows rejected',
+              'success' if not result.failed else 'warning')
+    
+    return render_template('import.html', title='Import', form=form, result=result)
+
+# Export route (grades or attendance streamed as CSV/NDJSON)
+@login_required
+@use_replica
+def export(kind):
+    if kind not in EXPORT_QUERIES:
+        abort(404)
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        abort(400, f'Unknown export format: {fmt}')
+    
+    try:
+        filters = parse_export_filters(request.args)
+    except ExportFilterError as e:
+        abort(400, str(e))
+    
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    filename = f'{kind}.{fmt}' + ('.gz' if compress else '')
+    
+    return Response(
+        stream_with_context(generate_export(kind, filters, fmt, compress)),
+        mimetype='application/gzip' if compress else EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+# Jobs route (queue report cards, list recent jobs)
+@login_required
+def jobs():
+    form = ReportCardJobForm()
+    form.class_id.choices = [(0, 'All classes')] + [(c.id, c.name) for c in Class.query.order_by(Class.name)]
+    
+    if form.validate_on_submit():
+        job = create_job('report_cards', {
+            'class_id': form.class_id.data or None,
+            'academic_year': form.academic_year.data,
+            'semester': form.semester.data or None
+        }, current_user.id)
+        flash('Report cards have been queued', 'success')
+        return redirect(url_for('.job_detail', job_id=job.id))
+    
+    query = Job.query if current_user.is_admin else Job.query.filter_by(created_by=current_user.id)
+    jobs = query.order_by(Job.id.desc()).limit(20).all()
+    
+    return render_template('jobs.html', title='Jobs', form=form, jobs=jobs)
+
+# Jobs are visible to the user who queued them and to admins
+def get_job_or_404(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.created_by != current_user.id and not current_user.is_admin:
+        abort(404)
+    return job
+
+# Job detail route
+@login_required
+def job_detail(job_id):
+    job = get_job_or_404(job_id)
+    return render_template('job_detail.html', title=f'Job {job.id}', job=job, progress=job_progress(job))
+
+# Job progress route (JSON, polled by the job page)
+@login_required
+def job_progress_status(job_id):
+    return jsonify(job_progress(get_job_or_404(job_id)))
+
+# Job download route
+@login_required
+def job_download(job_id):
+    job = get_job_or_404(job_id)
+    if job.status != 'done' or not job.result_path:
+        abort(404)
+    return send_file(job.result_path, as_attachment=True, download_name=os.path.basename(job.result_path))
+
+# Users route
+@login_required
+def users():
+    # Check if user is admin
+    if not current_user.is_admin:
+        flash('You do not have admin privileges', 'danger')
+        return redirect(url_for('auth.index'))
+    
+    # Get all users
+    users = User.query.all()
+    
+    return render_template('users.html', title='Users', users=users)
+
+# Add user route
+@login_required
+def add_user():
+    # Check if user is admin
+    if not current_user.is_admin:
+        flash('You do not have admin privileges', 'danger')
+        return redirect(url_for('auth.index'))
+    
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            password=hash_password(form.password.data),
+            first_name=form.first_name.data,
+            last_name=form.last_name.data
+        )
+        db.session.add(user)
+        db.session.commit()
+        flash('User has been created', 'success')
+        return redirect(url_for('.users'))
+    
+    return render_template('register.html', title='Add User', form=form)
+
+# Delete user route
+@login_required
+def delete_user(user_id):
+    # Check if user is admin
+    if not current_user.is_admin:
+        flash('You do not have admin privileges', 'danger')
+        return redirect(url_for('auth.index'))
+    
+    user = User.query.get_or_404(user_id)
+    
+    # Check if user is the current user
+    if user.id == current_user.id:
+        flash('Cannot delete your own account', 'danger')
+        return redirect(url_for('.users'))
+    
+    db.session.delete(user)
+    db.session.commit()
+    flash('User has been deleted', 'success')
+    return redirect(url_for('.users'))
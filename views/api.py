@@ -0,0 +1,120 @@
+import hmac
+from flask import abort, current_app, request
+from flask_login import current_user
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from forms import RowValidator
+from db_routing import use_replica
+from changelog import latest_seq, pruned_past, wait_for_changes
+from api import (get_resource, not_modified, list_statement, list_payload, selected_columns, plain, encode,
+                 changes_args, changes_payload, pruned_response, read_body, coerce_row, check_form, check_references)
+
+# Authentication: a logged in user, or `Authorization: Bearer <API_TOKEN>`
+def authenticate():
+    token = current_app.config.get('API_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return None
+    if not current_user.is_authenticated:
+        abort(401, 'Log in or send the API token')
+
+
+# Errors as JSON instead of HTML pages
+def api_error(e):
+    return encode({'error': e.description}, e.code, 'application/json')
+
+
+# List reads: ?fields=, ?after=/?before= pages or ?ids=
+@use_replica
+def list_resource(resource):
+    config = get_resource(resource)
+    cached, finish = not_modified([f'table:{config["model"].__table__.name}'])
+    if cached is not None:
+        return cached
+
+    statement, seek = list_statement(config)
+    return finish(encode(list_payload(config, db.session.execute(statement).all(), seek)))
+
+
+# One record
+@use_replica
+def get_resource_item(resource, item_id):
+    config = get_resource(resource)
+    model = config['model']
+    key = f'{config["key"]}:{item_id}' if 'key' in config else f'table:{model.__table__.name}'
+    cached, finish = not_modified([key])
+    if cached is not None:
+        return cached
+
+    row = db.session.execute(select(*selected_columns(model)).where(model.id == item_id)).first()
+    if row is None:
+        abort(404, f'No {resource} record with id {item_id}')
+    return finish(encode({key: plain(value) for key, value in row._asdict().items()}))
+
+
+# Change feed (see api.changes_args)
+def changes():
+    since, tables, limit, wait = changes_args()
+    if pruned_past(since):
+        return pruned_response(latest_seq())
+    return encode(changes_payload(wait_for_changes(since, tables, limit, wait), since))
+
+
+# Writes: {"create": [{...}], "update": [{"id": 1, ...}], "delete": [2, 3]}
+def batch_write(resource):
+    config = get_resource(resource)
+    model = config['model']
+    body = read_body()
+    create, changes, delete = body.get('create') or [], body.get('update') or [], body.get('delete') or []
+    if not all(isinstance(part, list) for part in (create, changes, delete)):
+        abort(400, 'create, update and delete must be lists')
+    if len(create) + len(changes) + len(delete) > current_app.config.get('API_BATCH_MAX', 500):
+        abort(413, f'At most {current_app.config.get("API_BATCH_MAX", 500)} operations per batch')
+    if delete and not config['delete']:
+        abort(400, f'{resource} cannot be deleted through the API')
+
+    validate_row = RowValidator(config['form'])
+    try:
+        new_rows = []
+        for i, row in enumerate(create):
+            new_rows.append((f'create[{i}]', coerce_row(model, row, f'create[{i}]', partial=False)))
+            check_form(validate_row, *new_rows[-1], partial=False)
+        updates = {}
+        for i, row in enumerate(changes):
+            if not isinstance(row, dict) or not isinstance(row.get('id'), int):
+                raise ValueError(f'update[{i}]: an integer id is required')
+            updates[row['id']] = (f'update[{i}]', coerce_row(model, row, f'update[{i}]', partial=True))
+            check_form(validate_row, *updates[row['id']], partial=True)
+        if not all(isinstance(item_id, int) and not isinstance(item_id, bool) for item_id in delete):
+            raise ValueError('delete must list integer ids')
+        written = new_rows + list(updates.values())
+        check_references(model, written)
+        if 'check' in config:
+            config['check'](written)
+    except ValueError as e:
+        abort(400, str(e))
+
+    targets = set(updates) | set(delete)
+    existing = {obj.id: obj for obj in model.query.filter(model.id.in_(targets))} if targets else {}
+    missing = targets - set(existing)
+    if missing:
+        abort(404, f'No {resource} records with ids {", ".join(str(item_id) for item_id in sorted(missing))}')
+
+    objects = [model(**row) for _, row in new_rows]
+    db.session.add_all(objects)
+    for item_id, (_, row) in updates.items():
+        for name, value in row.items():
+            setattr(existing[item_id], name, value)
+    for item_id in delete:
+        db.session.delete(existing[item_id])
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        abort(409, 'The batch conflicts with existing records; nothing was saved')
+
+    return encode({
+        'created': [obj.id for obj in objects],
+        'updated': sorted(updates),
+        'deleted': sorted(set(delete)),
+    })
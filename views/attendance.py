@@ -0,0 +1,193 @@
+from flask import render_template, request, redirect, url_for, flash, abort, jsonify
+from flask_login import login_required
+from extensions import db
+from models import Class, Attendance, bump_versions
+from forms import AttendanceForm, RollCallForm
+from pagination import paginate_keyset
+from loading import apply_profile
+from db_routing import use_replica
+from bulk import bulk_insert
+from analytics import REPORT_GROUPS, attendance_report as build_attendance_report, refresh_class_days
+from stats import mark_stale, attendance_key
+from changelog import log_changes
+from exporter import ExportFilterError, parse_export_filters
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+
+# Attendance route
+@login_required
+@use_replica
+def attendance():
+    # Get one page of attendance records, newest first
+    page = paginate_keyset(apply_profile(Attendance.query), [Attendance.date, Attendance.id], descending=True)
+    
+    return render_template('attendance.html', title='Attendance', attendances=page.items, page=page)
+
+# Add attendance route
+@login_required
+def add_attendance():
+    form = AttendanceForm()
+    
+    if form.validate_on_submit():
+        attendance = Attendance(
+            student_id=form.student_id.data,
+            date=form.date.data,
+            status=form.status.data,
+            notes=form.notes.data
+        )
+        db.session.add(attendance)
+        
+        # The unique (student_id, date) index rejects duplicate records
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash('Attendance record already exists for this student on this date', 'danger')
+            return redirect(url_for('.add_attendance'))
+        flash('Attendance has been added', 'success')
+        return redirect(url_for('.attendance'))
+    
+    # Set default date to today
+    form.date.data = datetime.utcnow().date()
+    
+    return render_template('add_attendance.html', title='Add Attendance', form=form)
+
+# Edit attendance route
+@login_required
+def edit_attendance(attendance_id):
+    attendance = Attendance.query.get_or_404(attendance_id)
+    form = AttendanceForm(obj=attendance)
+    
+    if form.validate_on_submit():
+        attendance.student_id = form.student_id.data
+        attendance.date = form.date.data
+        attendance.status = form.status.data
+        attendance.notes = form.notes.data
+        
+        # The unique (student_id, date) index rejects clashes with another record
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash('Attendance record already exists for this student on this date', 'danger')
+            return redirect(url_for('.edit_attendance', attendance_id=attendance_id))
+        flash('Attendance has been updated', 'success')
+        return redirect(url_for('.attendance'))
+    
+    return render_template('add_attendance.html', title='Edit Attendance', form=form, student=attendance.student)
+
+# Delete attendance route
+@login_required
+def delete_attendance(attendance_id):
+    attendance = Attendance.query.get_or_404(attendance_id)
+    db.session.delete(attendance)
+    db.session.commit()
+    flash('Attendance has been deleted', 'success')
+    return redirect(url_for('.attendance'))
+
+# Roll call route (attendance for a whole class on one date)
+@login_required
+def roll_call(class_id):
+    class_ = Class.query.get_or_404(class_id)
+    students = {student.id: student for student in class_.students}
+    form = RollCallForm()
+    
+    if form.validate_on_submit():
+        date = form.date.data
+        marks = {
+            entry.student_id.data: entry
+            for entry in form.entries
+            if entry.student_id.data in students
+        }
+        
+        # Find the records that already exist for this date in one query
+        existing = dict(
+            db.session.query(Attendance.student_id, Attendance.id).filter(
+                Attendance.date == date,
+                Attendance.student_id.in_(list(marks))
+            ).all()
+        )
+        
+        rows = [
+            {
+                'student_id': student_id,
+                'date': date,
+                'status': entry.status.data,
+                'notes': entry.notes.data or None
+            }
+            for student_id, entry in marks.items()
+        ]
+        new_rows = [row for row in rows if row['student_id'] not in existing]
+        overwrite = form.overwrite.data
+        
+        # Write the whole class in one transaction: one executemany insert for new
+        # records and, when overwriting, one executemany update by primary key.
+        # Bulk statements bypass the session events, so summaries are refreshed here.
+        # A record another user adds after the lookup above is skipped by ON CONFLICT
+        # DO NOTHING (SQLite, PostgreSQL) and missing from `inserted`; other dialects
+        # raise IntegrityError instead.
+        updated = [row for row in rows if row['student_id'] in existing] if overwrite else []
+        try:
+            inserted = bulk_insert(Attendance, new_rows, conflict_columns=['student_id', 'date'], returning=True)
+            log_changes(db.session.connection(), 'attendance', 'insert', inserted)
+            if updated:
+                db.session.execute(update(Attendance), [
+                    {'id': existing[row['student_id']], 'status': row['status'], 'notes': row['notes']}
+                    for row in updated
+                ])
+                log_changes(db.session.connection(), 'attendance', 'update', sorted(existing.values()))
+            refresh_class_days(db.session.connection(), [(class_id, date)])
+            bump_versions(db.session.connection(), {'table:attendance'} | {f'student:{student_id}' for student_id in marks})
+            mark_stale(db.session, attendance_key(date))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash('Attendance was recorded by someone else at the same time, please try again', 'danger')
+            return redirect(url_for('.roll_call', class_id=class_id))
+        
+        recorded = len(inserted) + len(updated)
+        already = len(existing) - len(updated)
+        concurrent = len(new_rows) - len(inserted)
+        flash(f'Attendance has been recorded for {recorded} students'
+              + (f', {already} already had a record' if already else '')
+              + (f', {concurrent} were skipped (recorded by someone else in the meantime)' if concurrent else ''),
+              'warning' if concurrent else 'success')
+        return redirect(url_for('classes.class_detail', class_id=class_id))
+    
+    if not form.is_submitted():
+        # Default everyone to present for today
+        form.date.data = datetime.utcnow().date()
+        for student in class_.students:
+            form.entries.append_entry({'student_id': student.id, 'status': 'present'})
+    
+    return render_template('roll_call.html', title=f'Roll Call - {class_.name}',
+                         form=form, class_=class_, students=students)
+
+# Attendance report route (rollups per day/week/month, class or student)
+@login_required
+@use_replica
+def attendance_report():
+    group = request.args.get('group', 'week')
+    if group not in REPORT_GROUPS:
+        abort(400, f'Unknown report grouping: {group}')
+    
+    try:
+        filters = parse_export_filters(request.args)
+    except ExportFilterError as e:
+        abort(400, str(e))
+    
+    class_id = filters.get('class_id')
+    if group == 'student' and class_id is None:
+        abort(400, 'A class_id is required for per-student reports')
+    
+    rows = build_attendance_report(group, class_id, filters.get('date_from'), filters.get('date_to'))
+    
+    if request.args.get('format') == 'json':
+        return jsonify([
+            dict(row, key=row['key'].isoformat() if hasattr(row['key'], 'isoformat') else row['key'])
+            for row in rows
+        ])
+    
+    return render_template('attendance_report.html', title='Attendance Report', rows=rows, group=group,
+                         class_id=class_id, date_from=filters.get('date_from'), date_to=filters.get('date_to'))
@@ -0,0 +1,61 @@
+from flask import render_template, redirect, url_for, flash
+from flask_login import login_user, login_required, logout_user, current_user
+from extensions import db
+from models import User
+from forms import LoginForm, RegistrationForm
+from passwords import hash_password, check_user_password
+from stats import get_dashboard_stats
+
+# Home route
+def home():
+    return redirect(url_for('.login'))
+
+# Login route
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('.index'))
+    
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(username=form.username.data).first()
+        if check_user_password(user, form.password.data):
+            login_user(user, remember=form.remember.data)
+            return redirect(url_for('.index'))
+        else:
+            flash('Login Unsuccessful. Please check username and password', 'danger')
+    
+    return render_template('login.html', title='Login', form=form)
+
+# Logout route
+def logout():
+    logout_user()
+    return redirect(url_for('.login'))
+
+# Register route
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('.index'))
+    
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            password=hash_password(form.password.data),
+            first_name=form.first_name.data,
+            last_name=form.last_name.data
+        )
+        db.session.add(user)
+        db.session.commit()
+        flash('Your account has been created! You are now able to log in', 'success')
+        return redirect(url_for('.login'))
+    
+    return render_template('register.html', title='Register', form=form)
+
+# Index route
+@login_required
+def index():
+    # Get statistics (cached, invalidated on writes)
+    stats = get_dashboard_stats()
+    
+    return render_template('index.html', title='Home', **stats)
@@ -0,0 +1,125 @@
+from flask import render_template, request, redirect, url_for, flash
+from flask_login import login_required
+from extensions import db
+from models import Class, Student, StudentGradeSummary, ClassGradeSummary
+from forms import ClassForm
+from loading import apply_profile
+from fragment_cache import cached_page
+from soft_delete import class_has_students, archive_class, restore_class as restore_archived_class
+
+# Classes route
+@login_required
+@cached_page(lambda: ['table:class', 'table:student'])
+def classes():
+    # Get all classes
+    classes = apply_profile(Class.query).all()
+    
+    return render_template('classes.html', title='Classes', classes=classes)
+
+# Class detail route
+@login_required
+@cached_page(lambda class_id: [f'class:{class_id}'])
+def class_detail(class_id):
+    class_ = Class.query.get_or_404(class_id)
+    
+    # Get students in this class
+    students = Student.query.filter_by(class_id=class_id).all()
+    
+    return render_template('class_detail.html', title=class_.name, class_=class_, students=students)
+
+# Class leaderboard route
+@login_required
+def class_leaderboard(class_id):
+    class_ = Class.query.get_or_404(class_id)
+    
+    # Requested term, or the most recent term with grades
+    summary_query = ClassGradeSummary.query.filter_by(class_id=class_id)
+    academic_year = request.args.get('academic_year')
+    semester = request.args.get('semester')
+    if academic_year and semester:
+        summary = summary_query.filter_by(academic_year=academic_year, semester=semester).first()
+    else:
+        summary = summary_query.order_by(ClassGradeSummary.academic_year.desc(), ClassGradeSummary.semester.desc()).first()
+    
+    rankings = []
+    if summary:
+        rankings = apply_profile(StudentGradeSummary.query).filter_by(
+            class_id=class_id,
+            academic_year=summary.academic_year,
+            semester=summary.semester
+        ).order_by(StudentGradeSummary.class_rank, StudentGradeSummary.student_id).all()
+    
+    return render_template('class_leaderboard.html', title=f'{class_.name} Leaderboard',
+                         class_=class_, summary=summary, rankings=rankings)
+
+# Add class route
+@login_required
+def add_class():
+    form = ClassForm()
+    
+    if form.validate_on_submit():
+        # Check if class name already exists (deleted classes keep theirs)
+        existing_class = Class.query.execution_options(include_deleted=True).filter_by(name=form.name.data).first()
+        if existing_class:
+            flash('Class name already exists', 'danger')
+            return redirect(url_for('.add_class'))
+        
+        class_ = Class(
+            name=form.name.data,
+            description=form.description.data
+        )
+        db.session.add(class_)
+        db.session.commit()
+        flash('Class has been added', 'success')
+        return redirect(url_for('.classes'))
+    
+    return render_template('add_class.html', title='Add Class', form=form)
+
+# Edit class route
+@login_required
+def edit_class(class_id):
+    class_ = Class.query.get_or_404(class_id)
+    form = ClassForm(obj=class_)
+    
+    if form.validate_on_submit():
+        # Check if class name already exists (excluding current class)
+        existing_class = Class.query.execution_options(include_deleted=True).filter(
+            Class.name == form.name.data,
+            Class.id != class_id
+        ).first()
+        if existing_class:
+            flash('Class name already exists', 'danger')
+            return redirect(url_for('.edit_class', class_id=class_id))
+        
+        class_.name = form.name.data
+        class_.description = form.description.data
+        
+        db.session.commit()
+        flash('Class has been updated', 'success')
+        return redirect(url_for('.class_detail', class_id=class_id))
+    
+    return render_template('add_class.html', title='Edit Class', form=form)
+
+# Delete class route
+@login_required
+def delete_class(class_id):
+    class_ = Class.query.get_or_404(class_id)
+    
+    # Classes with students (deleted ones included) are archived with their students
+    if class_has_students(class_id):
+        archive_class(class_)
+    else:
+        db.session.delete(class_)
+    db.session.commit()
+    flash('Class has been deleted', 'success')
+    return redirect(url_for('.classes'))
+
+# Restore class route (a class archived by delete_class, with the students deleted with it)
+@login_required
+def restore_class(class_id):
+    class_ = Class.query.execution_options(include_deleted=True).get_or_404(class_id)
+    if class_.deleted_at is not None:
+        restore_archived_class(class_)
+        db.session.commit()
+        flash('Class has been restored', 'success')
+    return redirect(url_for('.class_detail', class_id=class_id))
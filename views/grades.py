@@ -0,0 +1,67 @@
+from flask import render_template, redirect, url_for, flash
+from flask_login import login_required
+from extensions import db
+from models import Grade
+from forms import GradeForm
+from pagination import paginate_keyset
+from loading import apply_profile
+from db_routing import use_replica
+
+# Grades route
+@login_required
+@use_replica
+def grades():
+    # Get one page of grades
+    page = paginate_keyset(apply_profile(Grade.query), [Grade.id])
+    
+    return render_template('grades.html', title='Grades', grades=page.items, page=page)
+
+# Add grade route
+@login_required
+def add_grade():
+    form = GradeForm()
+    
+    if form.validate_on_submit():
+        grade = Grade(
+            student_id=form.student_id.data,
+            subject=form.subject.data,
+            score=form.score.data,
+            grade=form.grade.data,
+            semester=form.semester.data,
+            academic_year=form.academic_year.data
+        )
+        db.session.add(grade)
+        db.session.commit()
+        flash('Grade has been added', 'success')
+        return redirect(url_for('.grades'))
+    
+    return render_template('add_grade.html', title='Add Grade', form=form)
+
+# Edit grade route
+@login_required
+def edit_grade(grade_id):
+    grade = Grade.query.get_or_404(grade_id)
+    form = GradeForm(obj=grade)
+    
+    if form.validate_on_submit():
+        grade.student_id = form.student_id.data
+        grade.subject = form.subject.data
+        grade.score = form.score.data
+        grade.grade = form.grade.data
+        grade.semester = form.semester.data
+        grade.academic_year = form.academic_year.data
+        
+        db.session.commit()
+        flash('Grade has been updated', 'success')
+        return redirect(url_for('.grades'))
+    
+    return render_template('add_grade.html', title='Edit Grade', form=form, student=grade.student)
+
+# Delete grade route
+@login_required
+def delete_grade(grade_id):
+    grade = Grade.query.get_or_404(grade_id)
+    db.session.delete(grade)
+    db.session.commit()
+    flash('Grade has been deleted', 'success')
+    return redirect(url_for('.grades'))
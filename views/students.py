@@ -0,0 +1,182 @@
+from flask import render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required
+from extensions import db
+from models import Class, Student, Grade, Attendance, AttendanceArchive, StudentGradeSummary
+from forms import StudentForm, SearchForm
+from pagination import paginate_keyset
+from loading import apply_profile
+from fragment_cache import cached_page, student_class_key
+from db_routing import use_replica
+from search_index import search_students, autocomplete_args, autocomplete_statement, autocomplete_payload
+from archive import unpack_records
+from soft_delete import student_has_history, archive_student, restore_student as restore_archived_student
+
+# Students route
+@login_required
+@cached_page(lambda: ['table:student', 'table:class'])
+def students():
+    # Get one page of students
+    page = paginate_keyset(apply_profile(Student.query), [Student.id])
+    
+    return render_template('students.html', title='Students', students=page.items, page=page)
+
+# Student detail route
+@login_required
+@cached_page(lambda student_id: [f'student:{student_id}', student_class_key(student_id)])
+def student_detail(student_id):
+    student = apply_profile(Student.query).get_or_404(student_id)
+    
+    # Get student's grades
+    grades = Grade.query.filter_by(student_id=student_id).all()
+    
+    # Get student's attendance
+    attendances = Attendance.query.filter_by(student_id=student_id).order_by(Attendance.date.desc()).limit(10).all()
+    
+    # Get student's per-term averages and class rank (precomputed)
+    summaries = StudentGradeSummary.query.filter_by(student_id=student_id).order_by(
+        StudentGradeSummary.academic_year.desc(), StudentGradeSummary.semester.desc()).all()
+    
+    # Get student's archived attendance years; ?archive_year= unpacks one of them
+    archives = AttendanceArchive.query.filter_by(student_id=student_id).order_by(
+        AttendanceArchive.academic_year.desc()).all()
+    archive_year = request.args.get('archive_year')
+    archived_records = [unpack_records(archive) for archive in archives if archive.academic_year == archive_year]
+    
+    return render_template('student_detail.html', title=f'{student.first_name} {student.last_name}', 
+                         student=student, grades=grades, attendances=attendances, summaries=summaries,
+                         archives=archives, archive_year=archive_year,
+                         archived_records=archived_records[0] if archived_records else [])
+
+# Add student route
+@login_required
+def add_student():
+    form = StudentForm()
+    
+    # Populate class choices
+    form.class_id.choices = [(class_.id, class_.name) for class_ in Class.query.all()]
+    
+    if form.validate_on_submit():
+        # Check if student ID already exists (deleted students keep theirs)
+        existing_student = Student.query.execution_options(include_deleted=True) \
+            .filter_by(student_id=form.student_id.data).first()
+        if existing_student:
+            flash('Student ID already exists', 'danger')
+            return redirect(url_for('.add_student'))
+        
+        student = Student(
+            student_id=form.student_id.data,
+            first_name=form.first_name.data,
+            last_name=form.last_name.data,
+            gender=form.gender.data,
+            date_of_birth=form.date_of_birth.data,
+            address=form.address.data,
+            phone=form.phone.data,
+            email=form.email.data,
+            class_id=form.class_id.data
+        )
+        db.session.add(student)
+        db.session.commit()
+        flash('Student has been added', 'success')
+        return redirect(url_for('.students'))
+    
+    return render_template('add_student.html', title='Add Student', form=form)
+
+# Edit student route
+@login_required
+def edit_student(student_id):
+    student = Student.query.get_or_404(student_id)
+    form = StudentForm(obj=student)
+    
+    # Populate class choices
+    form.class_id.choices = [(class_.id, class_.name) for class_ in Class.query.all()]
+    
+    if form.validate_on_submit():
+        # Check if student ID already exists (excluding current student)
+        existing_student = Student.query.execution_options(include_deleted=True).filter(
+            Student.student_id == form.student_id.data,
+            Student.id != student_id
+        ).first()
+        if existing_student:
+            flash('Student ID already exists', 'danger')
+            return redirect(url_for('.edit_student', student_id=student_id))
+        
+        student.student_id = form.student_id.data
+        student.first_name = form.first_name.data
+        student.last_name = form.last_name.data
+        student.gender = form.gender.data
+        student.date_of_birth = form.date_of_birth.data
+        student.address = form.address.data
+        student.phone = form.phone.data
+        student.email = form.email.data
+        student.class_id = form.class_id.data
+        
+        db.session.commit()
+        flash('Student has been updated', 'success')
+        return redirect(url_for('.student_detail', student_id=student_id))
+    
+    return render_template('add_student.html', title='Edit Student', form=form)
+
+# Delete student route
+@login_required
+def delete_student(student_id):
+    student = Student.query.get_or_404(student_id)
+    
+    # Students with grades or attendance records are archived together with them
+    if student_has_history(student_id):
+        archive_student(student)
+    else:
+        db.session.delete(student)
+    db.session.commit()
+    flash('Student has been deleted', 'success')
+    return redirect(url_for('.students'))
+
+# Restore student route (a student archived by delete_student, with their records)
+@login_required
+def restore_student(student_id):
+    student = Student.query.execution_options(include_deleted=True).get_or_404(student_id)
+    if student.deleted_at is None:
+        return redirect(url_for('.student_detail', student_id=student_id))
+    
+    if db.session.get(Class, student.class_id) is None:
+        flash('Restore the class of this student first', 'danger')
+        return redirect(url_for('classes.classes'))
+    
+    restore_archived_student(student)
+    db.session.commit()
+    flash('Student has been restored', 'success')
+    return redirect(url_for('.student_detail', student_id=student_id))
+
+# Search route
+@login_required
+@use_replica
+def search():
+    form = SearchForm()
+    students = []
+    results = None
+    
+    # A submitted form starts a new search; paging links carry the term as ?q=
+    if form.validate_on_submit():
+        search_term = form.search.data
+    else:
+        search_term = request.args.get('q', '')
+        form.search.data = form.search.data or search_term
+    
+    if search_term.strip():
+        # Search in student names, IDs, and classes through the search index
+        results = search_students(search_term, page=request.args.get('page', 1, type=int))
+        found = {student.id: student for student in apply_profile(Student.query).filter(Student.id.in_(results.ids))}
+        students = [found[student_id] for student_id in results.ids if student_id in found]
+    
+    return render_template('search.html', title='Search', form=form, students=students,
+                         results=results, search_term=search_term)
+
+# Student autocomplete route (JSON for the student pickers)
+@login_required
+def student_autocomplete():
+    term, limit = autocomplete_args()
+    if not term or limit < 1:
+        return jsonify([])
+    
+    # Top matches from the search index, then one query for their labels
+    ids = search_students(term, per_page=limit).ids
+    return jsonify(autocomplete_payload(ids, db.session.execute(autocomplete_statement(ids)).all()))
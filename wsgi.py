@@ -0,0 +1,19 @@
+# WSGI entry point for production servers:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#   waitress-serve --listen=0.0.0.0:8000 wsgi:app   (or: python wsgi.py)
+import os
+
+os.environ.setdefault('FLASK_CONFIG', 'production')
+
+from app import create_app
+
+app = create_app()
+
+if __name__ == '__main__':
+    from waitress import serve
+    serve(
+        app,
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', 8000)),
+        threads=int(os.environ.get('WAITRESS_THREADS', 8))
+    )